@@ -3,14 +3,19 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from dotenv import load_dotenv
 from flask_cors import CORS
+from .compression import Compress
 import os
 
 db = SQLAlchemy()
 migrate = Migrate()
+compress = Compress()
 
 def create_app(config_name=None):
     load_dotenv()
     app = Flask(__name__)
+
+    from .json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app)
     
     if config_name:
         from .config import config
@@ -24,6 +29,21 @@ def create_app(config_name=None):
 
     db.init_app(app)
     migrate.init_app(app, db)
+    compress.init_app(app)
+
+    from .cache import init_cache
+    init_cache(app)
+
+    from .sync import init_change_tracking
+    from .autocomplete import init_autocomplete_tracking
+    from .events import init_events
+    from .rollups import init_rollup_tracking
+    from .user_context import init_user_context
+    init_change_tracking()
+    init_autocomplete_tracking()
+    init_rollup_tracking()
+    init_user_context()
+    init_events(app)
 
     from .routes import main
     app.register_blueprint(main)
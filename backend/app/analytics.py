@@ -0,0 +1,442 @@
+from datetime import datetime, date, time, timedelta
+import pytz
+from sqlalchemy import text
+from . import db
+from .rollups import period_start
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depende do ambiente
+    np = None
+
+# Limite de meses da série mensal
+MAX_MONTHS = 120
+
+# Granularidades aceitas pelas séries temporais, da mais fina para a mais grossa
+GRANULARITIES = ('day', 'week', 'month')
+GRANULARITY_STEPS = {'day': '1 day', 'week': '1 week', 'month': '1 month'}
+APPROX_BUCKET_DAYS = {'day': 1, 'week': 7, 'month': 30}
+# Tipo de período do rollup (betting_stats) de cada granularidade
+GRANULARITY_PERIODS = {'day': 'daily', 'week': 'weekly', 'month': 'monthly'}
+
+# Expressões SQL reutilizadas pelas consultas de séries
+SIGNED_AMOUNT_SQL = (
+    "CASE WHEN type IN ('deposit', 'gains') THEN amount "
+    "WHEN type IN ('withdraw', 'losses') THEN -amount ELSE 0 END"
+)
+LOCAL_DATE_SQL = "((date AT TIME ZONE 'UTC') AT TIME ZONE :tz)"
+
+# Dias locais aceitos nos filtros: os limites UTC usam o dia seguinte e o
+# deslocamento do fuso, então os extremos de `date` estourariam
+MIN_LOCAL_DAY = date(1, 1, 2)
+MAX_LOCAL_DAY = date(9999, 12, 30)
+
+# === TIME BUCKETING ===
+
+def parse_local_day(value):
+    """Lê um dia YYYY-MM-DD; ValueError se inválido ou fora de MIN/MAX_LOCAL_DAY"""
+    day = datetime.strptime(value, '%Y-%m-%d').date()
+    if not MIN_LOCAL_DAY <= day <= MAX_LOCAL_DAY:
+        raise ValueError(f'Data fora do intervalo suportado: {value}')
+    return day
+
+def local_day_bounds(first_day, last_day, tz_name):
+    """
+    Converte um intervalo de dias locais (inclusivo) para limites UTC sem fuso,
+    no formato gravado em Transaction.date, para filtros que usam o índice.
+    Os dias devem estar entre MIN_LOCAL_DAY e MAX_LOCAL_DAY.
+    """
+    tz = pytz.timezone(tz_name)
+    start = tz.localize(datetime.combine(first_day, time.min))
+    end = tz.localize(datetime.combine(last_day + timedelta(days=1), time.min))
+    return (
+        start.astimezone(pytz.utc).replace(tzinfo=None),
+        end.astimezone(pytz.utc).replace(tzinfo=None),
+    )
+
+def local_today(tz_name):
+    return datetime.now(pytz.timezone(tz_name)).date()
+
+def to_local_date(value, tz_name):
+    """Data local de um datetime UTC sem fuso"""
+    return pytz.utc.localize(value).astimezone(pytz.timezone(tz_name)).date()
+
+def fit_granularity(granularity, first_day, last_day, max_points):
+    """
+    Aumenta a granularidade até o número de buckets caber em max_points.
+    Retorna None se nem a mais grossa cabe (intervalo longo demais).
+    """
+    span_days = (last_day - first_day).days + 1
+    for candidate in GRANULARITIES[GRANULARITIES.index(granularity):]:
+        if span_days / APPROX_BUCKET_DAYS[candidate] <= max_points:
+            return candidate
+    return None
+
+# === DOWNSAMPLING ===
+
+def lttb_indices(x, y, threshold):
+    """
+    Índices escolhidos pelo Largest-Triangle-Three-Buckets: mantém o primeiro
+    e o último ponto e, em cada bucket, o ponto que forma o maior triângulo
+    com o escolhido anteriormente e a média do bucket seguinte. Picos e
+    quedas sobrevivem, ao contrário de uma média ou amostragem fixa.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    if np is not None:
+        return _lttb_numpy(x, y, threshold)
+    return _lttb_python(x, y, threshold)
+
+def _bucket_edges(n, threshold):
+    # threshold-2 buckets entre o primeiro e o último ponto, mais o último sozinho
+    every = (n - 2) / (threshold - 2)
+    return [int(i * every) + 1 for i in range(threshold - 1)] + [n]
+
+def _lttb_numpy(x, y, threshold):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.array(_bucket_edges(len(y), threshold))
+
+    # Médias de todos os buckets de uma vez
+    sizes = np.diff(edges)
+    avg_x = np.add.reduceat(x, edges[:-1]) / sizes
+    avg_y = np.add.reduceat(y, edges[:-1]) / sizes
+
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        area = np.abs(
+            (x[a] - avg_x[i + 1]) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y[i + 1] - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected.append(a)
+    selected.append(len(y) - 1)
+    return selected
+
+def _lttb_python(x, y, threshold):
+    edges = _bucket_edges(len(y), threshold)
+
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2]
+        avg_x = sum(x[next_start:next_end]) / (next_end - next_start)
+        avg_y = sum(y[next_start:next_end]) / (next_end - next_start)
+        a = max(
+            range(start, end),
+            key=lambda j: abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+        )
+        selected.append(a)
+    selected.append(len(y) - 1)
+    return selected
+
+def downsample_rows(rows, max_points, x_key, y_key):
+    """
+    Aplica o LTTB a linhas de série (Row ou dict) pelo par de colunas x/y.
+    Sem x_key, usa a posição de cada linha (buckets igualmente espaçados).
+    """
+    if not max_points or len(rows) <= max_points:
+        return rows
+    get = (lambda row, key: row[key]) if rows and isinstance(rows[0], dict) else getattr
+    x = list(range(len(rows))) if x_key is None else [_as_number(get(row, x_key)) for row in rows]
+    y = [float(get(row, y_key)) for row in rows]
+    return [rows[i] for i in lttb_indices(x, y, max_points)]
+
+def _as_number(value):
+    if isinstance(value, date):
+        return value.toordinal()
+    return float(value)
+
+# === LEDGER SUMMARY ===
+
+def get_ledger_summary(user_id, tz_name):
+    """
+    Todos os números de resumo do usuário em uma única consulta: somas e
+    contagens por tipo (FILTER), saldo, transações de hoje (dia local),
+    banca inicial (transação inicial ou perfil ativo) e a última transação.
+    """
+    today = local_today(tz_name)
+    today_start, today_end = local_day_bounds(today, today, tz_name)
+
+    return db.session.execute(text(f"""
+        WITH totals AS (
+            SELECT
+                coalesce(sum(amount) FILTER (WHERE type = 'deposit'), 0) AS total_deposits,
+                coalesce(sum(amount) FILTER (WHERE type = 'withdraw'), 0) AS total_withdrawals,
+                coalesce(sum(amount) FILTER (WHERE type = 'gains'), 0) AS total_gains,
+                coalesce(sum(amount) FILTER (WHERE type = 'losses'), 0) AS total_losses,
+                coalesce(sum({SIGNED_AMOUNT_SQL}), 0) AS balance,
+                count(*) FILTER (WHERE type = 'deposit') AS deposit_count,
+                count(*) FILTER (WHERE type = 'withdraw') AS withdraw_count,
+                count(*) FILTER (WHERE type = 'gains') AS gains_count,
+                count(*) FILTER (WHERE type = 'losses') AS losses_count,
+                count(*) AS total_count,
+                count(*) FILTER (WHERE date >= :today_start AND date < :today_end) AS today_count
+            FROM transactions
+            WHERE user_id = :user_id
+        )
+        SELECT
+            totals.*,
+            coalesce(
+                (SELECT amount FROM transactions
+                 WHERE user_id = :user_id AND is_initial_bank
+                 ORDER BY id LIMIT 1),
+                (SELECT initial_balance FROM betting_profiles
+                 WHERE user_id = :user_id AND is_active
+                 ORDER BY id LIMIT 1),
+                0.00
+            ) AS initial_bank,
+            last.id AS last_id,
+            last.type AS last_type,
+            last.amount AS last_amount,
+            last.category AS last_category,
+            last.date AS last_date
+        FROM totals
+        LEFT JOIN LATERAL (
+            SELECT id, type, amount, category, date
+            FROM transactions
+            WHERE user_id = :user_id
+            ORDER BY date DESC, id DESC
+            LIMIT 1
+        ) last ON true
+    """), {
+        'user_id': user_id,
+        'today_start': today_start,
+        'today_end': today_end,
+    }).one()
+
+def get_transaction_stats(user_id, first_day, last_day, tz_name):
+    """
+    Estatísticas das operações (ganhos/perdas) em um intervalo de dias locais
+    (limites opcionais) em uma única consulta: contagens, somas, médias e
+    máximos por tipo (FILTER) e média/desvio padrão amostral do retorno
+    com sinal de cada operação.
+    """
+    conditions = ['user_id = :user_id']
+    params = {'user_id': user_id}
+    if first_day is not None:
+        conditions.append('date >= :start_utc')
+        params['start_utc'] = local_day_bounds(first_day, first_day, tz_name)[0]
+    if last_day is not None:
+        conditions.append('date < :end_utc')
+        params['end_utc'] = local_day_bounds(last_day, last_day, tz_name)[1]
+
+    operational = "type IN ('gains', 'losses')"
+    return db.session.execute(text(f"""
+        SELECT
+            count(*) FILTER (WHERE {operational}) AS total_trades,
+            count(*) FILTER (WHERE type = 'gains') AS winning_trades,
+            count(*) FILTER (WHERE type = 'losses') AS losing_trades,
+            coalesce(sum(amount) FILTER (WHERE type = 'gains'), 0.00) AS total_gains,
+            coalesce(sum(amount) FILTER (WHERE type = 'losses'), 0.00) AS total_losses,
+            coalesce(sum(amount) FILTER (WHERE type = 'deposit'), 0.00) AS total_deposits,
+            coalesce(sum(amount) FILTER (WHERE type = 'withdraw'), 0.00) AS total_withdrawals,
+            round(coalesce(avg(amount) FILTER (WHERE type = 'gains'), 0.00), 2) AS avg_gain,
+            round(coalesce(avg(amount) FILTER (WHERE type = 'losses'), 0.00), 2) AS avg_loss,
+            coalesce(max(amount) FILTER (WHERE type = 'gains'), 0.00) AS max_gain,
+            coalesce(max(amount) FILTER (WHERE type = 'losses'), 0.00) AS max_loss,
+            coalesce(avg({SIGNED_AMOUNT_SQL}) FILTER (WHERE {operational}), 0.00) AS mean_return,
+            coalesce(stddev_samp({SIGNED_AMOUNT_SQL}) FILTER (WHERE {operational}), 0.00) AS volatility
+        FROM transactions
+        WHERE {' AND '.join(conditions)}
+    """), params).one()
+
+# === SERIES QUERIES ===
+
+def get_balance_history(user_id, first_day, last_day, granularity, tz_name):
+    """
+    Série de saldo por bucket em uma única consulta: fluxos por tipo com
+    date_trunc no fuso local, buckets vazios preenchidos por generate_series
+    e saldo de fechamento acumulado por janela sobre o saldo de abertura.
+    """
+    start_utc, end_utc = local_day_bounds(first_day, last_day, tz_name)
+
+    return db.session.execute(text(f"""
+        WITH buckets AS (
+            SELECT generate_series(
+                date_trunc(:granularity, CAST(:first_day AS timestamp)),
+                date_trunc(:granularity, CAST(:last_day AS timestamp)),
+                CAST(:step AS interval)
+            ) AS bucket
+        ),
+        flows AS (
+            SELECT
+                date_trunc(:granularity, {LOCAL_DATE_SQL}) AS bucket,
+                coalesce(sum(amount) FILTER (WHERE type = 'deposit'), 0) AS deposits,
+                coalesce(sum(amount) FILTER (WHERE type = 'withdraw'), 0) AS withdrawals,
+                coalesce(sum(amount) FILTER (WHERE type = 'gains'), 0) AS gains,
+                coalesce(sum(amount) FILTER (WHERE type = 'losses'), 0) AS losses,
+                sum({SIGNED_AMOUNT_SQL}) AS net_flow,
+                count(*) AS transactions
+            FROM transactions
+            WHERE user_id = :user_id AND date >= :start_utc AND date < :end_utc
+            GROUP BY 1
+        ),
+        opening AS (
+            SELECT coalesce(sum({SIGNED_AMOUNT_SQL}), 0) AS balance
+            FROM transactions
+            WHERE user_id = :user_id AND date < :start_utc
+        )
+        SELECT
+            CAST(b.bucket AS date) AS date,
+            (SELECT balance FROM opening)
+                + sum(coalesce(f.net_flow, 0)) OVER (ORDER BY b.bucket) AS closing_balance,
+            coalesce(f.net_flow, 0) AS net_flow,
+            coalesce(f.deposits, 0) AS deposits,
+            coalesce(f.withdrawals, 0) AS withdrawals,
+            coalesce(f.gains, 0) AS gains,
+            coalesce(f.losses, 0) AS losses,
+            coalesce(f.transactions, 0) AS transactions
+        FROM buckets b
+        LEFT JOIN flows f ON f.bucket = b.bucket
+        ORDER BY b.bucket
+    """), {
+        'user_id': user_id,
+        'granularity': granularity,
+        'step': GRANULARITY_STEPS[granularity],
+        'first_day': first_day,
+        'last_day': last_day,
+        'start_utc': start_utc,
+        'end_utc': end_utc,
+        'tz': tz_name,
+    }).all()
+
+def get_rollup_series(user_id, first_day, last_day, granularity, columns):
+    """
+    Série por bucket lida dos rollups mantidos na escrita: generate_series
+    dos períodos que tocam o intervalo (buckets vazios incluídos) com LEFT
+    JOIN pela chave única de betting_stats. `columns` mapeia o nome de cada
+    coluna da saída para uma expressão sobre `s` (a linha do rollup).
+    """
+    period_type = GRANULARITY_PERIODS[granularity]
+    selected = ',\n'.join(
+        f'coalesce({expression}, 0.00) AS {name}' for name, expression in columns.items()
+    )
+
+    return db.session.execute(text(f"""
+        WITH buckets AS (
+            SELECT CAST(generate_series(
+                CAST(:first_bucket AS timestamp),
+                CAST(:last_bucket AS timestamp),
+                CAST(:step AS interval)
+            ) AS date) AS date
+        )
+        SELECT
+            b.date,
+            {selected}
+        FROM buckets b
+        LEFT JOIN betting_stats s
+            ON s.user_id = :user_id AND s.period_type = :period_type AND s.period_date = b.date
+        ORDER BY b.date
+    """), {
+        'user_id': user_id,
+        'period_type': period_type,
+        'step': GRANULARITY_STEPS[granularity],
+        'first_bucket': period_start(first_day, period_type),
+        'last_bucket': period_start(last_day, period_type),
+    }).all()
+
+def get_game_results(user_id, first_day, last_day, tz_name):
+    """Ganhos, perdas e operações por jogo em um intervalo de dias locais"""
+    start_utc, end_utc = local_day_bounds(first_day, last_day, tz_name)
+
+    return db.session.execute(text("""
+        SELECT
+            coalesce(game_type, 'other') AS game_type,
+            count(*) AS total_trades,
+            count(*) FILTER (WHERE type = 'gains') AS winning_trades,
+            coalesce(sum(amount) FILTER (WHERE type = 'gains'), 0.00) AS gains,
+            coalesce(sum(amount) FILTER (WHERE type = 'losses'), 0.00) AS losses,
+            coalesce(sum(amount) FILTER (WHERE type = 'gains'), 0.00)
+                - coalesce(sum(amount) FILTER (WHERE type = 'losses'), 0.00) AS net_result
+        FROM transactions
+        WHERE user_id = :user_id AND type IN ('gains', 'losses')
+          AND date >= :start_utc AND date < :end_utc
+        GROUP BY 1
+        ORDER BY net_result DESC, 1
+    """), {
+        'user_id': user_id,
+        'start_utc': start_utc,
+        'end_utc': end_utc,
+    }).all()
+
+def get_monthly_series(user_id, months, tz_name):
+    """
+    Exatamente `months` meses de calendário (fuso local) terminando no mês
+    atual, meses vazios incluídos. Lê os rollups mensais por faixa de
+    period_date (índice único) e devolve os quatro tipos, o fluxo líquido do
+    mês (balance) e o saldo de fechamento acumulado sobre o saldo anterior.
+    """
+    last_month = local_today(tz_name).replace(day=1)
+    first_month = last_month
+    for _ in range(months - 1):
+        first_month = (first_month - timedelta(days=1)).replace(day=1)
+
+    net_flow = "(s.total_deposits + s.total_gains - s.total_withdrawals - s.total_losses)"
+
+    return db.session.execute(text(f"""
+        WITH months AS (
+            SELECT CAST(generate_series(
+                CAST(:first_month AS timestamp),
+                CAST(:last_month AS timestamp),
+                interval '1 month'
+            ) AS date) AS month
+        ),
+        opening AS (
+            SELECT coalesce(sum({net_flow}), 0) AS balance
+            FROM betting_stats s
+            WHERE s.user_id = :user_id AND s.period_type = 'monthly'
+              AND s.period_date < :first_month
+        )
+        SELECT
+            to_char(m.month, 'YYYY-MM') AS month,
+            coalesce(s.total_deposits, 0) AS deposits,
+            coalesce(s.total_withdrawals, 0) AS withdraws,
+            coalesce(s.total_gains, 0) AS gains,
+            coalesce(s.total_losses, 0) AS losses,
+            coalesce(s.total_gains - s.total_losses, 0) AS net_result,
+            coalesce({net_flow}, 0) AS balance,
+            (SELECT balance FROM opening)
+                + sum(coalesce({net_flow}, 0)) OVER (ORDER BY m.month) AS closing_balance
+        FROM months m
+        LEFT JOIN betting_stats s
+            ON s.user_id = :user_id AND s.period_type = 'monthly' AND s.period_date = m.month
+        ORDER BY m.month
+    """), {
+        'user_id': user_id,
+        'first_month': first_month,
+        'last_month': last_month,
+    }).all()
+
+def get_calendar_days(user_id, first_day, last_day, tz_name):
+    """
+    Totais por dia local (só dias com movimento) em uma consulta agrupada:
+    ganhos, perdas, depósitos, saques, resultado líquido (ganhos - perdas)
+    e quantidade de transações.
+    """
+    start_utc, end_utc = local_day_bounds(first_day, last_day, tz_name)
+
+    return db.session.execute(text(f"""
+        SELECT
+            CAST({LOCAL_DATE_SQL} AS date) AS date,
+            coalesce(sum(amount) FILTER (WHERE type = 'gains'), 0) AS gains,
+            coalesce(sum(amount) FILTER (WHERE type = 'losses'), 0) AS losses,
+            coalesce(sum(amount) FILTER (WHERE type = 'deposit'), 0) AS deposits,
+            coalesce(sum(amount) FILTER (WHERE type = 'withdraw'), 0) AS withdrawals,
+            coalesce(sum(amount) FILTER (WHERE type = 'gains'), 0)
+                - coalesce(sum(amount) FILTER (WHERE type = 'losses'), 0) AS net_result,
+            count(*) AS transactions
+        FROM transactions
+        WHERE user_id = :user_id AND date >= :start_utc AND date < :end_utc
+        GROUP BY 1
+        ORDER BY 1
+    """), {
+        'user_id': user_id,
+        'start_utc': start_utc,
+        'end_utc': end_utc,
+        'tz': tz_name,
+    }).all()
@@ -0,0 +1,145 @@
+from datetime import datetime
+from collections import Counter
+from sqlalchemy import DDL, event, inspect, text
+from sqlalchemy.dialects.postgresql import insert
+from . import db
+from .models import Transaction, AutocompleteTerm
+
+AUTOCOMPLETE_FIELDS = ('category', 'description')
+MAX_TERM_LENGTH = 200
+
+# === SCHEMA ===
+
+def _pg_trgm_available(ddl, target, bind, **kw):
+    return bind.execute(text(
+        "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+    )).first() is not None
+
+# Índice trigram (GIN) para ILIKE/LIKE no termo; criado só onde a extensão
+# existe, o índice btree de prefixo atende os demais ambientes.
+event.listen(
+    AutocompleteTerm.__table__,
+    'after_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(callable_=_pg_trgm_available)
+)
+event.listen(
+    AutocompleteTerm.__table__,
+    'after_create',
+    DDL(
+        'CREATE INDEX IF NOT EXISTS idx_autocomplete_trgm '
+        'ON autocomplete_terms USING gin (lower(term) gin_trgm_ops)'
+    ).execute_if(callable_=_pg_trgm_available)
+)
+
+# === WRITE PATH ===
+
+def _normalize(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value[:MAX_TERM_LENGTH] if value else None
+
+def _collect_deltas(session):
+    """Soma +1/-1 por (usuário, campo, termo) a partir do estado do flush"""
+    deltas = Counter()
+
+    def apply(user_id, field, value, delta):
+        term = _normalize(value)
+        if term:
+            deltas[(user_id, field, term)] += delta
+
+    for obj in session.new:
+        if isinstance(obj, Transaction):
+            for field in AUTOCOMPLETE_FIELDS:
+                apply(obj.user_id, field, getattr(obj, field), 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, Transaction):
+            for field in AUTOCOMPLETE_FIELDS:
+                apply(obj.user_id, field, getattr(obj, field), -1)
+
+    for obj in session.dirty:
+        if not isinstance(obj, Transaction):
+            continue
+        state = inspect(obj)
+        for field in AUTOCOMPLETE_FIELDS:
+            history = state.attrs[field].history
+            if not history.has_changes():
+                continue
+            for value in history.deleted or ():
+                apply(obj.user_id, field, value, -1)
+            for value in history.added or ():
+                apply(obj.user_id, field, value, 1)
+
+    return {key: delta for key, delta in deltas.items() if delta}
+
+def _after_flush(session, flush_context):
+    deltas = _collect_deltas(session)
+    if not deltas:
+        return
+
+    now = datetime.utcnow()
+    stmt = insert(AutocompleteTerm.__table__)
+    stmt = stmt.on_conflict_do_update(
+        constraint='unique_user_field_term',
+        set_={
+            'uses': AutocompleteTerm.__table__.c.uses + stmt.excluded.uses,
+            'last_used_at': stmt.excluded.last_used_at,
+        }
+    )
+    session.execute(stmt, [
+        {'user_id': user_id, 'field': field, 'term': term, 'uses': delta, 'last_used_at': now}
+        for (user_id, field, term), delta in deltas.items()
+    ])
+
+    # Termos que deixaram de ser usados somem das sugestões
+    session.execute(
+        AutocompleteTerm.__table__.delete().where(
+            AutocompleteTerm.user_id.in_({user_id for user_id, _, _ in deltas}),
+            AutocompleteTerm.uses <= 0
+        )
+    )
+
+def init_autocomplete_tracking():
+    """Registra o listener que mantém as frequências de autocomplete"""
+    if not event.contains(db.session, 'after_flush', _after_flush):
+        event.listen(db.session, 'after_flush', _after_flush)
+
+# === QUERIES ===
+
+def suggest_terms(user_id, field, prefix, limit):
+    """Termos do usuário que começam com `prefix`, dos mais usados para os menos"""
+    query = db.session.query(AutocompleteTerm.term, AutocompleteTerm.uses).filter(
+        AutocompleteTerm.user_id == user_id,
+        AutocompleteTerm.field == field
+    )
+    if prefix:
+        escaped = prefix.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        query = query.filter(db.func.lower(AutocompleteTerm.term).like(f'{escaped}%', escape='\\'))
+    return query.order_by(
+        AutocompleteTerm.uses.desc(), AutocompleteTerm.term
+    ).limit(limit).all()
+
+# === MAINTENANCE ===
+
+def rebuild_autocomplete_terms(user_id=None):
+    """Recalcula as frequências a partir das transações (todas ou de um usuário)"""
+    params = {'max_length': MAX_TERM_LENGTH}
+    user_filter = ''
+    if user_id is not None:
+        user_filter = 'AND user_id = :user_id'
+        params['user_id'] = user_id
+        db.session.execute(text('DELETE FROM autocomplete_terms WHERE user_id = :user_id'), params)
+    else:
+        db.session.execute(text('DELETE FROM autocomplete_terms'))
+
+    for field in AUTOCOMPLETE_FIELDS:
+        db.session.execute(text(f"""
+            INSERT INTO autocomplete_terms (user_id, field, term, uses, last_used_at)
+            SELECT user_id, '{field}', left(btrim({field}), :max_length), count(*), max(date)
+            FROM transactions
+            WHERE {field} IS NOT NULL AND btrim({field}) <> '' {user_filter}
+            GROUP BY user_id, left(btrim({field}), :max_length)
+        """), params)
+
+    db.session.commit()
@@ -0,0 +1,46 @@
+from flask import current_app
+
+try:
+    from flask_caching import Cache
+except ImportError:  # pragma: no cover - depende do ambiente
+    Cache = None
+
+cache = Cache() if Cache is not None else None
+
+def init_cache(app):
+    """Inicializa o Flask-Caching (CACHE_TYPE) usando REDIS_URL para o backend redis"""
+    if cache is None:
+        return
+    app.config.setdefault('CACHE_REDIS_URL', app.config.get('REDIS_URL'))
+    cache.init_app(app)
+
+def cache_get(key):
+    """Valor em cache (None se ausente ou se o backend falhar)"""
+    if cache is None:
+        return None
+    try:
+        return cache.get(key)
+    except Exception as e:
+        current_app.logger.warning(f'Cache indisponível: {str(e)}')
+        return None
+
+def cache_set(key, value, timeout=None):
+    if cache is None:
+        return
+    try:
+        cache.set(key, value, timeout=timeout)
+    except Exception as e:
+        current_app.logger.warning(f'Cache indisponível: {str(e)}')
+
+def ledger_cached(namespace, user_id, version, params, builder, timeout=None):
+    """
+    Resultado de `builder()` em cache pela versão do ledger do usuário.
+    A versão faz parte da chave, então qualquer escrita gera uma chave nova
+    e não há invalidação. Falhas do backend de cache só custam o recálculo.
+    """
+    key = f'{namespace}:{user_id}:{version}:{params}'
+    value = cache_get(key)
+    if value is None:
+        value = builder()
+        cache_set(key, value, timeout=timeout)
+    return value
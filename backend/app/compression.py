@@ -0,0 +1,168 @@
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende do ambiente
+    brotli = None
+
+
+class _CompressedBodyCache:
+    """LRU em memória (por processo) de corpos comprimidos, limitado em bytes"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._items.get(key)
+            if body is not None:
+                self._items.move_to_end(key)
+            return body
+
+    def set(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._items[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+
+class Compress:
+    """
+    Compressão das respostas (gzip, e brotli quando instalado) acima de um
+    tamanho mínimo. Respostas em streaming são comprimidas chunk a chunk.
+    GETs ganham ETag do conteúdo; quando a rota define um ETag forte o corpo
+    comprimido fica em cache por (ETag, Content-Type, codificação), então
+    repetições não recomprimem.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('COMPRESS_ENABLED', True)
+        app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+        app.config.setdefault('COMPRESS_LEVEL', 6)
+        app.config.setdefault('COMPRESS_BR_LEVEL', 4)
+        app.config.setdefault('COMPRESS_MIMETYPES', [
+            'application/json', 'application/msgpack', 'text/csv', 'text/plain', 'text/html'
+        ])
+        app.config.setdefault('COMPRESS_CACHE_MAX_BYTES', 32 * 1024 * 1024)
+
+        app.extensions['compress'] = _CompressedBodyCache(app.config['COMPRESS_CACHE_MAX_BYTES'])
+        app.after_request(self.after_request)
+
+    @property
+    def config(self):
+        return current_app.config
+
+    @property
+    def cache(self):
+        return current_app.extensions['compress']
+
+    def _choose_encoding(self):
+        accept = request.accept_encodings
+        if brotli is not None and accept['br']:
+            return 'br'
+        if accept['gzip']:
+            return 'gzip'
+        return None
+
+    def _compress(self, data, encoding):
+        if encoding == 'br':
+            return brotli.compress(data, quality=self.config['COMPRESS_BR_LEVEL'])
+        compressor = zlib.compressobj(self.config['COMPRESS_LEVEL'], zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+
+    def _compress_stream(self, chunks, encoding):
+        # O gerador roda fora do contexto da aplicação: compressor criado aqui
+        if encoding == 'br':
+            compressor = brotli.Compressor(quality=self.config['COMPRESS_BR_LEVEL'])
+            process, finish = compressor.process, compressor.finish
+        else:
+            compressor = zlib.compressobj(self.config['COMPRESS_LEVEL'], zlib.DEFLATED, 31)
+            process, finish = compressor.compress, compressor.flush
+        return self._iter_compressed(chunks, process, finish)
+
+    @staticmethod
+    def _iter_compressed(chunks, process, finish):
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                data = process(chunk)
+                if data:
+                    yield data
+            yield finish()
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+
+    def after_request(self, response):
+        if not self.config['COMPRESS_ENABLED']:
+            return response
+        if not 200 <= response.status_code < 300 or response.status_code == 204:
+            return response
+        if response.direct_passthrough or 'Content-Encoding' in response.headers:
+            return response
+        if response.mimetype not in self.config['COMPRESS_MIMETYPES']:
+            return response
+
+        encoding = self._choose_encoding()
+        response.vary.add('Accept-Encoding')
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = self._compress_stream(response.response, encoding)
+            response.headers.pop('Content-Length', None)
+            response.headers['Content-Encoding'] = encoding
+            return response
+
+        body = response.get_data()
+        if len(body) < self.config['COMPRESS_MIN_SIZE']:
+            return response
+
+        cache_key = None
+        if request.method == 'GET' and response.status_code == 200:
+            etag, weak = response.get_etag()
+            base_etag = etag or hashlib.blake2b(body, digest_size=16).hexdigest()
+            # ETag por representação: o corpo comprimido é outro conteúdo.
+            # Um ETag fraco da rota continua fraco
+            response.set_etag(f'{base_etag}-{encoding}', weak=weak)
+            response.make_conditional(request)
+            if response.status_code == 304:
+                return response
+            # Só ETags fortes da rota identificam o corpo; o mesmo ETag pode
+            # servir JSON e MessagePack, então o tipo entra na chave
+            if etag and not weak:
+                cache_key = (etag, response.content_type, encoding)
+
+        compressed = self.cache.get(cache_key) if cache_key else None
+        if compressed is None:
+            compressed = self._compress(body, encoding)
+            if cache_key:
+                self.cache.set(cache_key, compressed)
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        return response
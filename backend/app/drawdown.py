@@ -0,0 +1,153 @@
+from decimal import Decimal
+from sqlalchemy import text
+from . import db
+from .analytics import SIGNED_AMOUNT_SQL
+from .cache import cache_get, cache_set
+from .sync import get_changes_since, get_ledger_version, get_sync_floor
+
+# Acima disso (mudanças desde o estado em cache) recalcular sai mais barato
+INCREMENTAL_CHANGE_LIMIT = 500
+
+# Estado do drawdown sobre a série de saldo (transações em ordem de data, id):
+# posição da última transação lida, saldo e pico correntes e o pior
+# pico-vale já visto. É tudo que a dobra precisa para seguir com novas linhas.
+EMPTY_STATE = {
+    'last_id': None,
+    'last_date': None,
+    'balance': Decimal('0.00'),
+    'peak': None,
+    'peak_date': None,
+    'max_drawdown': Decimal('0.00'),
+    'max_peak': None,
+    'max_peak_date': None,
+    'trough': None,
+    'trough_date': None,
+    'recovery_date': None,
+}
+
+# === FULL SCAN ===
+
+def compute_drawdown_state(user_id):
+    """
+    Estado completo em uma consulta: saldo corrente e pico corrente por
+    janelas (sum/max OVER date, id), pior distância pico-vale, a data do
+    pico que a precede e a primeira volta ao pico depois do vale.
+    """
+    row = db.session.execute(text(f"""
+        WITH series AS (
+            SELECT id, date, sum({SIGNED_AMOUNT_SQL}) OVER (ORDER BY date, id) AS balance
+            FROM transactions
+            WHERE user_id = :user_id
+        ),
+        peaks AS (
+            SELECT id, date, balance, max(balance) OVER (ORDER BY date, id) AS peak
+            FROM series
+        ),
+        last AS (
+            SELECT * FROM peaks ORDER BY date DESC, id DESC LIMIT 1
+        ),
+        trough AS (
+            SELECT * FROM peaks WHERE peak > balance
+            ORDER BY peak - balance DESC, date, id LIMIT 1
+        )
+        SELECT
+            last.id AS last_id,
+            last.date AS last_date,
+            last.balance,
+            last.peak,
+            (SELECT max(date) FROM peaks WHERE balance = last.peak) AS peak_date,
+            coalesce(trough.peak - trough.balance, 0.00) AS max_drawdown,
+            trough.peak AS max_peak,
+            (SELECT p.date FROM peaks p
+             WHERE p.balance = trough.peak AND (p.date, p.id) <= (trough.date, trough.id)
+             ORDER BY p.date DESC, p.id DESC LIMIT 1) AS max_peak_date,
+            trough.balance AS trough,
+            trough.date AS trough_date,
+            (SELECT p.date FROM peaks p
+             WHERE p.balance >= trough.peak AND (p.date, p.id) > (trough.date, trough.id)
+             ORDER BY p.date, p.id LIMIT 1) AS recovery_date
+        FROM last
+        LEFT JOIN trough ON true
+    """), {'user_id': user_id}).one_or_none()
+
+    return dict(row._mapping) if row else dict(EMPTY_STATE)
+
+# === INCREMENTAL ===
+
+def extend_drawdown_state(state, rows):
+    """
+    Avança o estado com novas linhas (id, date, valor com sinal) já em ordem,
+    em uma passada O(k) sobre as linhas novas.
+    """
+    state = dict(state)
+    for tx_id, tx_date, amount in rows:
+        balance = state['balance'] + amount
+        state.update(balance=balance, last_id=tx_id, last_date=tx_date)
+
+        if state['peak'] is None or balance >= state['peak']:
+            state.update(peak=balance, peak_date=tx_date)
+
+        drawdown = state['peak'] - balance
+        if drawdown > state['max_drawdown']:
+            state.update(
+                max_drawdown=drawdown,
+                max_peak=state['peak'],
+                max_peak_date=state['peak_date'],
+                trough=balance,
+                trough_date=tx_date,
+                recovery_date=None
+            )
+        elif state['max_peak'] is not None and state['recovery_date'] is None and balance >= state['max_peak']:
+            state['recovery_date'] = tx_date
+    return state
+
+def _appended_rows(user_id, state):
+    """
+    Linhas novas desde o estado, ou None quando o que mudou não é só append
+    (edição ou exclusão, transação retroativa, histórico compactado).
+    """
+    version = state['version']
+    if version < get_sync_floor(user_id):
+        return None
+
+    changes, _, has_more = get_changes_since(user_id, version, INCREMENTAL_CHANGE_LIMIT)
+    if has_more:
+        return None
+    last_id = state['last_id'] or 0
+    for (entity, entity_id), operation in changes.items():
+        if entity == 'transaction' and (operation == 'delete' or entity_id <= last_id):
+            return None
+
+    rows = db.session.execute(text(f"""
+        SELECT id, date, {SIGNED_AMOUNT_SQL} AS amount
+        FROM transactions
+        WHERE user_id = :user_id AND id > :last_id
+        ORDER BY date, id
+    """), {'user_id': user_id, 'last_id': last_id}).all()
+
+    if rows and state['last_date'] is not None and (rows[0].date, rows[0].id) < (state['last_date'], last_id):
+        return None
+    return rows
+
+def refresh_drawdown_state(user_id, state, version):
+    """Estado na versão `version`: dobra só os appends quando possível, senão recalcula"""
+    if state is not None and state.get('version') == version:
+        return state
+
+    rows = _appended_rows(user_id, state) if state is not None else None
+    if rows is None:
+        new_state = compute_drawdown_state(user_id)
+    else:
+        new_state = extend_drawdown_state(state, rows)
+    new_state['version'] = version
+    return new_state
+
+def get_drawdown(user_id):
+    """Estado do drawdown do usuário, guardado em cache entre versões do ledger"""
+    key = f'drawdown:{user_id}'
+    version = get_ledger_version(user_id)
+    state = cache_get(key)
+    new_state = refresh_drawdown_state(user_id, state, version)
+    if new_state is not state:
+        cache_set(key, new_state)
+    return new_state
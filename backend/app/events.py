@@ -0,0 +1,169 @@
+import json
+import queue
+import threading
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from . import db
+from .models import Transaction, BettingProfile, Objective, BettingSession
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - depende do ambiente
+    redis = None
+
+# Eventos publicados após o commit. O stream SSE enriquece `balance_changed`
+# com o saldo atual (e stop_loss_approached) só para quem está conectado,
+# então a escrita não paga consultas extras.
+BALANCE_CHANGED = 'balance_changed'
+OBJECTIVE_COMPLETED = 'objective_completed'
+SESSION_UPDATED = 'session_updated'
+
+# === BROKERS ===
+
+class _Subscription:
+    def __init__(self, get, close):
+        self.get = get
+        self.close = close
+
+class MemoryBroker:
+    """Fan-out em processo (um único worker / desenvolvimento)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queues = {}
+
+    def publish(self, user_id, message):
+        with self._lock:
+            targets = list(self._queues.get(user_id, ()))
+        for q in targets:
+            q.put(message)
+
+    def subscribe(self, user_id):
+        q = queue.Queue()
+        with self._lock:
+            self._queues.setdefault(user_id, set()).add(q)
+
+        def get(timeout):
+            try:
+                return q.get(timeout=timeout)
+            except queue.Empty:
+                return None
+
+        def close():
+            with self._lock:
+                subscribers = self._queues.get(user_id)
+                if subscribers is not None:
+                    subscribers.discard(q)
+                    if not subscribers:
+                        del self._queues[user_id]
+
+        return _Subscription(get, close)
+
+class RedisBroker:
+    """Fan-out entre workers/instâncias via Redis pub/sub"""
+
+    def __init__(self, url):
+        self._client = redis.Redis.from_url(url)
+
+    @staticmethod
+    def _channel(user_id):
+        return f'events:{user_id}'
+
+    def publish(self, user_id, message):
+        self._client.publish(self._channel(user_id), json.dumps(message))
+
+    def subscribe(self, user_id):
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self._channel(user_id))
+
+        def get(timeout):
+            message = pubsub.get_message(timeout=timeout)
+            return json.loads(message['data']) if message else None
+
+        return _Subscription(get, pubsub.close)
+
+def init_events(app):
+    """
+    Escolhe o broker (EVENTS_BACKEND) e registra os listeners da sessão.
+    Com mais de um worker (WEB_CONCURRENCY) o broker em memória perderia os
+    eventos publicados nos outros processos, então o Redis é obrigatório.
+    """
+    backend = app.config.get('EVENTS_BACKEND', 'memory')
+    workers = app.config.get('WEB_CONCURRENCY', 1)
+    if backend == 'redis':
+        if redis is None:
+            raise RuntimeError('EVENTS_BACKEND=redis requer o pacote redis')
+        app.extensions['events'] = RedisBroker(app.config['REDIS_URL'])
+    elif workers > 1:
+        raise RuntimeError(
+            f'EVENTS_BACKEND={backend} não entrega eventos entre {workers} workers; use EVENTS_BACKEND=redis'
+        )
+    else:
+        app.extensions['events'] = MemoryBroker()
+
+    if not event.contains(db.session, 'after_flush', _after_flush):
+        event.listen(db.session, 'after_flush', _after_flush)
+        event.listen(db.session, 'after_commit', _after_commit)
+        event.listen(db.session, 'after_soft_rollback', _after_rollback)
+
+def get_broker():
+    return current_app.extensions['events']
+
+# === WRITE PATH ===
+
+def _collect_events(session):
+    events = {}
+
+    def add(user_id, name, **data):
+        if user_id is not None:
+            events[(user_id, name, data.get('id'))] = {'event': name, 'user_id': user_id, 'data': data}
+
+    changed = list(session.new) + [obj for obj in session.dirty if session.is_modified(obj)]
+    for obj in changed + list(session.deleted):
+        if isinstance(obj, (Transaction, BettingProfile)):
+            add(obj.user_id, BALANCE_CHANGED)
+        elif isinstance(obj, BettingSession):
+            add(obj.user_id, SESSION_UPDATED, id=obj.id, status=obj.status)
+
+    for obj in changed:
+        if isinstance(obj, Objective) and _became_completed(obj):
+            add(obj.user_id, OBJECTIVE_COMPLETED, id=obj.id, title=obj.title)
+
+    return events
+
+def _became_completed(objective):
+    """True quando o flush atual marcou o objetivo como concluído"""
+    state = db.inspect(objective)
+    status = state.attrs.status.history
+    achieved = state.attrs.is_achieved.history
+    return (
+        (status.has_changes() and objective.status == 'completed')
+        or (achieved.has_changes() and objective.is_achieved)
+    )
+
+def _after_flush(session, flush_context):
+    events = _collect_events(session)
+    if events:
+        session.info.setdefault('pending_events', {}).update(events)
+
+def _after_commit(session):
+    events = session.info.pop('pending_events', None)
+    if not events or not has_app_context():
+        return
+    broker = current_app.extensions.get('events')
+    if broker is None:
+        return
+    for message in events.values():
+        try:
+            broker.publish(message['user_id'], message)
+        except Exception as e:
+            # Falha no broker não pode derrubar a escrita já confirmada
+            current_app.logger.warning(f'Falha ao publicar evento: {str(e)}')
+
+def _after_rollback(session, previous_transaction):
+    session.info.pop('pending_events', None)
+
+# === SSE ===
+
+def format_sse(name, data):
+    return f'event: {name}\ndata: {json.dumps(data, default=str)}\n\n'
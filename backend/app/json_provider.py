@@ -0,0 +1,95 @@
+import json
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+from flask import has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+
+
+def default_encoder(obj):
+    """
+    Codifica os tipos que vêm direto das linhas do banco mantendo o contrato
+    atual da API: Decimal como string ("100.00") e datas em ISO 8601. As
+    rotas entregam as linhas (Row) como vieram da consulta; cada uma vira
+    objeto aqui, durante a codificação, sem uma lista de dicts antes.
+    """
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if hasattr(obj, '_asdict'):
+        return obj._asdict()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Provider JSON do Flask baseado em orjson quando disponível.
+    Decimal, datetime e date são codificados nativamente, então as rotas
+    podem entregar valores das linhas sem str()/isoformat() por campo.
+    Sem orjson, cai para o json da stdlib com o mesmo encoder.
+    """
+
+    def _orjson_option(self, indent=False):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None:
+            try:
+                return orjson.dumps(
+                    obj,
+                    default=default_encoder,
+                    option=self._orjson_option(indent=bool(kwargs.get('indent')))
+                ).decode('utf-8')
+            except (orjson.JSONEncodeError, TypeError):
+                pass  # Ex.: inteiros acima de 64 bits; o json da stdlib resolve
+
+        kwargs.setdefault('default', default_encoder)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def dump_bytes(self, obj, indent=False):
+        """Serializa direto para bytes (evita a volta por str no orjson)"""
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj, default=default_encoder, option=self._orjson_option(indent))
+            except (orjson.JSONEncodeError, TypeError):
+                pass
+        kwargs = {'indent': 2} if indent else {'separators': (',', ':')}
+        return self.dumps(obj, **kwargs).encode('utf-8')
+
+    def response(self, *args, **kwargs):
+        """
+        Ponto central de resposta do jsonify. Rotas do blueprint `main`
+        respondem em MessagePack quando o cliente pede via Accept.
+        """
+        from .msgpack_codec import NEGOTIATED_BLUEPRINTS, msgpack_response, wants_msgpack
+
+        obj = self._prepare_response_obj(args, kwargs)
+        if wants_msgpack():
+            return msgpack_response(self._app, obj)
+
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = self.dump_bytes(obj, indent=indent) + b'\n'
+        response = self._app.response_class(body, mimetype=self.mimetype)
+        if has_request_context() and request.blueprint in NEGOTIATED_BLUEPRINTS:
+            response.vary.add('Accept')
+        return response
@@ -1,6 +1,6 @@
 import pytz
 from . import db
-from sqlalchemy.dialects.postgresql import JSON
+from sqlalchemy.dialects.postgresql import JSON, TSVECTOR
 from datetime import datetime
 from decimal import Decimal
 
@@ -87,11 +87,19 @@ class Transaction(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Busca textual (gerada pelo Postgres; categoria pesa mais que a descrição)
+    search_vector = db.deferred(db.Column(TSVECTOR, db.Computed(
+        "setweight(to_tsvector('portuguese', coalesce(category, '')), 'A') || "
+        "setweight(to_tsvector('portuguese', coalesce(description, '')), 'B')",
+        persisted=True
+    )))
+    
     # Indexes for better performance
     __table_args__ = (
         db.Index('idx_user_date', 'user_id', 'date'),
         db.Index('idx_user_type', 'user_id', 'type'),
         db.Index('idx_user_category', 'user_id', 'category'),
+        db.Index('idx_transactions_search', 'search_vector', postgresql_using='gin'),
     )
 
 class Objective(db.Model):
@@ -180,6 +188,12 @@ class BettingStats(db.Model):
     total_deposits = db.Column(db.Numeric(12, 2), default=Decimal('0.00'))
     total_withdrawals = db.Column(db.Numeric(12, 2), default=Decimal('0.00'))
     net_profit_loss = db.Column(db.Numeric(12, 2), default=Decimal('0.00'))
+    total_gains = db.Column(db.Numeric(12, 2), default=Decimal('0.00'))
+    total_losses = db.Column(db.Numeric(12, 2), default=Decimal('0.00'))
+    transaction_count = db.Column(db.Integer, default=0)
+    sessions_net_result = db.Column(db.Numeric(12, 2), default=Decimal('0.00'))
+    best_session = db.Column(db.Numeric(12, 2))
+    worst_session = db.Column(db.Numeric(12, 2))
     
     # Betting Stats
     total_sessions = db.Column(db.Integer, default=0)
@@ -204,4 +218,61 @@ class BettingStats(db.Model):
     __table_args__ = (
         db.UniqueConstraint('user_id', 'period_type', 'period_date', name='unique_user_period_stats'),
         db.Index('idx_user_period', 'user_id', 'period_type', 'period_date'),
-    )
\ No newline at end of file
+    )
+
+class ChangeLog(db.Model):
+    __tablename__ = 'change_log'
+    
+    id = db.Column(db.BigInteger, primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    
+    # Sequência por usuário na ordem de commit (sync_state.last_seq); o token
+    # de sincronização é o último seq visto pelo cliente
+    seq = db.Column(db.BigInteger, nullable=False)
+    
+    # Entidade alterada
+    entity = db.Column(db.String(20), nullable=False)  # transaction, objective, profile, user
+    entity_id = db.Column(db.Integer, nullable=False)
+    operation = db.Column(db.String(10), nullable=False)  # upsert, delete
+    
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'seq', name='unique_change_log_user_seq'),
+        db.Index('idx_change_log_created', 'created_at'),
+    )
+
+class SyncState(db.Model):
+    __tablename__ = 'sync_state'
+    
+    user_id = db.Column(db.Integer, primary_key=True)
+    
+    # Maior seq do change_log já removido pela compactação para este usuário
+    compacted_through = db.Column(db.BigInteger, nullable=False, default=0)
+    
+    # Último seq atribuído; incrementado com a linha travada até o commit,
+    # então os seqs de um usuário ficam visíveis em ordem
+    last_seq = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class AutocompleteTerm(db.Model):
+    __tablename__ = 'autocomplete_terms'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    
+    # Campo de origem e termo como digitado pelo usuário
+    field = db.Column(db.String(20), nullable=False)  # category, description
+    term = db.Column(db.String(200), nullable=False)
+    
+    # Frequência de uso, mantida na escrita das transações
+    uses = db.Column(db.Integer, nullable=False, default=0)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'field', 'term', name='unique_user_field_term'),
+        db.Index(
+            'idx_autocomplete_prefix', 'user_id', 'field', db.text('lower(term) text_pattern_ops')
+        ),
+    )
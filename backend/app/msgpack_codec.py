@@ -0,0 +1,43 @@
+from flask import has_request_context, request
+from .json_provider import default_encoder
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depende do ambiente
+    msgpack = None
+
+MSGPACK_MIMETYPE = 'application/msgpack'
+MSGPACK_MIMETYPES = (MSGPACK_MIMETYPE, 'application/x-msgpack')
+
+# Blueprints cujas respostas negociam MessagePack via Accept
+NEGOTIATED_BLUEPRINTS = ('main',)
+
+
+def wants_msgpack():
+    """True quando o cliente prefere MessagePack a JSON no header Accept"""
+    if msgpack is None or not has_request_context():
+        return False
+    if request.blueprint not in NEGOTIATED_BLUEPRINTS:
+        return False
+    best = request.accept_mimetypes.best_match(('application/json',) + MSGPACK_MIMETYPES)
+    return best in MSGPACK_MIMETYPES
+
+
+def packb(obj):
+    """
+    Serializa para MessagePack com o mesmo contrato de valores do JSON:
+    Decimal como string ("100.00") e datas em ISO 8601. As rotas entregam
+    ora valores das linhas, ora já formatados; uma codificação só garante
+    que o mesmo campo tenha o mesmo tipo em todas elas.
+    """
+    return msgpack.packb(obj, default=default_encoder, use_bin_type=True)
+
+
+def unpackb(data):
+    return msgpack.unpackb(data, raw=False)
+
+
+def msgpack_response(app, obj):
+    response = app.response_class(packb(obj), mimetype=MSGPACK_MIMETYPE)
+    response.vary.add('Accept')
+    return response
@@ -0,0 +1,250 @@
+import csv
+import math
+import statistics
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import create_engine, text
+
+try:
+    import pyarrow
+    import pyarrow.parquet as parquet
+except ImportError:  # pragma: no cover - depende do ambiente
+    pyarrow = None
+
+# Colunas por usuário (linhas do CSV/Parquet)
+USER_COLUMNS = (
+    'user_id', 'transactions', 'deposits', 'withdrawals', 'gains', 'losses',
+    'net_result', 'initial_bank', 'roi', 'last_activity'
+)
+
+ROI_PERCENTILES = (10, 25, 50, 75, 90)
+
+# Um usuário por linha para a faixa [first_id, last_id): agregação no banco
+# pela faixa de user_id (índice idx_user_date), banca inicial como no resumo
+# do ledger (transação inicial ou perfil ativo)
+CHUNK_SQL = """
+    WITH totals AS (
+        SELECT
+            user_id,
+            count(*) AS transactions,
+            coalesce(sum(amount) FILTER (WHERE type = 'deposit'), 0.00) AS deposits,
+            coalesce(sum(amount) FILTER (WHERE type = 'withdraw'), 0.00) AS withdrawals,
+            coalesce(sum(amount) FILTER (WHERE type = 'gains'), 0.00) AS gains,
+            coalesce(sum(amount) FILTER (WHERE type = 'losses'), 0.00) AS losses,
+            (array_agg(amount ORDER BY id) FILTER (WHERE is_initial_bank))[1] AS initial_tx,
+            max(date) AS last_activity
+        FROM transactions
+        WHERE user_id >= :first_id AND user_id < :last_id
+        GROUP BY user_id
+    ),
+    profiles AS (
+        SELECT DISTINCT ON (user_id) user_id, initial_balance
+        FROM betting_profiles
+        WHERE is_active AND user_id >= :first_id AND user_id < :last_id
+        ORDER BY user_id, id
+    )
+    SELECT
+        t.user_id, t.transactions, t.deposits, t.withdrawals, t.gains, t.losses,
+        t.gains - t.losses AS net_result,
+        coalesce(t.initial_tx, p.initial_balance, 0.00) AS initial_bank,
+        t.last_activity
+    FROM totals t
+    LEFT JOIN profiles p ON p.user_id = t.user_id
+    ORDER BY t.user_id
+"""
+
+# === READ CONNECTION ===
+
+def create_report_engine(config, workers):
+    """
+    Engine só do relatório (REPORT_DATABASE_URL, uma réplica de leitura de
+    preferência), separada do pool da API e dimensionada pelos workers.
+    """
+    url = config.get('REPORT_DATABASE_URL') or config['SQLALCHEMY_DATABASE_URI']
+    return create_engine(url, pool_size=workers, max_overflow=0, pool_pre_ping=True)
+
+def _read_only(connection, statement_timeout, lock_timeout):
+    """
+    Transação READ ONLY com cursor no servidor (stream_results). Leituras só
+    pegam ACCESS SHARE, que não bloqueia as escritas da API. lock_timeout
+    impede que o relatório fique na fila atrás de uma migração (e segure a
+    API atrás dele).
+    """
+    connection = connection.execution_options(postgresql_readonly=True, stream_results=True)
+    transaction = connection.begin()
+    connection.execute(text("SELECT set_config('statement_timeout', :value, true)"), {'value': str(statement_timeout)})
+    connection.execute(text("SELECT set_config('lock_timeout', :value, true)"), {'value': str(lock_timeout)})
+    return connection, transaction
+
+# === AGGREGATION ===
+
+def user_id_chunks(engine, chunk_size, statement_timeout, lock_timeout):
+    """Faixas [first_id, last_id) de user_id com até chunk_size ids cada"""
+    with engine.connect() as connection:
+        connection, transaction = _read_only(connection, statement_timeout, lock_timeout)
+        low, high = connection.execute(text('SELECT min(id), max(id) FROM users')).one()
+        transaction.rollback()
+    if low is None:
+        return []
+    return [(first, min(first + chunk_size, high + 1)) for first in range(low, high + 1, chunk_size)]
+
+def _user_row(row):
+    roi = (row.net_result / row.initial_bank * 100).quantize(Decimal('0.01')) if row.initial_bank > 0 else None
+    return {
+        'user_id': row.user_id,
+        'transactions': row.transactions,
+        'deposits': row.deposits,
+        'withdrawals': row.withdrawals,
+        'gains': row.gains,
+        'losses': row.losses,
+        'net_result': row.net_result,
+        'initial_bank': row.initial_bank,
+        'roi': roi,
+        'last_activity': row.last_activity,
+    }
+
+def aggregate_chunk(engine, chunk, batch_size, statement_timeout, lock_timeout):
+    """Linhas por usuário de uma faixa, lidas em lotes do cursor no servidor"""
+    first_id, last_id = chunk
+    with engine.connect() as connection:
+        connection, transaction = _read_only(connection, statement_timeout, lock_timeout)
+        result = connection.execution_options(yield_per=batch_size).execute(
+            text(CHUNK_SQL), {'first_id': first_id, 'last_id': last_id}
+        )
+        rows = [_user_row(row) for row in result]
+        transaction.rollback()
+    return rows
+
+class PlatformTotals:
+    """KPIs da plataforma acumulados faixa a faixa"""
+
+    def __init__(self, active_since):
+        self.active_since = active_since
+        self.users_with_transactions = 0
+        self.active_users = 0
+        self.profitable_users = 0
+        self.transactions = 0
+        self.sums = {column: Decimal('0.00') for column in ('deposits', 'withdrawals', 'gains', 'losses')}
+        self.rois = []
+
+    def add(self, rows):
+        for row in rows:
+            self.users_with_transactions += 1
+            self.transactions += row['transactions']
+            for column in self.sums:
+                self.sums[column] += row[column]
+            if row['last_activity'] >= self.active_since:
+                self.active_users += 1
+            if row['net_result'] > 0:
+                self.profitable_users += 1
+            if row['roi'] is not None:
+                self.rois.append(float(row['roi']))
+
+    def summary(self, total_users):
+        rois = sorted(self.rois)
+        return {
+            'total_users': total_users,
+            'users_with_transactions': self.users_with_transactions,
+            'active_users': self.active_users,
+            'profitable_users': self.profitable_users,
+            'transactions': self.transactions,
+            **{f'total_{column}': value for column, value in self.sums.items()},
+            'net_result': self.sums['gains'] - self.sums['losses'],
+            'roi_mean': round(statistics.fmean(rois), 2) if rois else None,
+            'roi_percentiles': {f'p{p}': _percentile(rois, p) for p in ROI_PERCENTILES} if rois else {},
+        }
+
+def _percentile(sorted_values, p):
+    """Percentil com interpolação linear (mesmo método padrão do NumPy)"""
+    position = (len(sorted_values) - 1) * p / 100
+    low, high = math.floor(position), math.ceil(position)
+    value = sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - low)
+    return round(value, 2)
+
+# === OUTPUT ===
+
+class _CsvWriter:
+    def __init__(self, path):
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=USER_COLUMNS)
+        self._writer.writeheader()
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+class _ParquetWriter:
+    def __init__(self, path):
+        money = pyarrow.decimal128(14, 2)
+        schema = pyarrow.schema([
+            ('user_id', pyarrow.int64()),
+            ('transactions', pyarrow.int64()),
+            ('deposits', money),
+            ('withdrawals', money),
+            ('gains', money),
+            ('losses', money),
+            ('net_result', money),
+            ('initial_bank', money),
+            ('roi', pyarrow.decimal128(18, 2)),
+            ('last_activity', pyarrow.timestamp('us')),
+        ])
+        self._writer = parquet.ParquetWriter(path, schema)
+        self._schema = schema
+
+    def write(self, rows):
+        if rows:
+            self._writer.write_table(pyarrow.Table.from_pylist(rows, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+def open_output(path):
+    """Writer por usuário conforme a extensão (.csv ou .parquet)"""
+    if path.endswith('.parquet'):
+        if pyarrow is None:
+            raise RuntimeError('Saída Parquet requer o pacote pyarrow')
+        return _ParquetWriter(path)
+    if path.endswith('.csv'):
+        return _CsvWriter(path)
+    raise ValueError('Formato de saída não suportado (use .csv ou .parquet)')
+
+# === REPORT ===
+
+def build_platform_report(config, chunk_size=10000, workers=4, active_days=30, output=None,
+                          batch_size=5000, statement_timeout=600000, lock_timeout=1000):
+    """
+    KPIs de toda a plataforma: as faixas de usuários são agregadas em
+    paralelo (uma conexão de leitura por worker) e dobradas aqui à medida que
+    terminam, gravando as linhas por usuário em `output` quando informado.
+    """
+    engine = create_report_engine(config, workers)
+    writer = open_output(output) if output else None
+    totals = PlatformTotals(datetime.utcnow() - timedelta(days=active_days))
+    try:
+        chunks = user_id_chunks(engine, chunk_size, statement_timeout, lock_timeout)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(aggregate_chunk, engine, chunk, batch_size, statement_timeout, lock_timeout)
+                for chunk in chunks
+            ]
+            for future in as_completed(futures):
+                rows = future.result()
+                totals.add(rows)
+                if writer:
+                    writer.write(rows)
+
+        with engine.connect() as connection:
+            connection, transaction = _read_only(connection, statement_timeout, lock_timeout)
+            total_users = connection.execute(text('SELECT count(*) FROM users')).scalar()
+            transaction.rollback()
+    finally:
+        if writer:
+            writer.close()
+        engine.dispose()
+
+    report = totals.summary(total_users)
+    report['chunks'] = len(chunks)
+    return report
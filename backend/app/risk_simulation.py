@@ -0,0 +1,135 @@
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depende do ambiente
+    np = None
+
+# Desvio padrão do resultado de uma rodada por unidade apostada para cada
+# rótulo de volatilidade de GAME_CONFIGURATIONS (aproximação: o resultado
+# da rodada é normal com média -house_edge)
+VOLATILITY_STD = {
+    'low': 0.5,
+    'medium': 1.0,
+    'high': 2.0,
+    'very_high': 4.0,
+}
+
+SESSION_LENGTH_PERCENTILES = (10, 25, 50, 75, 90)
+HISTOGRAM_BINS = 10
+
+# Verificação do orçamento de tempo a cada N rodadas
+BUDGET_CHECK_EVERY = 25
+
+# === SIMULATION ===
+
+def simulate_bankroll_paths(start, floor, target, games, paths, max_rounds, time_budget, seed=None):
+    """
+    Simula `paths` trajetórias de banca ao mesmo tempo, rodada a rodada,
+    vetorizado sobre as trajetórias ainda abertas. `games` é uma lista de
+    (peso, aposta, house_edge em fração, desvio padrão por unidade). Uma
+    trajetória termina ao chegar em `floor` (stop loss) ou em `target` (se
+    houver). Para ao estourar `time_budget` segundos, marcando truncated.
+    Só usa tipos simples, para rodar em outro processo.
+    """
+    rng = np.random.default_rng(seed)
+    weights = np.array([game[0] for game in games], dtype=float)
+    weights /= weights.sum()
+    bets = np.array([game[1] for game in games], dtype=float)
+    edges = np.array([game[2] for game in games], dtype=float)
+    stds = np.array([game[3] for game in games], dtype=float)
+
+    balance = np.full(paths, float(start))
+    outcome = np.zeros(paths, dtype=np.int8)  # -1 stop loss, 1 meta, 0 em aberto
+    length = np.zeros(paths, dtype=np.int64)
+    active = np.arange(paths)
+    started = time.perf_counter()
+    rounds = 0
+    truncated = False
+
+    while active.size and rounds < max_rounds:
+        if rounds % BUDGET_CHECK_EVERY == 0 and time.perf_counter() - started > time_budget:
+            truncated = True
+            break
+        rounds += 1
+
+        picks = rng.choice(len(games), size=active.size, p=weights) if len(games) > 1 else np.zeros(active.size, dtype=int)
+        results = bets[picks] * (stds[picks] * rng.standard_normal(active.size) - edges[picks])
+        current = balance[active] + results
+        balance[active] = current
+
+        hit_stop = current <= floor
+        hit_target = current >= target if target is not None else np.zeros(active.size, dtype=bool)
+        done = hit_stop | hit_target
+        if done.any():
+            outcome[active[hit_stop]] = -1
+            outcome[active[hit_target & ~hit_stop]] = 1
+            length[active[done]] = rounds
+            active = active[~done]
+
+    length[active] = rounds
+    return _summarize(outcome, length, balance, rounds, truncated)
+
+def _percentiles(values):
+    if not values.size:
+        return {}
+    return {
+        f'p{p}': round(float(value), 2)
+        for p, value in zip(SESSION_LENGTH_PERCENTILES, np.percentile(values, SESSION_LENGTH_PERCENTILES))
+    }
+
+def _summarize(outcome, length, balance, rounds, truncated):
+    """Probabilidades de cada desfecho e distribuição da duração das sessões"""
+    finished = length[outcome != 0]
+    if finished.size:
+        counts, edges = np.histogram(finished, bins=HISTOGRAM_BINS)
+    else:
+        counts, edges = np.array([]), np.array([])
+
+    return {
+        'paths': int(outcome.size),
+        'rounds_simulated': rounds,
+        'truncated': truncated,
+        'stop_loss_probability': round(float(np.mean(outcome == -1)), 4),
+        'target_probability': round(float(np.mean(outcome == 1)), 4),
+        'open_probability': round(float(np.mean(outcome == 0)), 4),
+        'final_balance': _percentiles(balance),
+        'session_length': {
+            'mean': round(float(finished.mean()), 2) if finished.size else None,
+            'percentiles': _percentiles(finished),
+            'histogram': {
+                'edges': [round(float(edge), 2) for edge in edges],
+                'counts': [int(count) for count in counts]
+            },
+            'unfinished_paths': int(np.sum(outcome == 0))
+        }
+    }
+
+# === PROCESS POOL ===
+
+_executor = None
+_executor_lock = Lock()
+
+def _get_executor(workers):
+    """Pool de processos compartilhado (spawn: o worker não herda conexões do app)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('spawn')
+            )
+        return _executor
+
+def run_simulation(params, workers, time_budget):
+    """
+    Roda a simulação no pool (ou no próprio processo com workers=0). A
+    simulação respeita o orçamento sozinha; a folga no result() só cobre a
+    partida do processo. Levanta TimeoutError se nem assim terminar.
+    """
+    if not workers:
+        return simulate_bankroll_paths(time_budget=time_budget, **params)
+    future = _get_executor(workers).submit(simulate_bankroll_paths, time_budget=time_budget, **params)
+    return future.result(timeout=time_budget + 10)
@@ -0,0 +1,273 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+import pytz
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, inspect, text
+from sqlalchemy.dialects.postgresql import insert
+from . import db
+from .models import Transaction, BettingSession, BettingStats
+
+# Períodos mantidos quando não há app (STATS_CALCULATION_PERIODS na config)
+DEFAULT_ROLLUP_PERIODS = ('daily', 'weekly', 'monthly', 'yearly')
+
+# Coluna do rollup somada por tipo de transação
+ROLLUP_COLUMNS = {
+    'gains': 'total_gains',
+    'losses': 'total_losses',
+    'deposit': 'total_deposits',
+    'withdraw': 'total_withdrawals',
+}
+
+PERIOD_TRUNC = {'daily': 'day', 'weekly': 'week', 'monthly': 'month', 'yearly': 'year'}
+
+def _timezone():
+    tz_name = current_app.config.get('DEFAULT_TIMEZONE') if has_app_context() else None
+    return pytz.timezone(tz_name or 'America/Sao_Paulo')
+
+def rollup_periods():
+    if has_app_context():
+        return tuple(current_app.config.get('STATS_CALCULATION_PERIODS', DEFAULT_ROLLUP_PERIODS))
+    return DEFAULT_ROLLUP_PERIODS
+
+def period_start(day, period_type):
+    """Data que identifica o período (segunda-feira, dia 1, 1º de janeiro)"""
+    if period_type == 'weekly':
+        return day - timedelta(days=day.weekday())
+    if period_type == 'monthly':
+        return day.replace(day=1)
+    if period_type == 'yearly':
+        return day.replace(month=1, day=1)
+    return day
+
+def _period_keys(user_id, when, tz):
+    # Datas sem fuso são UTC (datetime.utcnow); com fuso, convertidas direto
+    if when.tzinfo is None:
+        when = pytz.utc.localize(when)
+    local_day = when.astimezone(tz).date()
+    return [
+        (user_id, period_type, period_start(local_day, period_type))
+        for period_type in rollup_periods()
+    ]
+
+# === WRITE PATH ===
+
+def _empty_delta():
+    delta = {column: Decimal('0.00') for column in ROLLUP_COLUMNS.values()}
+    delta['transaction_count'] = 0
+    return delta
+
+def _collect_transaction_deltas(session, tz):
+    """Variações por (usuário, período, data) a partir das transações do flush"""
+    deltas = defaultdict(_empty_delta)
+
+    def apply(user_id, tx_type, amount, when, sign):
+        if user_id is None or when is None or amount is None:
+            return
+        for key in _period_keys(user_id, when, tz):
+            delta = deltas[key]
+            column = ROLLUP_COLUMNS.get(tx_type)
+            if column:
+                delta[column] += sign * Decimal(amount)
+            delta['transaction_count'] += sign
+
+    def values(obj):
+        return obj.user_id, obj.type, obj.amount, obj.date
+
+    for obj in session.new:
+        if isinstance(obj, Transaction):
+            apply(*values(obj), 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, Transaction):
+            apply(*values(obj), -1)
+
+    for obj in session.dirty:
+        if not isinstance(obj, Transaction):
+            continue
+        state = inspect(obj)
+        fields = ('user_id', 'type', 'amount', 'date')
+        histories = [state.attrs[field].history for field in fields]
+        if not any(history.has_changes() for history in histories):
+            continue
+        # Valores anteriores saem do rollup antigo e os atuais entram no novo
+        previous = [
+            (history.deleted or history.unchanged or (getattr(obj, field),))[0]
+            for field, history in zip(fields, histories)
+        ]
+        apply(*previous, -1)
+        apply(*values(obj), 1)
+
+    return {
+        key: delta for key, delta in deltas.items()
+        if delta['transaction_count'] or any(delta[c] for c in ROLLUP_COLUMNS.values())
+    }
+
+def _collect_session_results(session, tz):
+    """
+    Sessões concluídas neste flush, agregadas por período de início. Uma
+    sessão só é concluída uma vez; correções posteriores passam pelo rebuild.
+    """
+    results = {}
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, BettingSession) or obj.status != 'completed':
+            continue
+        if obj not in session.new and not inspect(obj).attrs.status.history.has_changes():
+            continue
+        net = Decimal(obj.net_result or 0)
+        for key in _period_keys(obj.user_id, obj.started_at, tz):
+            row = results.setdefault(key, {
+                'total_sessions': 0, 'winning_sessions': 0, 'losing_sessions': 0,
+                'sessions_net_result': Decimal('0.00'), 'best_session': net, 'worst_session': net,
+            })
+            row['total_sessions'] += 1
+            row['winning_sessions'] += 1 if net > 0 else 0
+            row['losing_sessions'] += 1 if net < 0 else 0
+            row['sessions_net_result'] += net
+            row['best_session'] = max(row['best_session'], net)
+            row['worst_session'] = min(row['worst_session'], net)
+    return results
+
+def _upsert(session, rows, summed, extra_set=None):
+    table = BettingStats.__table__
+    stmt = insert(table)
+    set_ = {column: table.c[column] + stmt.excluded[column] for column in summed}
+    set_.update((extra_set or (lambda excluded: {}))(stmt.excluded))
+    set_['updated_at'] = stmt.excluded.updated_at
+    session.execute(stmt.on_conflict_do_update(constraint='unique_user_period_stats', set_=set_), rows)
+
+def _after_flush(session, flush_context):
+    tz = _timezone()
+
+    deltas = _collect_transaction_deltas(session, tz)
+    if deltas:
+        _upsert(session, [
+            {
+                'user_id': user_id,
+                'period_type': period_type,
+                'period_date': period_date,
+                'net_profit_loss': delta['total_gains'] - delta['total_losses'],
+                **delta,
+            }
+            for (user_id, period_type, period_date), delta in deltas.items()
+        ], list(ROLLUP_COLUMNS.values()) + ['net_profit_loss', 'transaction_count'])
+
+    results = _collect_session_results(session, tz)
+    if results:
+        table = BettingStats.__table__
+        _upsert(session, [
+            {'user_id': user_id, 'period_type': period_type, 'period_date': period_date, **row}
+            for (user_id, period_type, period_date), row in results.items()
+        ], ['total_sessions', 'winning_sessions', 'losing_sessions', 'sessions_net_result'],
+            lambda excluded: {
+                'best_session': func.greatest(table.c.best_session, excluded.best_session),
+                'worst_session': func.least(table.c.worst_session, excluded.worst_session),
+            })
+
+def init_rollup_tracking():
+    """Registra o listener que mantém os rollups de betting_stats"""
+    if not event.contains(db.session, 'after_flush', _after_flush):
+        event.listen(db.session, 'after_flush', _after_flush)
+
+# === QUERIES ===
+
+def get_rollup(user_id, period_type, period_date):
+    """Linha do rollup pela chave única (None se não houve movimento)"""
+    return BettingStats.query.filter_by(
+        user_id=user_id, period_type=period_type, period_date=period_date
+    ).first()
+
+def get_session_totals(user_id, first_day):
+    """Totais de sessões concluídas desde `first_day` somando os rollups diários"""
+    return db.session.query(
+        func.coalesce(func.sum(BettingStats.total_sessions), 0).label('total_sessions'),
+        func.coalesce(func.sum(BettingStats.winning_sessions), 0).label('winning_sessions'),
+        func.sum(BettingStats.sessions_net_result).label('total_profit'),
+        func.max(BettingStats.best_session).label('best_session'),
+        func.min(BettingStats.worst_session).label('worst_session')
+    ).filter(
+        BettingStats.user_id == user_id,
+        BettingStats.period_type == 'daily',
+        BettingStats.period_date >= first_day
+    ).one()
+
+# === MAINTENANCE ===
+
+def rebuild_rollups(user_id=None):
+    """
+    Recalcula (backfill) os rollups de todos os períodos a partir das
+    transações e das sessões concluídas (todos os usuários ou um).
+    """
+    params = {'tz': _timezone().zone, 'periods': list(rollup_periods())}
+    user_filter = ''
+    if user_id is not None:
+        user_filter = 'AND user_id = :user_id'
+        params['user_id'] = user_id
+
+    db.session.execute(text(f"""
+        DELETE FROM betting_stats
+        WHERE period_type = ANY(:periods) {user_filter}
+    """), params)
+
+    for period_type in rollup_periods():
+        trunc = PERIOD_TRUNC[period_type]
+        db.session.execute(text(f"""
+            INSERT INTO betting_stats (
+                user_id, period_type, period_date, total_gains, total_losses,
+                total_deposits, total_withdrawals, net_profit_loss, transaction_count,
+                total_sessions, winning_sessions, losing_sessions, sessions_net_result,
+                created_at, updated_at
+            )
+            SELECT
+                user_id,
+                '{period_type}',
+                CAST(date_trunc('{trunc}', (date AT TIME ZONE 'UTC') AT TIME ZONE :tz) AS date),
+                coalesce(sum(amount) FILTER (WHERE type = 'gains'), 0),
+                coalesce(sum(amount) FILTER (WHERE type = 'losses'), 0),
+                coalesce(sum(amount) FILTER (WHERE type = 'deposit'), 0),
+                coalesce(sum(amount) FILTER (WHERE type = 'withdraw'), 0),
+                coalesce(sum(amount) FILTER (WHERE type = 'gains'), 0)
+                    - coalesce(sum(amount) FILTER (WHERE type = 'losses'), 0),
+                count(*),
+                0, 0, 0, 0,
+                now(),
+                now()
+            FROM transactions
+            WHERE true {user_filter}
+            GROUP BY 1, 3
+        """), params)
+
+        db.session.execute(text(f"""
+            INSERT INTO betting_stats (
+                user_id, period_type, period_date, total_sessions, winning_sessions,
+                losing_sessions, sessions_net_result, best_session, worst_session,
+                total_gains, total_losses, total_deposits, total_withdrawals,
+                net_profit_loss, transaction_count, created_at, updated_at
+            )
+            SELECT
+                user_id,
+                '{period_type}',
+                CAST(date_trunc('{trunc}', (started_at AT TIME ZONE 'UTC') AT TIME ZONE :tz) AS date),
+                count(*),
+                count(*) FILTER (WHERE net_result > 0),
+                count(*) FILTER (WHERE net_result < 0),
+                coalesce(sum(net_result), 0),
+                max(net_result),
+                min(net_result),
+                0, 0, 0, 0,
+                0, 0,
+                now(),
+                now()
+            FROM betting_sessions
+            WHERE status = 'completed' {user_filter}
+            GROUP BY 1, 3
+            ON CONFLICT ON CONSTRAINT unique_user_period_stats DO UPDATE SET
+                total_sessions = EXCLUDED.total_sessions,
+                winning_sessions = EXCLUDED.winning_sessions,
+                losing_sessions = EXCLUDED.losing_sessions,
+                sessions_net_result = EXCLUDED.sessions_net_result,
+                best_session = EXCLUDED.best_session,
+                worst_session = EXCLUDED.worst_session
+        """), params)
+
+    db.session.commit()
@@ -1,14 +1,33 @@
 # routes.py
 
 import profile
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app, g, stream_with_context
 from . import db
-from .models import User, Transaction, BettingProfile, Objective, BettingSession, BettingStats
-from sqlalchemy import desc, func, and_, extract
+from .models import User, Transaction, BettingProfile, Objective, BettingSession, BettingStats, AutocompleteTerm
+from .sync import get_sync_floor, get_current_sync_token, get_changes_since, get_ledger_version
+from .cache import ledger_cached
+from .rollups import get_rollup, get_session_totals
+from .user_context import UserContext, get_user_context, load_user_context
+from .autocomplete import AUTOCOMPLETE_FIELDS, suggest_terms
+from .events import BALANCE_CHANGED, format_sse, get_broker
+from .msgpack_codec import wants_msgpack
+from .config import GAME_CONFIGURATIONS, RISK_LEVELS
+from .risk_simulation import VOLATILITY_STD, np, run_simulation
+from .analytics import (
+    GRANULARITIES, MAX_LOCAL_DAY, MAX_MONTHS, MIN_LOCAL_DAY, downsample_rows, fit_granularity,
+    get_balance_history, get_calendar_days, get_game_results, get_monthly_series,
+    get_rollup_series, get_transaction_stats, local_today, parse_local_day, to_local_date
+)
+from sqlalchemy import desc, func, and_, cast
+from werkzeug.exceptions import HTTPException, MethodNotAllowed
+from werkzeug.test import EnvironBuilder
 from decimal import Decimal, InvalidOperation
-from datetime import datetime, date, timedelta
+from calendar import monthrange
+from datetime import datetime, date, timedelta, timezone
 import uuid
 import hashlib
+import re
+import time
 import jwt as pyjwt
 import os
 from functools import wraps
@@ -23,74 +42,253 @@ def generate_token(user_id):
     }
     return pyjwt.encode(payload, os.getenv('SECRET_KEY', 'your-secret-key'), algorithm='HS256')
 
+def _authenticate(token):
+    """Valida o JWT e retorna (user_id, None) ou (None, resposta de erro)"""
+    if not token:
+        return None, (jsonify({'error': 'Token is missing'}), 401)
+    
+    try:
+        if token.startswith('Bearer '):
+            token = token[7:]
+        data = pyjwt.decode(token, os.getenv('SECRET_KEY', 'your-secret-key'), algorithms=['HS256'])
+        return data['user_id'], None
+    except pyjwt.ExpiredSignatureError:
+        return None, (jsonify({'error': 'Token expired'}), 401)
+    except pyjwt.InvalidTokenError:
+        return None, (jsonify({'error': 'Invalid token'}), 401)
+
+# Chave do environ com o UserContext do /batch que originou a sub-requisição
+BATCH_CONTEXT_KEY = 'betting_tracker.batch_user_context'
+
 # Decorator to require authentication
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token:
-            return jsonify({'error': 'Token is missing'}), 401
-        
-        try:
-            if token.startswith('Bearer '):
-                token = token[7:]
-            data = pyjwt.decode(token, os.getenv('SECRET_KEY', 'your-secret-key'), algorithms=['HS256'])
-            current_user_id = data['user_id']
-        except pyjwt.ExpiredSignatureError:
-            return jsonify({'error': 'Token expired'}), 401
-        except pyjwt.InvalidTokenError:
-            return jsonify({'error': 'Invalid token'}), 401
-        
-        return f(current_user_id, *args, **kwargs)
+        ctx = request.environ.get(BATCH_CONTEXT_KEY)
+        if ctx is None:
+            current_user_id, error = _authenticate(request.headers.get('Authorization'))
+            if error:
+                return error
+            
+            # Usuário, perfil e saldo carregados sob demanda uma vez por requisição
+            ctx = load_user_context(current_user_id)
+        else:
+            # Sub-requisição do batch: JWT já validado, contexto compartilhado
+            g.user_context = ctx
+        return f(ctx.user_id, *args, **kwargs)
     return decorated
 
 # =================================================================
-# FUNÇÃO AUXILIAR PARA CÁLCULO DE SALDO (ADICIONADA)
+# SERIALIZAÇÃO COMPARTILHADA
 # =================================================================
-def _get_user_balance(user_id):
+# Colunas da listagem de transações. A listagem lê só essas colunas (sem
+# instanciar o modelo); numeric já sai como texto do Postgres ("100.00", o
+# mesmo que str(Decimal)) e o provider JSON codifica o datetime direto.
+TRANSACTION_LIST_COLUMNS = (
+    Transaction.id,
+    Transaction.type,
+    cast(Transaction.amount, db.Text).label('amount'),
+    cast(Transaction.balance_before, db.Text).label('balance_before'),
+    cast(Transaction.balance_after, db.Text).label('balance_after'),
+    Transaction.category,
+    Transaction.description,
+    Transaction.date,
+    Transaction.meta,
+)
+
+def _last_transaction_dict(summary):
+    """Última transação a partir das colunas last_* do resumo do ledger"""
+    if summary.last_id is None:
+        return None
+    return {
+        'id': summary.last_id,
+        'type': summary.last_type,
+        'amount': str(summary.last_amount),
+        'category': summary.last_category,
+        'date': summary.last_date.isoformat()
+    }
+
+def _get_pagination_args():
+    """Lê page/per_page respeitando DEFAULT_PAGE_SIZE e MAX_PAGE_SIZE"""
+    page = max(request.args.get('page', 1, type=int) or 1, 1)
+    per_page = request.args.get('per_page', current_app.config.get('DEFAULT_PAGE_SIZE', 20), type=int)
+    per_page = min(max(per_page or 1, 1), current_app.config.get('MAX_PAGE_SIZE', 100))
+    return page, per_page
+
+def _pagination_meta(page, per_page, total):
+    pages = (total + per_page - 1) // per_page
+    return {
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'pages': pages,
+        'has_next': page < pages
+    }
+
+def _get_max_points():
     """
-    Calcula o saldo atual do usuário de forma robusta, considerando todos os tipos de transação.
-    Saldo = (Depósitos + Ganhos) - (Saques + Perdas)
+    Lê `max_points` (redução LTTB das séries), limitado entre 3 e
+    MAX_SERIES_POINTS. Retorna None quando não informado.
     """
-    # Soma de todas as entradas de dinheiro
-    total_inflow = db.session.query(func.sum(Transaction.amount)).filter(
-        Transaction.user_id == user_id,
-        Transaction.type.in_(['deposit', 'gains'])
-    ).scalar() or Decimal('0.00')
+    max_points = request.args.get('max_points', type=int)
+    if max_points is None:
+        return None
+    return min(max(max_points, 3), current_app.config.get('MAX_SERIES_POINTS', 400))
 
-    # Soma de todas as saídas de dinheiro
-    total_outflow = db.session.query(func.sum(Transaction.amount)).filter(
-        Transaction.user_id == user_id,
-        Transaction.type.in_(['withdraw', 'losses'])
-    ).scalar() or Decimal('0.00')
-    
-    return total_inflow - total_outflow
+def _representation():
+    """Formato negociado da resposta (msgpack/json, colunar) para ETags e caches"""
+    representation = 'msgpack' if wants_msgpack() else 'json'
+    return f'{representation}-columnar' if _wants_columnar() else representation
 
-def _get_user_initial_bank(user_id):
+def _ledger_etag(user_id, *parts):
     """
-    Obtém a banca inicial do usuário através da primeira transação marcada como inicial
-    ou do perfil de apostas.
+    ETag derivado da versão do ledger e da representação negociada. Retorna
+    (etag, resposta 304 ou None): o 304 sai antes de qualquer consulta de
+    agregação. Aceita também a variante com sufixo de codificação criada
+    pela compressão.
     """
-    # Primeiro tenta encontrar na transação inicial
-    initial_tx = Transaction.query.filter_by(
-        user_id=user_id, 
-        is_initial_bank=True
-    ).first()
-    
-    if initial_tx:
-        return initial_tx.amount
-    
-    # Senão, busca no perfil de apostas
-    profile = BettingProfile.query.filter_by(
-        user_id=user_id, 
-        is_active=True
-    ).first()
-    
-    if profile:
-        return profile.initial_balance
-    
-    # Valor padrão se não encontrar
-    return Decimal('0.00')
+    etag = '-'.join(
+        str(part) for part in (user_id, get_ledger_version(user_id)) + parts + (_representation(),)
+    )
+    for tag in request.if_none_match.as_set():
+        if tag == etag or tag.startswith(f'{etag}-'):
+            response = current_app.response_class(status=304)
+            response.set_etag(tag)
+            response.vary.add('Accept')
+            return etag, response
+    return etag, None
+
+def _get_series_args(user_id, tz_name):
+    """
+    Lê from/to (YYYY-MM-DD, dias locais), granularity e max_points das
+    séries. Sem `from`, começa na primeira transação. A granularidade sobe
+    até a série caber no limite de pontos; intervalos que não cabem nem por
+    mês são recusados. Retorna ((first_day, last_day,
+    granularity, max_points), None) ou (None, resposta de erro).
+    """
+    granularity = request.args.get('granularity', 'day')
+    if granularity not in GRANULARITIES:
+        return None, (jsonify({'success': False, 'error': 'Granularidade inválida'}), 400)
+
+    try:
+        first_day = parse_local_day(request.args['from']) if request.args.get('from') else None
+        last_day = parse_local_day(request.args['to']) if request.args.get('to') else local_today(tz_name)
+    except ValueError:
+        return None, (jsonify({'success': False, 'error': 'Formato de data inválido'}), 400)
+
+    if first_day is None:
+        first_tx_date = db.session.query(func.min(Transaction.date)).filter(
+            Transaction.user_id == user_id
+        ).scalar()
+        first_day = to_local_date(first_tx_date, tz_name) if first_tx_date else last_day
+
+    if first_day > last_day:
+        return None, (jsonify({'success': False, 'error': 'Data inicial maior que a final'}), 400)
+
+    max_points = _get_max_points()
+    point_limit = (
+        current_app.config.get('MAX_RAW_SERIES_POINTS', 5000) if max_points
+        else current_app.config.get('MAX_SERIES_POINTS', 400)
+    )
+    granularity = fit_granularity(granularity, first_day, last_day, point_limit)
+    if granularity is None:
+        return None, (jsonify({
+            'success': False,
+            'error': f'Intervalo longo demais: máximo de {point_limit} meses'
+        }), 400)
+    return (first_day, last_day, granularity, max_points), None
+
+def _series_payload(rows, series_args, y_key, **extra):
+    """Série (reduzida por LTTB com max_points) em linhas ou colunar, com o intervalo usado"""
+    first_day, last_day, granularity, max_points = series_args
+    rows = downsample_rows(rows, max_points, 'date', y_key)
+
+    if _wants_columnar():
+        payload = _columnar_payload(rows[0]._fields if rows else (), rows)
+    else:
+        payload = {'success': True, 'data': rows}
+
+    payload.update(extra)
+    payload.update({
+        'granularity': granularity,
+        'from': first_day.isoformat(),
+        'to': last_day.isoformat()
+    })
+    return payload
+
+def _wants_columnar():
+    """Formato opcional `format=columnar` para as séries de gráficos"""
+    return request.args.get('format') == 'columnar'
+
+def _columnar_payload(columns, rows):
+    """
+    Monta {columns, data: {coluna: [...]}} transpondo as linhas da consulta
+    de uma vez, sem repetir as chaves em cada item.
+    """
+    columns = list(columns)
+    series = list(zip(*rows)) if rows else [()] * len(columns)
+    return {
+        'success': True,
+        'format': 'columnar',
+        'columns': columns,
+        'data': {column: list(values) for column, values in zip(columns, series)}
+    }
+
+def _transaction_to_dict(tx):
+    return {
+        'id': tx.id,
+        'type': tx.type,
+        'amount': str(tx.amount),
+        'balance_before': str(tx.balance_before),
+        'balance_after': str(tx.balance_after),
+        'category': tx.category,
+        'description': tx.description,
+        'date': tx.date.isoformat(),
+        'meta': tx.meta
+    }
+
+def _objective_to_dict(obj):
+    return {
+        'id': obj.id,
+        'title': obj.title,
+        'description': obj.description,
+        'target_amount': str(obj.target_amount),
+        'current_amount': str(obj.current_amount),
+        'target_date': obj.target_date.isoformat() if obj.target_date else None,
+        'priority': obj.priority,
+        'status': obj.status,
+        'category': obj.category,
+        'color': obj.color,
+        'icon_name': obj.icon_name,
+        'created_at': obj.created_at.isoformat()
+    }
+
+def _activate_betting_profile(user_id, betting_profile):
+    """
+    Ativa o perfil e desativa os demais do usuário pelas instâncias do ORM
+    (não por update em massa), para que o flush registre cada mudança no
+    change_log da sincronização.
+    """
+    for active_profile in BettingProfile.query.filter_by(user_id=user_id, is_active=True):
+        active_profile.is_active = False
+    betting_profile.is_active = True
+
+def _betting_profile_to_dict(profile):
+    return {
+        'id': profile.id,
+        'profile_type': profile.profile_type,
+        'title': profile.title,
+        'description': profile.description,
+        'risk_level': profile.risk_level,
+        'initial_balance': str(profile.initial_balance),
+        'stop_loss': str(profile.stop_loss),
+        'profit_target': str(profile.profit_target),
+        'features': profile.features,
+        'color': profile.color,
+        'icon_name': profile.icon_name,
+        'stop_loss_percentage': str(profile.stop_loss_percentage),
+        'created_at': profile.created_at.isoformat()
+    }
 @main.route('/auth/logout', methods=['POST'])
 @token_required
 def logout(current_user_id):
@@ -122,7 +320,7 @@ def update_user_profile(current_user_id):
     - new_password: nova senha (opcional)
     """
     try:
-        user = User.query.get(current_user_id)
+        user = get_user_context().user
         if not user:
             return jsonify({'error': 'Usuário não encontrado'}), 404
 
@@ -331,10 +529,11 @@ def login():
     token = generate_token(user.id)
     
     # Buscar informações adicionais do usuário
-    current_balance = _get_user_balance(user.id)
-    initial_bank = _get_user_initial_bank(user.id)
+    ctx = UserContext(user.id)
+    current_balance = ctx.balance
+    initial_bank = ctx.initial_bank
     
-    return jsonify({
+    payload = {
         'success': True,
         'token': token,
         'user': {
@@ -345,7 +544,28 @@ def login():
             'initial_bank': str(initial_bank),
             'current_balance': str(current_balance)
         }
-    })
+    }
+    
+    # include=dashboard (query ou corpo): a primeira tela renderiza sem nova ida ao servidor
+    include = request.args.get('include') or data.get('include')
+    if include == 'dashboard':
+        payload['dashboard'] = _login_dashboard_data(ctx)
+    
+    return jsonify(payload)
+
+def _login_dashboard_data(ctx):
+    """Perfil, resumo do saldo, primeira página de transações e objetivos"""
+    per_page = current_app.config.get('DEFAULT_PAGE_SIZE', 20)
+    rows = _transaction_list_query(ctx.user_id).limit(per_page).all()
+    
+    return {
+        'profile': _betting_profile_to_dict(ctx.profile) if ctx.profile else None,
+        'balance': _balance_data(ctx),
+        'transactions': rows,
+        # Contagem do resumo do ledger já carregado para o saldo
+        'pagination': _pagination_meta(1, per_page, ctx.summary.total_count),
+        'objectives': _objectives_data(ctx.user_id)
+    }
 
 # === BETTING PROFILE ROUTES ===
 
@@ -386,10 +606,7 @@ def create_betting_profile(current_user_id):
         print(f"   Profit Target: {profit_target}")
 
         # Verificar se o usuário já tem um perfil ativo
-        existing_profile = BettingProfile.query.filter_by(
-            user_id=current_user_id, 
-            is_active=True
-        ).first()
+        existing_profile = get_user_context().profile
         
         if existing_profile:
             # Atualizar perfil existente
@@ -429,11 +646,7 @@ def create_betting_profile(current_user_id):
 
         # Desativar outros perfis se estiver criando um novo
         if not existing_profile:
-            BettingProfile.query.filter_by(
-                user_id=current_user_id, 
-                is_active=True
-            ).update({'is_active': False})
-            profile_to_return.is_active = True
+            _activate_betting_profile(current_user_id, profile_to_return)
         
         db.session.commit()
         
@@ -465,28 +678,14 @@ def create_betting_profile(current_user_id):
 @main.route('/betting-profiles', methods=['GET'])
 @token_required
 def get_betting_profile(current_user_id):
-    profile = BettingProfile.query.filter_by(user_id=current_user_id, is_active=True).first()
+    profile = get_user_context().profile
     
     if not profile:
         return jsonify({'error': 'No active betting profile found'}), 404
     
     return jsonify({
         'success': True,
-        'data': {
-            'id': profile.id,
-            'profile_type': profile.profile_type,
-            'title': profile.title,
-            'description': profile.description,
-            'risk_level': profile.risk_level,
-            'initial_balance': str(profile.initial_balance),
-            'stop_loss': str(profile.stop_loss),
-            'profit_target': str(profile.profit_target),
-            'features': profile.features,
-            'color': profile.color,
-            'icon_name': profile.icon_name,
-            'stop_loss_percentage': str(profile.stop_loss_percentage),
-            'created_at': profile.created_at.isoformat()
-        }
+        'data': _betting_profile_to_dict(profile)
     })
 
 @main.route('/betting-profiles/<int:profile_id>', methods=['PUT'])
@@ -514,6 +713,11 @@ def update_betting_profile(current_user_id, profile_id):
     return jsonify({'success': True})
 
 # === TRANSACTION ROUTES ===
+def _transaction_list_query(user_id):
+    return db.session.query(*TRANSACTION_LIST_COLUMNS).filter(
+        Transaction.user_id == user_id
+    ).order_by(desc(Transaction.date), desc(Transaction.id))
+
 @main.route('/transactions', methods=['GET'])
 @token_required
 def get_transactions(current_user_id):
@@ -521,24 +725,28 @@ def get_transactions(current_user_id):
     Retorna todas as transações do usuário, ordenadas por data decrescente.
     """
     try:
-        transactions = Transaction.query.filter_by(
-            user_id=current_user_id
-        ).order_by(desc(Transaction.date)).all()
+        query = _transaction_list_query(current_user_id)
+
+        # Paginação opcional: sem page/per_page a lista vem completa
+        pagination = None
+        if 'page' in request.args or 'per_page' in request.args:
+            page, per_page = _get_pagination_args()
+            total = db.session.query(func.count(Transaction.id)).filter(
+                Transaction.user_id == current_user_id
+            ).scalar()
+            query = query.offset((page - 1) * per_page).limit(per_page)
+            pagination = _pagination_meta(page, per_page, total)
+
+        rows = query.all()
+
+        if _wants_columnar():
+            payload = _columnar_payload((c.key for c in TRANSACTION_LIST_COLUMNS), rows)
+        else:
+            payload = {'success': True, 'data': rows}
 
-        return jsonify({
-            'success': True,
-            'data': [{
-                'id': tx.id,
-                'type': tx.type,
-                'amount': str(tx.amount),
-                'balance_before': str(tx.balance_before),
-                'balance_after': str(tx.balance_after),
-                'category': tx.category,
-                'description': tx.description,
-                'date': tx.date.isoformat(),
-                'meta': tx.meta
-            } for tx in transactions]
-        })
+        if pagination:
+            payload['pagination'] = pagination
+        return jsonify(payload)
 
     except Exception as e:
         return jsonify({
@@ -567,7 +775,7 @@ def create_transaction(current_user_id):
     # --- FIM DA CORREÇÃO ---
 
     # CORREÇÃO: Lógica de saldo instável substituída
-    current_balance = _get_user_balance(current_user_id)
+    current_balance = get_user_context().balance
 
     if tx_type == 'deposit':
         new_balance = current_balance + amount
@@ -594,18 +802,39 @@ def create_transaction(current_user_id):
 
     return jsonify({
         'success': True,
-        'data': {
-            'id': new_tx.id,
-            'type': new_tx.type,
-            'amount': str(new_tx.amount),
-            'balance_before': str(new_tx.balance_before),
-            'balance_after': str(new_tx.balance_after),
-            'category': new_tx.category,
-            'description': new_tx.description,
-            'date': new_tx.date.isoformat(),
-            'meta': new_tx.meta
-        }
+        'data': _transaction_to_dict(new_tx)
     }), 201
+@main.route('/transactions/search', methods=['GET'])
+@token_required
+def search_transactions(current_user_id):
+    """
+    Busca textual nas descrições e categorias das transações (tsvector em
+    português com índice GIN). Termos parciais casam por prefixo; resultados
+    ordenados por relevância e paginados como a listagem.
+    """
+    terms = re.findall(r'\w+', request.args.get('q', ''))
+    if not terms:
+        return jsonify({'success': False, 'error': 'Parâmetro q é obrigatório'}), 400
+
+    page, per_page = _get_pagination_args()
+    ts_query = func.to_tsquery('portuguese', ' & '.join(f'{term}:*' for term in terms))
+    match = and_(
+        Transaction.user_id == current_user_id,
+        Transaction.search_vector.op('@@')(ts_query)
+    )
+
+    total = db.session.query(func.count(Transaction.id)).filter(match).scalar()
+    rank = func.ts_rank_cd(Transaction.search_vector, ts_query).label('rank')
+    rows = db.session.query(*TRANSACTION_LIST_COLUMNS, rank).filter(match).order_by(
+        desc(rank), desc(Transaction.date), desc(Transaction.id)
+    ).offset((page - 1) * per_page).limit(per_page).all()
+
+    return jsonify({
+        'success': True,
+        'data': rows,
+        'pagination': _pagination_meta(page, per_page, total)
+    })
+
 @main.route('/transactions/summary', methods=['GET'])
 @token_required
 def get_transactions_summary(current_user_id):
@@ -613,54 +842,28 @@ def get_transactions_summary(current_user_id):
     Retorna um resumo das transações para dashboard.
     """
     try:
-        # Contar transações por tipo
-        deposit_count = Transaction.query.filter_by(
-            user_id=current_user_id, 
-            type='deposit'
-        ).count()
-        
-        withdraw_count = Transaction.query.filter_by(
-            user_id=current_user_id, 
-            type='withdraw'
-        ).count()
+        # Contagens, hoje e última transação em uma consulta
+        summary = get_user_context().summary
         
-        # Última transação
-        last_transaction = Transaction.query.filter_by(
-            user_id=current_user_id
-        ).order_by(desc(Transaction.date)).first()
-        
-        # Categorias mais usadas
+        # Categorias mais usadas (frequências mantidas na escrita)
         popular_categories = db.session.query(
-            Transaction.category,
-            func.count(Transaction.id).label('count')
+            AutocompleteTerm.term,
+            AutocompleteTerm.uses
         ).filter(
-            Transaction.user_id == current_user_id,
-            Transaction.category.isnot(None)
-        ).group_by(Transaction.category).order_by(
-            desc('count')
+            AutocompleteTerm.user_id == current_user_id,
+            AutocompleteTerm.field == 'category'
+        ).order_by(
+            AutocompleteTerm.uses.desc(), AutocompleteTerm.term
         ).limit(5).all()
         
-        # Transações hoje
-        today = datetime.utcnow().date()
-        today_transactions = Transaction.query.filter(
-            Transaction.user_id == current_user_id,
-            func.date(Transaction.date) == today
-        ).count()
-        
         return jsonify({
             'success': True,
             'data': {
-                'total_transactions': deposit_count + withdraw_count,
-                'deposit_count': deposit_count,
-                'withdraw_count': withdraw_count,
-                'today_transactions': today_transactions,
-                'last_transaction': {
-                    'id': last_transaction.id,
-                    'type': last_transaction.type,
-                    'amount': str(last_transaction.amount),
-                    'category': last_transaction.category,
-                    'date': last_transaction.date.isoformat()
-                } if last_transaction else None,
+                'total_transactions': summary.deposit_count + summary.withdraw_count,
+                'deposit_count': summary.deposit_count,
+                'withdraw_count': summary.withdraw_count,
+                'today_transactions': summary.today_count,
+                'last_transaction': _last_transaction_dict(summary),
                 'popular_categories': [
                     {'category': cat[0], 'count': cat[1]} 
                     for cat in popular_categories
@@ -673,6 +876,125 @@ def get_transactions_summary(current_user_id):
             'success': False, 
             'error': 'Erro ao carregar resumo'
         }), 500
+# Janela de cada período das estatísticas (None = histórico inteiro)
+STATS_PERIODS = {
+    'daily': timedelta(days=30),
+    'weekly': timedelta(weeks=12),
+    'monthly': timedelta(days=365),
+    'yearly': timedelta(days=365 * 3),
+    'all': None,
+}
+
+def _stats_period_start(period, today):
+    """Primeiro dia local do período (None para o histórico inteiro)"""
+    window = STATS_PERIODS.get(period)
+    return today - window if window is not None else None
+
+def _trade_stats_dict(row):
+    """Estatísticas de operações da consulta agregada, com os índices derivados"""
+    total_trades = row.total_trades
+    volatility = row.volatility
+    return {
+        'total_trades': total_trades,
+        'winning_trades': row.winning_trades,
+        'losing_trades': row.losing_trades,
+        'win_rate': round(row.winning_trades / total_trades * 100, 2) if total_trades else 0,
+        'total_gains': str(row.total_gains),
+        'total_losses': str(row.total_losses),
+        'net_profit': str(row.total_gains - row.total_losses),
+        'avg_gain': str(row.avg_gain),
+        'avg_loss': str(row.avg_loss),
+        'max_gain': str(row.max_gain),
+        'max_loss': str(row.max_loss),
+        'mean_return': str(row.mean_return.quantize(Decimal('0.01'))),
+        'volatility': str(volatility.quantize(Decimal('0.01'))),
+        'sharpe_ratio': round(float(row.mean_return / volatility), 4) if volatility else 0,
+        'profit_factor': round(float(row.total_gains / row.total_losses), 4) if row.total_losses else None,
+    }
+
+@main.route('/transactions/stats', methods=['GET'])
+@token_required
+def get_transaction_stats_route(current_user_id):
+    """
+    Estatísticas das operações no período (daily, weekly, monthly, yearly ou
+    all): taxa de acerto, médias, máximos, volatilidade e Sharpe calculados
+    no banco. Validadas por ETag e guardadas em cache pela versão do ledger.
+    """
+    period = request.args.get('period', 'monthly')
+    if period not in STATS_PERIODS:
+        return jsonify({'success': False, 'error': 'Período inválido'}), 400
+
+    tz_name = current_app.config.get('DEFAULT_TIMEZONE', 'America/Sao_Paulo')
+    today = local_today(tz_name)
+    etag, not_modified = _ledger_etag(current_user_id, 'stats', period, today)
+    if not_modified:
+        return not_modified
+
+    first_day = _stats_period_start(period, today)
+    data = ledger_cached(
+        'transaction-stats', current_user_id, etag, (period, today),
+        lambda: _trade_stats_dict(get_transaction_stats(current_user_id, first_day, today, tz_name))
+    )
+
+    response = jsonify({
+        'success': True,
+        'data': dict(data, period=period, start_date=first_day.isoformat() if first_day else None)
+    })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+@main.route('/transactions/profit-analysis', methods=['GET'])
+@token_required
+def get_profit_analysis(current_user_id):
+    """
+    Lucro entre startDate e endDate (YYYY-MM-DD, dias locais, ambos
+    opcionais): estatísticas das operações, depósitos/saques no intervalo e
+    ROI sobre a banca inicial. Validada por ETag e em cache pela versão do
+    ledger.
+    """
+    tz_name = current_app.config.get('DEFAULT_TIMEZONE', 'America/Sao_Paulo')
+    try:
+        first_day = parse_local_day(request.args['startDate']) if request.args.get('startDate') else None
+        last_day = parse_local_day(request.args['endDate']) if request.args.get('endDate') else None
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Formato de data inválido'}), 400
+
+    if first_day and last_day and first_day > last_day:
+        return jsonify({'success': False, 'error': 'Data inicial maior que a final'}), 400
+
+    etag, not_modified = _ledger_etag(current_user_id, 'profit', first_day or 'start', last_day or 'end')
+    if not_modified:
+        return not_modified
+
+    def build():
+        row = get_transaction_stats(current_user_id, first_day, last_day, tz_name)
+        initial_bank = get_user_context().initial_bank
+        net_profit = row.total_gains - row.total_losses
+        data = _trade_stats_dict(row)
+        data.update({
+            'total_deposits': str(row.total_deposits),
+            'total_withdrawals': str(row.total_withdrawals),
+            'net_cash_flow': str(row.total_deposits - row.total_withdrawals),
+            'initial_bank': str(initial_bank),
+            'roi': round(float(net_profit / initial_bank * 100), 2) if initial_bank else None,
+        })
+        return data
+
+    data = ledger_cached('profit-analysis', current_user_id, etag, (first_day, last_day), build)
+
+    response = jsonify({
+        'success': True,
+        'data': dict(
+            data,
+            start_date=first_day.isoformat() if first_day else None,
+            end_date=last_day.isoformat() if last_day else None
+        )
+    })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
 @main.route('/transactions/<int:transaction_id>', methods=['PUT'])
 @token_required
 def update_transaction(current_user_id, transaction_id):
@@ -750,7 +1072,11 @@ def update_transaction(current_user_id, transaction_id):
             try:
                 # Aceitar tanto ISO string quanto datetime
                 if isinstance(data['date'], str):
-                    transaction.date = datetime.fromisoformat(data['date'].replace('Z', '+00:00'))
+                    new_date = datetime.fromisoformat(data['date'].replace('Z', '+00:00'))
+                    # A coluna guarda UTC sem fuso; o frontend envia toISOString() ("...Z")
+                    if new_date.tzinfo is not None:
+                        new_date = new_date.astimezone(timezone.utc).replace(tzinfo=None)
+                    transaction.date = new_date
                 else:
                     transaction.date = data['date']
             except (ValueError, TypeError):
@@ -884,15 +1210,106 @@ def delete_transaction(current_user_id, transaction_id):
 @main.route('/balance', methods=['GET'])
 @token_required
 def get_balance(current_user_id):
+    return jsonify({'success': True, **_balance_data(get_user_context())})
+
+def _balance_data(ctx):
     # CORREÇÃO: Lógica de saldo instável substituída
-    current_balance = _get_user_balance(current_user_id)
-    initial_bank = _get_user_initial_bank(current_user_id)
+    current_balance = ctx.balance
+    initial_bank = ctx.initial_bank
     
-    return jsonify({
-        'success': True,
+    return {
         'balance': str(current_balance),
         'initial_bank': str(initial_bank),
         'profit_loss': str(current_balance - initial_bank)
+    }
+
+@main.route('/balance/history', methods=['GET'])
+@token_required
+def get_balance_history_series(current_user_id):
+    """
+    Série do saldo por dia/semana/mês calculada no banco: saldo de fechamento,
+    fluxo líquido e totais por tipo em cada bucket, com buckets vazios.
+    Parâmetros: from, to (YYYY-MM-DD, dias locais), granularity, max_points,
+    format=columnar. Se o intervalo gerar pontos demais, a granularidade é
+    aumentada; com max_points a série é reduzida por LTTB sobre o saldo.
+    """
+    tz_name = current_app.config.get('DEFAULT_TIMEZONE', 'America/Sao_Paulo')
+    series_args, error = _get_series_args(current_user_id, tz_name)
+    if error:
+        return error
+    first_day, last_day, granularity, _ = series_args
+    rows = get_balance_history(current_user_id, first_day, last_day, granularity, tz_name)
+    return jsonify(_series_payload(rows, series_args, 'closing_balance'))
+
+@main.route('/calendar', methods=['GET'])
+@token_required
+def get_calendar(current_user_id):
+    """
+    Totais por dia (fuso local) para o heatmap do calendário. Sem `month`
+    retorna o ano inteiro. Respostas validadas por ETag e guardadas em cache
+    pela versão do ledger.
+    """
+    tz_name = current_app.config.get('DEFAULT_TIMEZONE', 'America/Sao_Paulo')
+    year = request.args.get('year', local_today(tz_name).year, type=int)
+    month = request.args.get('month', type=int)
+    if not 1 <= year <= 9999 or (month is not None and not 1 <= month <= 12):
+        return jsonify({'success': False, 'error': 'Ano ou mês inválido'}), 400
+
+    if month:
+        first_day = date(year, month, 1)
+        last_day = date(year, month, monthrange(year, month)[1])
+    else:
+        first_day, last_day = date(year, 1, 1), date(year, 12, 31)
+    if first_day < MIN_LOCAL_DAY or last_day > MAX_LOCAL_DAY:
+        return jsonify({'success': False, 'error': 'Ano ou mês fora do intervalo suportado'}), 400
+
+    etag, not_modified = _ledger_etag(current_user_id, 'calendar', year, month or 'all')
+    if not_modified:
+        return not_modified
+
+    days = ledger_cached(
+        'calendar', current_user_id, etag, (year, month),
+        lambda: get_calendar_days(current_user_id, first_day, last_day, tz_name)
+    )
+
+    response = jsonify({
+        'success': True,
+        'year': year,
+        'month': month,
+        'data': days
+    })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+@main.route('/daily-summary', methods=['GET'])
+@token_required
+def get_daily_summary(current_user_id):
+    """
+    Ganhos e perdas do dia (fronteira do dia em DEFAULT_TIMEZONE), lidos do
+    rollup diário mantido na escrita: uma consulta pela chave única.
+    """
+    tz_name = current_app.config.get('DEFAULT_TIMEZONE', 'America/Sao_Paulo')
+    try:
+        day = datetime.strptime(request.args['date'], '%Y-%m-%d').date() if request.args.get('date') else local_today(tz_name)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Formato de data inválido'}), 400
+
+    rollup = get_rollup(current_user_id, 'daily', day)
+    zero = Decimal('0.00')
+
+    return jsonify({
+        'success': True,
+        'data': {
+            'date': day.isoformat(),
+            'timezone': tz_name,
+            'gains': str(rollup.total_gains if rollup else zero),
+            'losses': str(rollup.total_losses if rollup else zero),
+            'net_result': str(rollup.net_profit_loss if rollup else zero),
+            'deposits': str(rollup.total_deposits if rollup else zero),
+            'withdrawals': str(rollup.total_withdrawals if rollup else zero),
+            'transactions': rollup.transaction_count if rollup else 0
+        }
     })
 
 # === DASHBOARD OVERVIEW ROUTE (NOVA) ===
@@ -905,35 +1322,18 @@ def get_dashboard_overview(current_user_id):
     incluindo a banca inicial definida no cadastro.
     """
     try:
-        # Obter dados básicos
-        current_balance = _get_user_balance(current_user_id)
-        initial_bank = _get_user_initial_bank(current_user_id)
+        # Obter dados básicos: somas, contagens e última transação em uma consulta
+        ctx = get_user_context()
+        summary = ctx.summary
+        current_balance = summary.balance
+        initial_bank = summary.initial_bank
         
         # Calcular métricas
         profit_loss = current_balance - initial_bank
         roi_percentage = ((current_balance - initial_bank) / initial_bank * 100) if initial_bank > 0 else 0
         
         # Obter perfil ativo
-        profile = BettingProfile.query.filter_by(user_id=current_user_id, is_active=True).first()
-        
-        # Estatísticas de transações
-        total_deposits = db.session.query(func.sum(Transaction.amount)).filter(
-            Transaction.user_id == current_user_id,
-            Transaction.type == 'deposit'
-        ).scalar() or Decimal('0.00')
-        
-        total_withdrawals = db.session.query(func.sum(Transaction.amount)).filter(
-            Transaction.user_id == current_user_id,
-            Transaction.type == 'withdraw'
-        ).scalar() or Decimal('0.00')
-        
-        # Contar transações
-        total_transactions = Transaction.query.filter_by(user_id=current_user_id).count()
-        
-        # Última transação
-        last_transaction = Transaction.query.filter_by(
-            user_id=current_user_id
-        ).order_by(desc(Transaction.date)).first()
+        profile = ctx.profile
         
         return jsonify({
             'success': True,
@@ -945,9 +1345,9 @@ def get_dashboard_overview(current_user_id):
                 'roi_percentage': round(float(roi_percentage), 2),
                 
                 # Estatísticas de transações
-                'total_deposits': str(total_deposits),
-                'total_withdrawals': str(total_withdrawals),
-                'total_transactions': total_transactions,
+                'total_deposits': str(summary.total_deposits),
+                'total_withdrawals': str(summary.total_withdrawals),
+                'total_transactions': summary.total_count,
                 
                 # Dados do perfil
                 'profile': {
@@ -959,12 +1359,7 @@ def get_dashboard_overview(current_user_id):
                 } if profile else None,
                 
                 # Última atividade
-                'last_transaction': {
-                    'type': last_transaction.type,
-                    'amount': str(last_transaction.amount),
-                    'category': last_transaction.category,
-                    'date': last_transaction.date.isoformat()
-                } if last_transaction else None,
+                'last_transaction': _last_transaction_dict(summary),
                 
                 # Status da conta
                 'account_status': {
@@ -1019,25 +1414,13 @@ def create_objective(current_user_id):
 @main.route('/objectives', methods=['GET'])
 @token_required
 def get_objectives(current_user_id):
-    objectives = Objective.query.filter_by(user_id=current_user_id).all()
-    
     return jsonify({
         'success': True,
-        'data': [{
-            'id': obj.id,
-            'title': obj.title,
-            'description': obj.description,
-            'target_amount': str(obj.target_amount),
-            'current_amount': str(obj.current_amount),
-            'target_date': obj.target_date.isoformat() if obj.target_date else None,
-            'priority': obj.priority,
-            'status': obj.status,
-            'category': obj.category,
-            'color': obj.color,
-            'icon_name': obj.icon_name,
-            'created_at': obj.created_at.isoformat()
-        } for obj in objectives]
+        'data': _objectives_data(current_user_id)
     })
+
+def _objectives_data(user_id):
+    return [_objective_to_dict(obj) for obj in Objective.query.filter_by(user_id=user_id).all()]
 @main.route('/objectives/<int:objective_id>', methods=['PUT'])
 @token_required
 def update_objective(current_user_id, objective_id):
@@ -1094,86 +1477,224 @@ def delete_objective(current_user_id, objective_id):
 
     return jsonify({'success': True, 'message': 'Objective deleted successfully'})
 
+# === SYNC ROUTES ===
+
+@main.route('/sync/changes', methods=['GET'])
+@token_required
+def get_sync_changes(current_user_id):
+    """
+    Retorna as mudanças desde o token informado (`since`).
+    Transações, objetivos e perfil alterados vêm completos; exclusões vêm
+    como tombstones. Quando o histórico já foi compactado além do token,
+    responde com full_resync_required e o token atual.
+    """
+    since = request.args.get('since', type=int)
+    limit = min(request.args.get('limit', 500, type=int), 1000)
+    if limit <= 0:
+        return jsonify({'success': False, 'error': 'Limite inválido'}), 400
+
+    if since is None or since < get_sync_floor(current_user_id):
+        return jsonify({
+            'success': True,
+            'data': {
+                'token': str(get_current_sync_token(current_user_id)),
+                'full_resync_required': True,
+                'has_more': False
+            }
+        })
+
+    changes, next_token, has_more = get_changes_since(current_user_id, since, limit)
+
+    upserted = {'transaction': [], 'objective': [], 'profile': [], 'user': []}
+    tombstones = []
+    for (entity, entity_id), operation in changes.items():
+        if operation == 'delete':
+            tombstones.append({'entity': entity, 'id': entity_id})
+        else:
+            upserted[entity].append(entity_id)
+
+    transactions = Transaction.query.filter(
+        Transaction.user_id == current_user_id,
+        Transaction.id.in_(upserted['transaction'])
+    ).order_by(desc(Transaction.date)).all() if upserted['transaction'] else []
+
+    objectives = Objective.query.filter(
+        Objective.user_id == current_user_id,
+        Objective.id.in_(upserted['objective'])
+    ).all() if upserted['objective'] else []
+
+    profiles = BettingProfile.query.filter(
+        BettingProfile.user_id == current_user_id,
+        BettingProfile.id.in_(upserted['profile'])
+    ).all() if upserted['profile'] else []
+
+    user = get_user_context().user if upserted['user'] else None
+
+    return jsonify({
+        'success': True,
+        'data': {
+            'token': str(next_token),
+            'full_resync_required': False,
+            'has_more': has_more,
+            'transactions': [_transaction_to_dict(tx) for tx in transactions],
+            'objectives': [_objective_to_dict(obj) for obj in objectives],
+            'betting_profiles': [
+                dict(_betting_profile_to_dict(p), is_active=p.is_active) for p in profiles
+            ],
+            'user': {
+                'id': user.id,
+                'name': user.name,
+                'email': user.email,
+                'profile_photo': user.profile_photo
+            } if user else None,
+            'deleted': tombstones
+        }
+    })
+
 # === ANALYTICS ROUTES ===
 
 @main.route('/analytics/overview', methods=['GET'])
 @token_required
 def get_analytics_overview(current_user_id):
+    return jsonify({
+        'success': True,
+        'data': _analytics_overview_data(get_user_context())
+    })
+
+def _analytics_overview_data(ctx):
     # CORREÇÃO: Lógica de saldo instável substituída + inclusão da banca inicial
-    current_balance = _get_user_balance(current_user_id)
-    initial_bank = _get_user_initial_bank(current_user_id)
+    current_balance = ctx.balance
+    initial_bank = ctx.initial_bank
     
-    profile = BettingProfile.query.filter_by(user_id=current_user_id, is_active=True).first()
-    
-    total_deposits = db.session.query(func.sum(Transaction.amount)).filter(
-        Transaction.user_id == current_user_id,
-        Transaction.type == 'deposit'
-    ).scalar() or Decimal('0.00')
+    profile = ctx.profile
     
-    total_withdrawals = db.session.query(func.sum(Transaction.amount)).filter(
-        Transaction.user_id == current_user_id,
-        Transaction.type == 'withdraw'
-    ).scalar() or Decimal('0.00')
+    total_deposits = ctx.summary.total_deposits
+    total_withdrawals = ctx.summary.total_withdrawals
     
     # Usar a banca inicial real do usuário
     real_profit = current_balance - initial_bank
     roi = ((current_balance - initial_bank) / initial_bank * 100) if initial_bank > 0 else 0
     
-    return jsonify({
-        'success': True,
-        'data': {
-            'current_balance': str(current_balance),
-            'initial_balance': str(initial_bank),  # Agora usa a banca real do cadastro
-            'total_deposits': str(total_deposits),
-            'total_withdrawals': str(total_withdrawals),
-            'real_profit': str(real_profit),
-            'roi_percentage': round(float(roi), 2),
-            'stop_loss': str(profile.stop_loss) if profile else '0.00',
-            'profit_target': str(profile.profit_target) if profile else '0.00',
-            'risk_level': profile.risk_level if profile else 5
-        }
-    })
+    return {
+        'current_balance': str(current_balance),
+        'initial_balance': str(initial_bank),  # Agora usa a banca real do cadastro
+        'total_deposits': str(total_deposits),
+        'total_withdrawals': str(total_withdrawals),
+        'real_profit': str(real_profit),
+        'roi_percentage': round(float(roi), 2),
+        'stop_loss': str(profile.stop_loss) if profile else '0.00',
+        'profit_target': str(profile.profit_target) if profile else '0.00',
+        'risk_level': profile.risk_level if profile else 5
+    }
 
 @main.route('/analytics/monthly', methods=['GET'])
 @token_required
 def get_monthly_analytics(current_user_id):
+    """
+    Últimos N meses de calendário (months, padrão 6), inclusive os vazios:
+    depósitos, saques, ganhos, perdas, resultado (ganhos - perdas), fluxo
+    líquido do mês (balance) e saldo de fechamento.
+    """
     months = request.args.get('months', 6, type=int)
+    series = _monthly_analytics_data(current_user_id, months)
     
-    start_date = datetime.utcnow() - timedelta(days=months * 30)
+    max_points = _get_max_points()
+    if max_points:
+        series = downsample_rows(series, max_points, None, 'closing_balance')
     
-    monthly_data = db.session.query(
-        extract('year', Transaction.date).label('year'),
-        extract('month', Transaction.date).label('month'),
-        Transaction.type,
-        func.sum(Transaction.amount).label('total')
-    ).filter(
-        Transaction.user_id == current_user_id,
-        Transaction.date >= start_date
-    ).group_by(
-        extract('year', Transaction.date),
-        extract('month', Transaction.date),
-        Transaction.type
-    ).all()
-    
-    result = {}
-    for year, month, tx_type, total in monthly_data:
-        key = f"{int(year)}-{int(month):02d}"
-        if key not in result:
-            result[key] = {'deposits': 0, 'withdraws': 0, 'month': key}
-        
-        if tx_type == 'deposit':
-            result[key]['deposits'] = float(total)
-        else:
-            result[key]['withdraws'] = float(total)
-    
-    for data in result.values():
-        data['balance'] = data['deposits'] - data['withdraws']
+    if _wants_columnar():
+        columns = MONTHLY_ANALYTICS_COLUMNS
+        return jsonify(_columnar_payload(
+            columns,
+            [tuple(data[c] for c in columns) for data in series]
+        ))
     
     return jsonify({
         'success': True,
-        'data': list(result.values())
+        'data': series
     })
 
+MONTHLY_ANALYTICS_COLUMNS = (
+    'month', 'deposits', 'withdraws', 'gains', 'losses', 'net_result', 'balance', 'closing_balance'
+)
+
+def _monthly_analytics_data(current_user_id, months):
+    months = min(max(months or 1, 1), MAX_MONTHS)
+    rows = get_monthly_series(
+        current_user_id, months, current_app.config.get('DEFAULT_TIMEZONE', 'America/Sao_Paulo')
+    )
+    # Valores numéricos (não string) como o gráfico mensal sempre recebeu
+    return [
+        {column: row.month if column == 'month' else float(getattr(row, column))
+         for column in MONTHLY_ANALYTICS_COLUMNS}
+        for row in rows
+    ]
+
+# Colunas das séries lidas dos rollups (expressões sobre a linha `s`)
+CASH_FLOW_COLUMNS = {
+    'deposits': 's.total_deposits',
+    'withdrawals': 's.total_withdrawals',
+    'net_flow': 's.total_deposits - s.total_withdrawals',
+}
+OPERATIONAL_COLUMNS = {
+    'gains': 's.total_gains',
+    'losses': 's.total_losses',
+    'net_result': 's.total_gains - s.total_losses',
+}
+
+@main.route('/analytics/cash-flow', methods=['GET'])
+@token_required
+def get_cash_flow_analysis(current_user_id):
+    """
+    Depósitos x saques por bucket (dia/semana/mês) lidos dos rollups, com
+    os totais exatos do intervalo. Mesmos parâmetros de /balance/history.
+    """
+    tz_name = current_app.config.get('DEFAULT_TIMEZONE', 'America/Sao_Paulo')
+    series_args, error = _get_series_args(current_user_id, tz_name)
+    if error:
+        return error
+    first_day, last_day, granularity, _ = series_args
+
+    rows = get_rollup_series(current_user_id, first_day, last_day, granularity, CASH_FLOW_COLUMNS)
+    totals = get_transaction_stats(current_user_id, first_day, last_day, tz_name)
+
+    return jsonify(_series_payload(rows, series_args, 'net_flow', totals={
+        'deposits': str(totals.total_deposits),
+        'withdrawals': str(totals.total_withdrawals),
+        'net_flow': str(totals.total_deposits - totals.total_withdrawals)
+    }))
+
+@main.route('/analytics/operational-performance', methods=['GET'])
+@token_required
+def get_operational_performance(current_user_id):
+    """
+    Ganhos x perdas por bucket lidos dos rollups, estatísticas das operações
+    do intervalo (taxa de acerto, médias, Sharpe) e resultado por jogo.
+    Mesmos parâmetros de /balance/history.
+    """
+    tz_name = current_app.config.get('DEFAULT_TIMEZONE', 'America/Sao_Paulo')
+    series_args, error = _get_series_args(current_user_id, tz_name)
+    if error:
+        return error
+    first_day, last_day, granularity, _ = series_args
+
+    rows = get_rollup_series(current_user_id, first_day, last_day, granularity, OPERATIONAL_COLUMNS)
+    totals = get_transaction_stats(current_user_id, first_day, last_day, tz_name)
+    games = [
+        {
+            'game_type': game.game_type,
+            'total_trades': game.total_trades,
+            'winning_trades': game.winning_trades,
+            'win_rate': round(game.winning_trades / game.total_trades * 100, 2),
+            'gains': str(game.gains),
+            'losses': str(game.losses),
+            'net_result': str(game.net_result)
+        }
+        for game in get_game_results(current_user_id, first_day, last_day, tz_name)
+    ]
+
+    return jsonify(_series_payload(rows, series_args, 'net_result', totals=_trade_stats_dict(totals), by_game=games))
+
 # === BETTING SESSION ROUTES ===
 
 @main.route('/betting-sessions', methods=['POST'])
@@ -1182,7 +1703,7 @@ def start_betting_session(current_user_id):
     data = request.json
     
     # CORREÇÃO: Lógica de saldo instável substituída
-    current_balance = _get_user_balance(current_user_id)
+    current_balance = get_user_context().balance
     
     session = BettingSession(
         user_id=current_user_id,
@@ -1215,7 +1736,7 @@ def end_betting_session(current_user_id, session_id):
         return jsonify({'error': 'Session not found'}), 404
     
     # CORREÇÃO: Lógica de saldo instável substituída
-    current_balance = _get_user_balance(current_user_id)
+    current_balance = get_user_context().balance
     
     session.end_balance = current_balance
     session.ended_at = datetime.utcnow()
@@ -1242,70 +1763,63 @@ def end_betting_session(current_user_id, session_id):
 @token_required
 def get_performance_stats(current_user_id):
     period = request.args.get('period', 'monthly')
+    return jsonify({
+        'success': True,
+        'data': _performance_stats_data(get_user_context(), period)
+    })
+
+def _performance_stats_data(ctx, period):
+    today = local_today(current_app.config.get('DEFAULT_TIMEZONE', 'America/Sao_Paulo'))
+    start_day = _stats_period_start(period, today) or today - STATS_PERIODS['yearly']
     
-    now = datetime.utcnow()
-    if period == 'daily':
-        start_date = now - timedelta(days=30)
-    elif period == 'weekly':
-        start_date = now - timedelta(weeks=12)
-    elif period == 'monthly':
-        start_date = now - timedelta(days=365)
-    else:
-        start_date = now - timedelta(days=365 * 3)
-    
-    profile = BettingProfile.query.filter_by(user_id=current_user_id, is_active=True).first()
-    
-    stats = db.session.query(
-        func.count(BettingSession.id).label('total_sessions'),
-        func.sum(BettingSession.net_result).label('total_profit'),
-        func.avg(BettingSession.net_result).label('avg_session_result'),
-        func.max(BettingSession.net_result).label('best_session'),
-        func.min(BettingSession.net_result).label('worst_session')
-    ).filter(
-        BettingSession.user_id == current_user_id,
-        BettingSession.started_at >= start_date,
-        BettingSession.status == 'completed'
-    ).first()
+    profile = ctx.profile
     
-    winning_sessions = db.session.query(func.count(BettingSession.id)).filter(
-        BettingSession.user_id == current_user_id,
-        BettingSession.started_at >= start_date,
-        BettingSession.net_result > 0,
-        BettingSession.status == 'completed'
-    ).scalar() or 0
+    # Sessões concluídas somadas dos rollups diários (mantidos na escrita)
+    stats = get_session_totals(ctx.user_id, start_day)
     
-    total_sessions = stats.total_sessions or 0
+    total_sessions = stats.total_sessions
+    winning_sessions = stats.winning_sessions
     win_rate = (winning_sessions / total_sessions * 100) if total_sessions > 0 else 0
+    avg_session_result = (
+        (stats.total_profit / total_sessions).quantize(Decimal('0.01')) if total_sessions > 0 else None
+    )
     
-    initial_bank = _get_user_initial_bank(current_user_id)
-    
-    return jsonify({
-        'success': True,
-        'data': {
-            'period': period,
-            'total_sessions': total_sessions,
-            'winning_sessions': winning_sessions,
-            'win_rate': round(win_rate, 2),
-            'total_profit': str(stats.total_profit or Decimal('0.00')),
-            'avg_session_result': str(stats.avg_session_result or Decimal('0.00')),
-            'best_session': str(stats.best_session or Decimal('0.00')),
-            'worst_session': str(stats.worst_session or Decimal('0.00')),
-            'initial_balance': str(initial_bank),  # Agora usa a banca real do cadastro
-            'current_stop_loss': str(profile.stop_loss) if profile else '0.00',
-            'current_profit_target': str(profile.profit_target) if profile else '0.00'
-        }
-    })
+    initial_bank = ctx.initial_bank
+    
+    return {
+        'period': period,
+        'total_sessions': total_sessions,
+        'winning_sessions': winning_sessions,
+        'win_rate': round(win_rate, 2),
+        'total_profit': str(stats.total_profit or Decimal('0.00')),
+        'avg_session_result': str(avg_session_result or Decimal('0.00')),
+        'best_session': str(stats.best_session or Decimal('0.00')),
+        'worst_session': str(stats.worst_session or Decimal('0.00')),
+        'initial_balance': str(initial_bank),  # Agora usa a banca real do cadastro
+        'current_stop_loss': str(profile.stop_loss) if profile else '0.00',
+        'current_profit_target': str(profile.profit_target) if profile else '0.00'
+    }
 
 @main.route('/stats/risk-analysis', methods=['GET'])
 @token_required
 def get_risk_analysis(current_user_id):
-    profile = BettingProfile.query.filter_by(user_id=current_user_id, is_active=True).first()
-    
-    current_balance = _get_user_balance(current_user_id)
-    initial_bank = _get_user_initial_bank(current_user_id)  # Usar banca real do cadastro
+    data = _risk_analysis_data(get_user_context())
+    if data is None:
+        return jsonify({'error': 'No betting profile found'}), 404
     
+    return jsonify({
+        'success': True,
+        'data': data
+    })
+
+def _risk_analysis_data(ctx):
+    """Análise de risco do perfil ativo (None quando não há perfil)"""
+    profile = ctx.profile
     if not profile:
-        return jsonify({'error': 'No betting profile found'}), 404
+        return None
+    
+    current_balance = ctx.balance
+    initial_bank = ctx.initial_bank  # Usar banca real do cadastro
     
     stop_loss = profile.stop_loss
     profit_target = profile.profit_target
@@ -1325,40 +1839,360 @@ def get_risk_analysis(current_user_id):
     elif profit_target > 0 and current_balance >= target_balance:
         risk_status = 'target_achieved'
     
-    max_balance = db.session.query(func.max(Transaction.balance_after)).filter(
-        Transaction.user_id == current_user_id
-    ).scalar() or initial_bank
+    # Pico e pior pico-vale da série de saldo real (não dos balance_after gravados)
+    drawdown = ctx.drawdown
+    max_balance = drawdown['peak'] if drawdown['peak'] is not None else initial_bank
     
     current_drawdown = max_balance - current_balance
     drawdown_percentage = (current_drawdown / max_balance * 100) if max_balance > 0 else 0
     
+    return {
+        'current_balance': str(current_balance),
+        'initial_balance': str(initial_bank),  # Agora usa a banca real do cadastro
+        'risk_level': profile.risk_level,
+        'risk_status': risk_status,
+        'stop_loss': {
+            'value': str(stop_loss),
+            'distance': str(stop_loss_distance) if stop_loss_distance else None,
+            'percentage': round(stop_loss_percentage, 2) if stop_loss_percentage else None,
+            'is_active': stop_loss > 0
+        },
+        'profit_target': {
+            'value': str(target_balance),
+            'distance': str(profit_target_distance) if profit_target_distance else None,
+            'percentage': round(profit_target_percentage, 2) if profit_target_percentage else None,
+            'is_active': profit_target > 0
+        },
+        'drawdown': {
+            'current': str(current_drawdown),
+            'percentage': round(drawdown_percentage, 2),
+            'max_balance': str(max_balance),
+            'peak_date': _isoformat(drawdown['peak_date']),
+            'max': _max_drawdown_dict(drawdown)
+        }
+    }
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+def _max_drawdown_dict(drawdown):
+    """Pior queda pico-vale da história, com datas e tempo até recuperar o pico"""
+    max_peak = drawdown['max_peak']
+    recovery_date = drawdown['recovery_date']
+    return {
+        'amount': str(drawdown['max_drawdown']),
+        'percentage': round(drawdown['max_drawdown'] / max_peak * 100, 2) if max_peak and max_peak > 0 else 0,
+        'peak_balance': str(max_peak) if max_peak is not None else None,
+        'peak_date': _isoformat(drawdown['max_peak_date']),
+        'trough_balance': str(drawdown['trough']) if drawdown['trough'] is not None else None,
+        'trough_date': _isoformat(drawdown['trough_date']),
+        'recovery_date': _isoformat(recovery_date),
+        'recovery_days': (recovery_date - drawdown['trough_date']).days if recovery_date else None,
+        'recovered': recovery_date is not None
+    }
+
+def _game_mix(user_id):
+    """Peso de cada jogo configurado pelas operações do usuário (roleta se não houver)"""
+    rows = db.session.query(Transaction.game_type, func.count(Transaction.id)).filter(
+        Transaction.user_id == user_id,
+        Transaction.type.in_(('gains', 'losses')),
+        Transaction.game_type.in_(list(GAME_CONFIGURATIONS))
+    ).group_by(Transaction.game_type).all()
+    return dict(rows) or {'roulette': 1}
+
+def _max_bet_percentage(risk_level):
+    """Aposta máxima recomendada (% da banca) para o nível de risco do perfil"""
+    for level in RISK_LEVELS.values():
+        low, high = level['range']
+        if low <= risk_level <= high:
+            return level['recommended_max_bet_percentage']
+    return RISK_LEVELS['conservative']['recommended_max_bet_percentage']
+
+@main.route('/stats/risk-of-ruin', methods=['GET'])
+@token_required
+def get_risk_of_ruin(current_user_id):
+    """
+    Monte Carlo da banca atual até o stop loss ou a meta do perfil ativo,
+    com a mistura de jogos das operações do usuário (ou `games=roleta,...`)
+    e house edge/volatilidade de GAME_CONFIGURATIONS. Parâmetros: paths,
+    max_rounds, seed. Roda no pool de processos com orçamento de tempo e o
+    resultado fica em cache pela versão do perfil.
+    """
+    if np is None:
+        return jsonify({'success': False, 'error': 'Simulação indisponível'}), 503
+
+    ctx = get_user_context()
+    profile = ctx.profile
+    if not profile:
+        return jsonify({'error': 'No betting profile found'}), 404
+
+    start_balance = ctx.balance
+    if start_balance <= 0:
+        return jsonify({'success': False, 'error': 'Saldo insuficiente para simular'}), 400
+
+    if request.args.get('games'):
+        mix = {game: 1 for game in request.args['games'].split(',')}
+        if not set(mix) <= set(GAME_CONFIGURATIONS):
+            return jsonify({'success': False, 'error': 'Jogo inválido'}), 400
+    else:
+        mix = _game_mix(current_user_id)
+
+    config = current_app.config
+    paths = request.args.get('paths', config.get('RISK_SIMULATION_PATHS', 5000), type=int)
+    paths = min(max(paths, 100), config.get('RISK_SIMULATION_MAX_PATHS', 20000))
+    max_rounds = request.args.get('max_rounds', config.get('RISK_SIMULATION_MAX_ROUNDS', 1000), type=int)
+    max_rounds = min(max(max_rounds, 1), config.get('RISK_SIMULATION_MAX_ROUNDS', 1000))
+    seed = request.args.get('seed', type=int)
+
+    floor = profile.stop_loss if profile.stop_loss > 0 else Decimal('0.00')
+    target = ctx.initial_bank + profile.profit_target if profile.profit_target > 0 else None
+
+    # Aposta fixa por rodada: % recomendado do nível de risco, dentro dos limites do jogo
+    bet_fraction = Decimal(_max_bet_percentage(profile.risk_level)) / 100
+    games = []
+    for game, weight in sorted(mix.items()):
+        settings = GAME_CONFIGURATIONS[game]
+        fraction = min(max(bet_fraction, Decimal(str(settings['min_bet_multiplier']))),
+                       Decimal(str(settings['max_bet_multiplier'])))
+        games.append({
+            'game': game,
+            'weight': weight,
+            'bet': (start_balance * fraction).quantize(Decimal('0.01')),
+            'house_edge': settings['house_edge'],
+            'volatility': settings['volatility']
+        })
+
+    params = {
+        'start': float(start_balance),
+        'floor': float(floor),
+        'target': float(target) if target is not None else None,
+        'games': [
+            (game['weight'], float(game['bet']), game['house_edge'] / 100, VOLATILITY_STD[game['volatility']])
+            for game in games
+        ],
+        'paths': paths,
+        'max_rounds': max_rounds,
+        'seed': seed,
+    }
+    profile_version = f'{profile.id}-{profile.updated_at.timestamp() if profile.updated_at else 0}'
+
+    try:
+        result = ledger_cached(
+            'risk-of-ruin', current_user_id, profile_version, tuple(sorted(params.items())),
+            lambda: run_simulation(
+                params,
+                config.get('RISK_SIMULATION_WORKERS', 2),
+                config.get('RISK_SIMULATION_TIME_BUDGET', 2.0)
+            )
+        )
+    except TimeoutError:
+        return jsonify({'success': False, 'error': 'Simulação excedeu o tempo limite'}), 503
+
     return jsonify({
         'success': True,
-        'data': {
-            'current_balance': str(current_balance),
-            'initial_balance': str(initial_bank),  # Agora usa a banca real do cadastro
-            'risk_level': profile.risk_level,
-            'risk_status': risk_status,
-            'stop_loss': {
-                'value': str(stop_loss),
-                'distance': str(stop_loss_distance) if stop_loss_distance else None,
-                'percentage': round(stop_loss_percentage, 2) if stop_loss_percentage else None,
-                'is_active': stop_loss > 0
-            },
-            'profit_target': {
-                'value': str(target_balance),
-                'distance': str(profit_target_distance) if profit_target_distance else None,
-                'percentage': round(profit_target_percentage, 2) if profit_target_percentage else None,
-                'is_active': profit_target > 0
-            },
-            'drawdown': {
-                'current': str(current_drawdown),
-                'percentage': round(drawdown_percentage, 2),
-                'max_balance': str(max_balance)
-            }
-        }
+        'data': dict(result, inputs={
+            'start_balance': str(start_balance),
+            'stop_loss': str(floor),
+            'target': str(target) if target is not None else None,
+            'max_rounds': max_rounds,
+            'games': [dict(game, bet=str(game['bet'])) for game in games]
+        })
     })
 
+# === BOOTSTRAP ===
+
+# Seções do /bootstrap: nome -> função (agregados) que monta os dados
+BOOTSTRAP_SECTIONS = {
+    'profile': lambda ctx: _betting_profile_to_dict(ctx.profile) if ctx.profile else None,
+    'balance': _balance_data,
+    'transactions': lambda ctx: _transaction_list_query(ctx.user_id).all(),
+    'objectives': lambda ctx: _objectives_data(ctx.user_id),
+    'overview': _analytics_overview_data,
+    'monthly': lambda ctx: _monthly_analytics_data(
+        ctx.user_id, request.args.get('months', 6, type=int)
+    ),
+    'performance': lambda ctx: _performance_stats_data(
+        ctx, request.args.get('period', 'monthly')
+    ),
+    'risk': _risk_analysis_data,
+}
+
+@main.route('/bootstrap', methods=['GET'])
+@token_required
+def get_bootstrap(current_user_id):
+    """
+    Carga inicial do dashboard em uma única resposta: perfil, saldo,
+    transações, objetivos, overview, mensal, performance e risco.
+    `include=balance,objectives` limita as seções; months e period seguem
+    os mesmos parâmetros das rotas individuais. Saldo, banca inicial e perfil
+    são consultados uma única vez para todas as seções.
+    """
+    include = request.args.get('include')
+    if include:
+        sections = [name.strip() for name in include.split(',') if name.strip()]
+        unknown = [name for name in sections if name not in BOOTSTRAP_SECTIONS]
+        if unknown:
+            return jsonify({
+                'success': False,
+                'error': f"Seções inválidas: {', '.join(unknown)}"
+            }), 400
+    else:
+        sections = list(BOOTSTRAP_SECTIONS)
+
+    ctx = get_user_context()
+    return jsonify({
+        'success': True,
+        'data': {name: BOOTSTRAP_SECTIONS[name](ctx) for name in sections}
+    })
+
+# === LIVE EVENTS (SSE) ===
+
+def _live_balance_events(ctx):
+    """
+    Eventos de saldo enviados ao cliente conectado: saldo atual e, quando o
+    saldo está a menos de 10% da banca inicial do stop loss (mesma regra do
+    risk-analysis), stop_loss_approached.
+    """
+    current_balance = ctx.balance
+    initial_bank = ctx.initial_bank
+    events = [(BALANCE_CHANGED, {
+        'balance': str(current_balance),
+        'profit_loss': str(current_balance - initial_bank)
+    })]
+    
+    profile = ctx.profile
+    if profile and profile.stop_loss > 0:
+        distance = current_balance - profile.stop_loss
+        if distance < initial_bank * Decimal('0.1'):
+            events.append(('stop_loss_approached', {
+                'balance': str(current_balance),
+                'stop_loss': str(profile.stop_loss),
+                'distance': str(distance),
+                'hit': current_balance <= profile.stop_loss
+            }))
+    return events
+
+@main.route('/stream/events', methods=['GET'])
+def stream_events():
+    """
+    Stream SSE com balance_changed, stop_loss_approached, objective_completed
+    e session_updated, emitidos quando as escritas são confirmadas.
+    EventSource não envia cabeçalhos, então o token também é aceito em ?token=.
+    A conexão é encerrada após SSE_MAX_STREAM_SECONDS e o navegador reconecta.
+    Em produção deve rodar com worker assíncrono (gevent) para que clientes
+    ociosos não ocupem um worker síncrono.
+    """
+    current_user_id, error = _authenticate(
+        request.headers.get('Authorization') or request.args.get('token')
+    )
+    if error:
+        return error
+    
+    heartbeat = current_app.config.get('SSE_HEARTBEAT_SECONDS', 15)
+    max_seconds = current_app.config.get('SSE_MAX_STREAM_SECONDS', 300)
+    subscription = get_broker().subscribe(current_user_id)
+    
+    def generate():
+        try:
+            yield 'retry: 5000\n\n'
+            deadline = time.monotonic() + max_seconds
+            while time.monotonic() < deadline:
+                message = subscription.get(timeout=min(heartbeat, max(deadline - time.monotonic(), 0)))
+                if message is None:
+                    yield ': ping\n\n'
+                    continue
+                if message['event'] == BALANCE_CHANGED:
+                    events = _live_balance_events(UserContext(current_user_id))
+                    db.session.close()  # Devolve a conexão ao pool entre eventos
+                else:
+                    events = [(message['event'], message['data'])]
+                for name, data in events:
+                    yield format_sse(name, data)
+        finally:
+            subscription.close()
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+# === BATCH ===
+
+# Métodos aceitos nas sub-requisições (somente leitura)
+BATCH_METHODS = ('GET',)
+# Rotas que não podem ser chamadas de dentro do batch
+BATCH_EXCLUDED_ENDPOINTS = {'main.batch_requests', 'main.stream_events'}
+
+def _dispatch_batch_item(item, ctx):
+    """
+    Executa uma sub-requisição pelo url_map do app dentro do contexto atual.
+    O contexto de aplicação é reaproveitado, então todas as sub-requisições
+    usam a mesma sessão (e conexão) do banco e o mesmo UserContext, sem
+    decodificar o JWT nem recarregar usuário e saldo a cada item.
+    """
+    method = (item.get('method') or 'GET').upper()
+    path = item.get('path')
+    if not isinstance(path, str) or not path.startswith('/'):
+        return {'status': 400, 'body': {'error': 'Caminho inválido'}}
+    if method not in BATCH_METHODS:
+        return {'status': 405, 'body': {'error': 'Método não permitido no batch'}}
+
+    builder = EnvironBuilder(
+        path=path,
+        method=method,
+        query_string=item.get('query')
+    )
+    environ = builder.get_environ()
+    environ[BATCH_CONTEXT_KEY] = ctx
+    with current_app.request_context(environ):
+        if isinstance(request.routing_exception, MethodNotAllowed):
+            return {'status': 405, 'body': {'error': 'Método não permitido'}}
+        if request.blueprint != main.name or request.endpoint in BATCH_EXCLUDED_ENDPOINTS:
+            return {'status': 404, 'body': {'error': 'Not found'}}
+        try:
+            response = current_app.make_response(current_app.dispatch_request())
+        except HTTPException as e:
+            response = current_app.make_response(current_app.handle_user_exception(e))
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.exception(f'Erro no item do batch {path}: {str(e)}')
+            return {'status': 500, 'body': {'error': 'Internal server error'}}
+
+    return {'status': response.status_code, 'body': response.get_json(silent=True)}
+
+@main.route('/batch', methods=['POST'])
+@token_required
+def batch_requests(current_user_id):
+    """
+    Multiplexa várias leituras em uma chamada. Corpo:
+    {"requests": [{"id": "...", "method": "GET", "path": "/balance", "query": {...}}]}
+    Cada item volta com status e body próprios, na mesma ordem.
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get('requests')
+    if not isinstance(items, list) or not items:
+        return jsonify({'success': False, 'error': 'Informe a lista requests'}), 400
+
+    max_items = current_app.config.get('BATCH_MAX_ITEMS', 20)
+    if len(items) > max_items:
+        return jsonify({
+            'success': False,
+            'error': f'Máximo de {max_items} requisições por batch'
+        }), 400
+
+    ctx = get_user_context()
+    results = []
+    for item in items:
+        if not isinstance(item, dict):
+            result = {'status': 400, 'body': {'error': 'Item inválido'}}
+        else:
+            result = _dispatch_batch_item(item, ctx)
+            if 'id' in item:
+                result['id'] = item['id']
+        results.append(result)
+
+    return jsonify({'success': True, 'data': results})
+
 # === ERROR HANDLERS ===
 
 @main.errorhandler(400)
@@ -1395,14 +2229,36 @@ def health_check():
 @main.route('/categories', methods=['GET'])
 @token_required
 def get_categories(current_user_id):
-    categories = db.session.query(Transaction.category).filter(
-        Transaction.user_id == current_user_id,
-        Transaction.category.isnot(None)
-    ).distinct().all()
+    # Lê a tabela de termos (mantida na escrita) em vez de um DISTINCT no histórico
+    categories = db.session.query(AutocompleteTerm.term).filter(
+        AutocompleteTerm.user_id == current_user_id,
+        AutocompleteTerm.field == 'category'
+    ).order_by(AutocompleteTerm.uses.desc(), AutocompleteTerm.term).all()
     
     return jsonify({
         'success': True,
-        'data': [cat[0] for cat in categories if cat[0]]
+        'data': [cat[0] for cat in categories]
+    })
+
+@main.route('/autocomplete', methods=['GET'])
+@token_required
+def get_autocomplete(current_user_id):
+    """
+    Sugestões para o formulário de transação, ordenadas por frequência de uso.
+    Parâmetros: field (category|description), prefix, limit (máx. 20)
+    """
+    field = request.args.get('field', 'category')
+    if field not in AUTOCOMPLETE_FIELDS:
+        return jsonify({'success': False, 'error': 'Campo inválido'}), 400
+
+    prefix = request.args.get('prefix', '').strip()
+    limit = min(max(request.args.get('limit', 8, type=int) or 1, 1), 20)
+
+    suggestions = suggest_terms(current_user_id, field, prefix, limit)
+
+    return jsonify({
+        'success': True,
+        'data': [{'value': term, 'uses': uses} for term, uses in suggestions]
     })
 
 @main.route('/game-types', methods=['GET'])
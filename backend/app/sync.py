@@ -0,0 +1,154 @@
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import event, text
+from . import db
+from .models import User, Transaction, BettingProfile, Objective, ChangeLog, SyncState
+
+# Entidades sincronizáveis: modelo -> (nome da entidade, atributo com o dono)
+TRACKED_ENTITIES = {
+    Transaction: ('transaction', 'user_id'),
+    Objective: ('objective', 'user_id'),
+    BettingProfile: ('profile', 'user_id'),
+    User: ('user', 'id'),
+}
+
+# === CHANGE TRACKING ===
+
+def _collect_changes(session):
+    """Monta as linhas do change_log para o estado atual do flush"""
+    changes = {}
+
+    def record(obj, operation):
+        spec = TRACKED_ENTITIES.get(type(obj))
+        if spec is None:
+            return
+        entity, owner_attr = spec
+        user_id = getattr(obj, owner_attr)
+        if user_id is None or obj.id is None:
+            return
+        # Uma linha por entidade por flush; exclusão prevalece
+        key = (entity, obj.id)
+        if changes.get(key, {}).get('operation') == 'delete':
+            return
+        changes[key] = {
+            'user_id': user_id,
+            'entity': entity,
+            'entity_id': obj.id,
+            'operation': operation,
+            'created_at': datetime.utcnow(),
+        }
+
+    for obj in session.new:
+        record(obj, 'upsert')
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            record(obj, 'upsert')
+    for obj in session.deleted:
+        # A exclusão de um usuário remove tudo; não há a quem sincronizar
+        if isinstance(obj, User):
+            continue
+        record(obj, 'delete')
+
+    return list(changes.values())
+
+def _reserve_seqs(session, user_id, count):
+    """
+    Reserva `count` seqs do usuário e retorna o último. O UPDATE trava a
+    linha de sync_state até o commit: outra escrita do mesmo usuário espera,
+    então um seq maior nunca fica visível antes de um menor.
+    """
+    return session.execute(text("""
+        INSERT INTO sync_state (user_id, compacted_through, last_seq, updated_at)
+        VALUES (:user_id, 0, :count, now() AT TIME ZONE 'UTC')
+        ON CONFLICT (user_id) DO UPDATE
+        SET last_seq = sync_state.last_seq + EXCLUDED.last_seq,
+            updated_at = EXCLUDED.updated_at
+        RETURNING last_seq
+    """), {'user_id': user_id, 'count': count}).scalar()
+
+def _after_flush(session, flush_context):
+    rows = _collect_changes(session)
+    if not rows:
+        return
+    # Usuários em ordem fixa para que duas transações não travem em ordem inversa
+    counts = Counter(row['user_id'] for row in rows)
+    next_seq = {}
+    for user_id in sorted(counts):
+        next_seq[user_id] = _reserve_seqs(session, user_id, counts[user_id]) - counts[user_id] + 1
+    for row in rows:
+        row['seq'] = next_seq[row['user_id']]
+        next_seq[row['user_id']] += 1
+    session.execute(ChangeLog.__table__.insert(), rows)
+
+def init_change_tracking():
+    """Registra o listener que grava o change_log a cada flush"""
+    if not event.contains(db.session, 'after_flush', _after_flush):
+        event.listen(db.session, 'after_flush', _after_flush)
+
+# === SYNC QUERIES ===
+
+def get_sync_floor(user_id):
+    """Retorna o maior seq já compactado para o usuário (0 se nunca compactado)"""
+    state = db.session.get(SyncState, user_id)
+    return state.compacted_through if state else 0
+
+def get_current_sync_token(user_id):
+    """Último seq atribuído ao usuário (0 se nunca houve mudança)"""
+    last_seq = db.session.query(SyncState.last_seq).filter(
+        SyncState.user_id == user_id
+    ).scalar()
+    return last_seq or 0
+
+def get_ledger_version(user_id):
+    """
+    Versão dos dados do usuário para ETags e chaves de cache: muda a cada
+    escrita registrada no change_log e nunca volta atrás.
+    """
+    return get_current_sync_token(user_id)
+
+def get_changes_since(user_id, since, limit):
+    """
+    Retorna (mudanças colapsadas por entidade, próximo token, has_more).
+    Cada entidade aparece uma única vez com a última operação registrada.
+    """
+    rows = db.session.query(
+        ChangeLog.seq, ChangeLog.entity, ChangeLog.entity_id, ChangeLog.operation
+    ).filter(
+        ChangeLog.user_id == user_id,
+        ChangeLog.seq > since
+    ).order_by(ChangeLog.seq).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    collapsed = {}
+    for _, entity, entity_id, operation in rows:
+        collapsed[(entity, entity_id)] = operation
+
+    next_token = rows[-1][0] if rows else since
+    return collapsed, next_token, has_more
+
+# === MAINTENANCE ===
+
+def compact_change_log(before):
+    """
+    Remove entradas do change_log anteriores a `before` e registra, por usuário,
+    até onde o histórico foi compactado. Clientes com token abaixo desse piso
+    recebem full_resync_required.
+    """
+    result = db.session.execute(text("""
+        WITH deleted AS (
+            DELETE FROM change_log
+            WHERE created_at < :before
+            RETURNING user_id, seq
+        )
+        INSERT INTO sync_state (user_id, compacted_through, last_seq, updated_at)
+        SELECT user_id, max(seq), max(seq), now() AT TIME ZONE 'UTC'
+        FROM deleted
+        GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE
+        SET compacted_through = GREATEST(sync_state.compacted_through, EXCLUDED.compacted_through),
+            updated_at = EXCLUDED.updated_at
+    """), {'before': before})
+    db.session.commit()
+    return result.rowcount
@@ -0,0 +1,73 @@
+from flask import current_app, g, has_app_context
+from sqlalchemy import event
+from . import db
+from .models import User, BettingProfile
+from .analytics import get_ledger_summary
+from .drawdown import get_drawdown
+
+class UserContext:
+    """
+    Dados do usuário autenticado carregados sob demanda e no máximo uma vez
+    por requisição: usuário, perfil ativo e resumo do ledger (saldo, banca
+    inicial, somas e contagens). Criado pelo token_required em `g`, então
+    nada sobrevive entre requisições. Um commit descarta o que foi carregado.
+    """
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self._loaded = {}
+
+    def _get(self, key, loader):
+        if key not in self._loaded:
+            self._loaded[key] = loader()
+        return self._loaded[key]
+
+    def invalidate(self):
+        self._loaded.clear()
+
+    @property
+    def user(self):
+        return self._get('user', lambda: db.session.get(User, self.user_id))
+
+    @property
+    def profile(self):
+        return self._get('profile', lambda: BettingProfile.query.filter_by(
+            user_id=self.user_id, is_active=True
+        ).first())
+
+    @property
+    def summary(self):
+        """Somas, contagens, banca inicial e última transação (uma consulta)"""
+        return self._get('summary', lambda: get_ledger_summary(
+            self.user_id, current_app.config.get('DEFAULT_TIMEZONE', 'America/Sao_Paulo')
+        ))
+
+    @property
+    def balance(self):
+        return self.summary.balance
+
+    @property
+    def initial_bank(self):
+        return self.summary.initial_bank
+
+    @property
+    def drawdown(self):
+        """Estado do drawdown da série de saldo (em cache por versão do ledger)"""
+        return self._get('drawdown', lambda: get_drawdown(self.user_id))
+
+def load_user_context(user_id):
+    g.user_context = UserContext(user_id)
+    return g.user_context
+
+def get_user_context():
+    return g.user_context
+
+def _after_commit(session):
+    # Escritas da própria requisição não podem deixar saldo/perfil antigos
+    if has_app_context() and 'user_context' in g:
+        g.user_context.invalidate()
+
+def init_user_context():
+    """Registra o listener que descarta o contexto carregado a cada commit"""
+    if not event.contains(db.session, 'after_commit', _after_commit):
+        event.listen(db.session, 'after_commit', _after_commit)
@@ -1,10 +1,19 @@
 from decimal import Decimal, ROUND_HALF_UP
 from datetime import datetime, timedelta, date
 from typing import Dict, List, Optional, Tuple
+from itertools import repeat
 import hashlib
 import secrets
 import re
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depende do ambiente
+    np = None
+
+# Abaixo disso o custo de converter para arrays não compensa
+NUMPY_MIN_POINTS = 64
+
 # === FINANCIAL CALCULATIONS ===
 
 def calculate_profit_loss(initial_balance: Decimal, current_balance: Decimal, withdrawals: Decimal = Decimal('0')) -> Decimal:
@@ -46,10 +55,10 @@ def calculate_sharpe_ratio(returns: List[Decimal], risk_free_rate: Decimal = Dec
     if not returns or len(returns) < 2:
         return Decimal('0')
     
-    # Calculate average return and standard deviation
-    avg_return = sum(returns) / len(returns)
-    variance = sum((r - avg_return) ** 2 for r in returns) / (len(returns) - 1)
-    std_dev = variance.sqrt() if variance > 0 else Decimal('0')
+    if _use_numpy(returns):
+        avg_return, std_dev = _numpy_mean_std(returns)
+    else:
+        avg_return, std_dev = _decimal_mean_std(returns)
     
     if std_dev == 0:
         return Decimal('0')
@@ -328,24 +337,79 @@ def calculate_moving_average(values: List[Decimal], window: int) -> List[Decimal
     if len(values) < window:
         return values
     
-    moving_averages = []
-    for i in range(len(values) - window + 1):
-        avg = sum(values[i:i+window]) / window
-        moving_averages.append(avg.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
-    
-    return moving_averages
+    if window > 0 and _use_numpy(values):
+        cents = _to_cents(values)
+        if cents is not None:
+            return _numpy_moving_average(cents, window)
+    return _decimal_moving_average(values, window)
 
 def calculate_volatility(returns: List[Decimal]) -> Decimal:
     """Calculate volatility (standard deviation) of returns"""
     if len(returns) < 2:
         return Decimal('0')
     
-    mean_return = sum(returns) / len(returns)
-    variance = sum((r - mean_return) ** 2 for r in returns) / (len(returns) - 1)
-    volatility = variance.sqrt() if variance > 0 else Decimal('0')
+    if _use_numpy(returns):
+        _, volatility = _numpy_mean_std(returns)
+    else:
+        _, volatility = _decimal_mean_std(returns)
     
     return volatility.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
 
+# Implementações das funções acima: NumPy vetorizado para séries grandes e
+# Decimal exato como referência (e quando o NumPy não está instalado).
+
+def _use_numpy(values) -> bool:
+    return np is not None and len(values) >= NUMPY_MIN_POINTS
+
+def _decimal_moving_average(values: List[Decimal], window: int) -> List[Decimal]:
+    """Soma deslizante em Decimal: O(n), exata"""
+    moving_averages = []
+    window_sum = sum(values[:window])
+    for i in range(len(values) - window + 1):
+        if i:
+            window_sum += values[i + window - 1] - values[i - 1]
+        avg = window_sum / window
+        moving_averages.append(avg.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+    return moving_averages
+
+def _decimal_mean_std(returns: List[Decimal]) -> Tuple[Decimal, Decimal]:
+    """Média e desvio padrão amostral em Decimal"""
+    mean = sum(returns) / len(returns)
+    variance = sum((r - mean) ** 2 for r in returns) / (len(returns) - 1)
+    return mean, variance.sqrt() if variance > 0 else Decimal('0')
+
+def _to_cents(values: List[Decimal]):
+    """
+    Valores como centavos int64, ou None quando algum tem mais de duas casas
+    ou é grande demais para o float64 representar o centavo (aí vale o
+    caminho Decimal).
+    """
+    scaled = _to_float_array(values) * 100
+    cents = np.rint(scaled)
+    if len(cents) and np.abs(cents).max() >= 1e12:
+        return None
+    if not np.all(np.abs(scaled - cents) <= np.maximum(np.abs(cents) * 1e-14, 1e-9)):
+        return None
+    return cents.astype(np.int64)
+
+def _to_float_array(values: List[Decimal]):
+    return np.fromiter(map(float, values), dtype=np.float64, count=len(values))
+
+def _numpy_moving_average(cents, window: int) -> List[Decimal]:
+    """
+    Médias móveis por soma acumulada em centavos inteiros, com o mesmo
+    arredondamento ROUND_HALF_UP (para longe do zero) do caminho Decimal.
+    """
+    cumulative = np.concatenate(([0], np.cumsum(cents, dtype=np.int64)))
+    window_sums = cumulative[window:] - cumulative[:-window]
+    rounded = np.sign(window_sums) * ((2 * np.abs(window_sums) + window) // (2 * window))
+    return list(map(Decimal.scaleb, map(Decimal, rounded.tolist()), repeat(-2)))
+
+def _numpy_mean_std(returns: List[Decimal]) -> Tuple[Decimal, Decimal]:
+    """Média e desvio padrão amostral (ddof=1) em float64, devolvidos como Decimal"""
+    array = _to_float_array(returns)
+    return Decimal(repr(float(array.mean()))), Decimal(repr(float(array.std(ddof=1))))
+
 def generate_performance_insights(stats: Dict) -> List[str]:
     """Generate performance insights based on statistics"""
     insights = []
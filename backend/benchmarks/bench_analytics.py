@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark das funções de análise de app/utils.py: caminho NumPy vetorizado
+x caminho Decimal exato.
+
+Mede média móvel, volatilidade e Sharpe para séries de retornos com duas
+casas decimais em cada tamanho pedido. O caminho Decimal em 1M de pontos
+leva alguns segundos; use --skip-decimal-above para limitá-lo.
+
+Usage:
+    python benchmarks/bench_analytics.py [--sizes 1000,100000,1000000] [--window 20] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import utils
+
+
+def make_returns(count):
+    random.seed(42)
+    return [Decimal(random.randint(-50000, 50000)) / 100 for _ in range(count)]
+
+
+def best_of(fn, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def cases(returns, window):
+    return {
+        'moving_average': lambda: utils.calculate_moving_average(returns, window),
+        'volatility': lambda: utils.calculate_volatility(returns),
+        'sharpe_ratio': lambda: utils.calculate_sharpe_ratio(returns),
+    }
+
+
+def decimal_only(fn):
+    """Roda `fn` com o caminho Decimal (como sem o NumPy instalado)"""
+    def run():
+        numpy = utils.np
+        utils.np = None
+        try:
+            return fn()
+        finally:
+            utils.np = numpy
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default='1000,100000,1000000')
+    parser.add_argument('--window', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--skip-decimal-above', type=int, default=None)
+    args = parser.parse_args()
+
+    if utils.np is None:
+        sys.exit('numpy não instalado: só o caminho Decimal está disponível')
+
+    print(f'janela {args.window}, melhor de {args.repeat}')
+    print(f'{"pontos":>9} {"função":<16} {"numpy":>12} {"decimal":>12} {"ganho":>8}')
+    for size in (int(value) for value in args.sizes.split(',')):
+        returns = make_returns(size)
+        for name, fn in cases(returns, args.window).items():
+            numpy_time, fast = best_of(fn, args.repeat)
+            if args.skip_decimal_above and size > args.skip_decimal_above:
+                print(f'{size:>9} {name:<16} {numpy_time * 1000:>9.1f} ms {"-":>12} {"-":>8}')
+                continue
+            decimal_time, exact = best_of(decimal_only(fn), args.repeat)
+            print(f'{size:>9} {name:<16} {numpy_time * 1000:>9.1f} ms {decimal_time * 1000:>9.1f} ms '
+                  f'{decimal_time / numpy_time:>7.1f}x{"" if fast == exact else "  (difere)"}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark da serialização da listagem de transações.
+
+Compara o caminho antigo (dict por transação com str()/isoformat() e o
+provider JSON padrão do Flask) com o caminho atual: as linhas da consulta
+entregues direto ao encoder, valores numeric já convertidos para texto
+pelo Postgres e datetime codificado nativamente pelo FastJSONProvider.
+
+Usage:
+    python benchmarks/bench_json.py [--rows 100000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from app.json_provider import FastJSONProvider, orjson
+
+Row = namedtuple('Row', [
+    'id', 'type', 'amount', 'balance_before', 'balance_after',
+    'category', 'description', 'date', 'meta'
+])
+
+
+def make_rows(count):
+    random.seed(42)
+    start = datetime(2020, 1, 1)
+    balance = Decimal('1000.00')
+    rows = []
+    for i in range(count):
+        amount = Decimal(random.randint(100, 100000)) / 100
+        tx_type = random.choice(['deposit', 'withdraw', 'gains', 'losses'])
+        before = balance
+        balance = balance + amount if tx_type in ('deposit', 'gains') else balance - amount
+        rows.append(Row(
+            i + 1, tx_type, amount, before, balance,
+            random.choice(['Roleta', 'Blackjack', 'Saque', 'Depósito']),
+            'Transação de benchmark',
+            start + timedelta(minutes=17 * i),
+            {}
+        ))
+    return rows
+
+
+def as_sql_text(rows):
+    """Simula o cast de numeric para texto feito na consulta da listagem"""
+    return [row._replace(
+        amount=str(row.amount),
+        balance_before=str(row.balance_before),
+        balance_after=str(row.balance_after)
+    ) for row in rows]
+
+
+def legacy_payload(rows):
+    return {
+        'success': True,
+        'data': [{
+            'id': tx.id,
+            'type': tx.type,
+            'amount': str(tx.amount),
+            'balance_before': str(tx.balance_before),
+            'balance_after': str(tx.balance_after),
+            'category': tx.category,
+            'description': tx.description,
+            'date': tx.date.isoformat(),
+            'meta': tx.meta
+        } for tx in rows]
+    }
+
+
+def current_payload(rows):
+    return {'success': True, 'data': rows}
+
+
+def bench(label, fn, repeat):
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = len(fn())
+        timings.append(time.perf_counter() - started)
+    best = min(timings)
+    print(f'{label:<45} {best * 1000:>10.1f} ms {size / 1024 / 1024:>8.2f} MiB')
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    default_provider = DefaultJSONProvider(app)
+    fast_provider = FastJSONProvider(app)
+    rows = make_rows(args.rows)
+
+    print(f'{args.rows} transações, melhor de {args.repeat} (orjson: {"sim" if orjson else "não"})')
+    baseline = bench(
+        'dicts + str()/isoformat() + json padrão',
+        lambda: default_provider.dumps(legacy_payload(rows)).encode('utf-8'),
+        args.repeat
+    )
+    bench(
+        'dicts + str()/isoformat() + FastJSONProvider',
+        lambda: fast_provider.dump_bytes(legacy_payload(rows)),
+        args.repeat
+    )
+    bench(
+        'linhas com Decimal + FastJSONProvider',
+        lambda: fast_provider.dump_bytes(current_payload(rows)),
+        args.repeat
+    )
+    text_rows = as_sql_text(rows)
+    current = bench(
+        'linhas com numeric::text + FastJSONProvider',
+        lambda: fast_provider.dump_bytes(current_payload(text_rows)),
+        args.repeat
+    )
+    print(f'Ganho: {baseline / current:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON x MessagePack para a listagem de transações.
+
+Mede tempo de codificação, tempo de decodificação e tamanho do corpo para
+o mesmo payload (Decimal como string e datas em ISO 8601 nos dois).
+
+Usage:
+    python benchmarks/bench_msgpack.py [--rows 100000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from app.json_provider import FastJSONProvider
+from app.msgpack_codec import packb, unpackb
+from bench_json import make_rows
+
+
+def best_of(fn, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def report(label, encode, decode, repeat):
+    encode_time, body = best_of(encode, repeat)
+    decode_time, _ = best_of(lambda: decode(body), repeat)
+    print(f'{label:<28} {encode_time * 1000:>10.1f} ms {decode_time * 1000:>10.1f} ms '
+          f'{len(body) / 1024 / 1024:>9.2f} MiB')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    provider = FastJSONProvider(Flask(__name__))
+    # O msgpack empacota namedtuple como lista; as linhas do SQLAlchemy
+    # (Row) passam pelo encoder e viram mapas, como aqui
+    payload = {'success': True, 'data': [row._asdict() for row in make_rows(args.rows)]}
+
+    print(f'{args.rows} transações, melhor de {args.repeat}')
+    print(f'{"formato":<28} {"encode":>13} {"decode":>13} {"tamanho":>13}')
+    report('JSON', lambda: provider.dump_bytes(payload), provider.loads, args.repeat)
+    report('MessagePack', lambda: packb(payload), unpackb, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
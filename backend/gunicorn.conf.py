@@ -0,0 +1,17 @@
+# gunicorn.conf.py
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5004')}"
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+# O app lê WEB_CONCURRENCY para exigir o broker de eventos em Redis
+os.environ['WEB_CONCURRENCY'] = str(workers)
+
+# Worker gevent: conexões SSE (/stream/events) ociosas não ocupam um worker
+worker_class = 'gevent'
+worker_connections = int(os.getenv('WORKER_CONNECTIONS', '1000'))
+
+
+def post_fork(server, worker):
+    # Sem isso cada consulta do psycopg2 bloqueia todos os greenlets do worker
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
@@ -401,6 +401,99 @@ def check_health():
         app.logger.error(f'Health check failed: {str(e)}')
         sys.exit(1)
 
+@app.cli.command()
+@click.option('--days', default=90, help='Keep change log entries newer than this many days')
+def compact_changes(days):
+    """Compact the sync change log, forcing a full resync for stale clients"""
+    try:
+        from app.sync import compact_change_log
+
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        removed = compact_change_log(cutoff)
+
+        click.echo(f'✅ Change log compacted (entries before {cutoff:%Y-%m-%d})')
+        click.echo(f'   👥 Users affected: {removed}')
+
+        app.logger.info(f'Change log compacted before {cutoff.isoformat()}')
+
+    except Exception as e:
+        click.echo(f'❌ Error compacting change log: {str(e)}')
+        app.logger.error(f'Failed to compact change log: {str(e)}')
+        db.session.rollback()
+        sys.exit(1)
+
+@app.cli.command()
+@click.option('--user-id', type=int, default=None, help='Rebuild only this user')
+def rebuild_autocomplete(user_id):
+    """Rebuild autocomplete term frequencies from the transaction history"""
+    try:
+        from app.autocomplete import rebuild_autocomplete_terms
+
+        rebuild_autocomplete_terms(user_id)
+
+        click.echo('✅ Autocomplete terms rebuilt successfully!')
+        app.logger.info(f'Autocomplete terms rebuilt (user: {user_id or "all"})')
+
+    except Exception as e:
+        click.echo(f'❌ Error rebuilding autocomplete terms: {str(e)}')
+        app.logger.error(f'Failed to rebuild autocomplete terms: {str(e)}')
+        db.session.rollback()
+        sys.exit(1)
+
+@app.cli.command()
+@click.option('--user-id', type=int, default=None, help='Rebuild only this user')
+def rebuild_rollups(user_id):
+    """Backfill the betting_stats rollups (all STATS_CALCULATION_PERIODS) from transactions and sessions"""
+    try:
+        from app.rollups import rebuild_rollups as rebuild
+
+        rebuild(user_id)
+
+        click.echo('✅ Period rollups rebuilt successfully!')
+        app.logger.info(f'Period rollups rebuilt (user: {user_id or "all"})')
+
+    except Exception as e:
+        click.echo(f'❌ Error rebuilding period rollups: {str(e)}')
+        app.logger.error(f'Failed to rebuild period rollups: {str(e)}')
+        db.session.rollback()
+        sys.exit(1)
+
+@app.cli.command()
+@click.option('--chunk-size', default=10000, help='User ids per parallel chunk')
+@click.option('--workers', default=4, help='Parallel read connections')
+@click.option('--active-days', default=30, help='Users with transactions in this many days count as active')
+@click.option('--output', default=None, help='Write per-user KPIs to this .csv or .parquet file')
+@click.option('--statement-timeout', default=600000, help='Per-chunk statement timeout (ms)')
+def platform_report(chunk_size, workers, active_days, output, statement_timeout):
+    """Platform-wide KPIs (totals, active users, ROI distribution) over all users"""
+    try:
+        from app.platform_report import build_platform_report
+
+        started = datetime.utcnow()
+        report = build_platform_report(
+            app.config,
+            chunk_size=chunk_size,
+            workers=workers,
+            active_days=active_days,
+            output=output,
+            statement_timeout=statement_timeout
+        )
+
+        click.echo('📊 === PLATFORM REPORT ===')
+        for key, value in report.items():
+            if key == 'roi_percentiles':
+                value = ', '.join(f'{name}: {p}' for name, p in value.items()) or '-'
+            click.echo(f'   {key}: {value}')
+        if output:
+            click.echo(f'   💾 Per-user KPIs written to {output}')
+        click.echo(f'✅ Report finished in {(datetime.utcnow() - started).total_seconds():.1f}s')
+        app.logger.info(f'Platform report generated ({report["chunks"]} chunks)')
+
+    except Exception as e:
+        click.echo(f'❌ Error generating platform report: {str(e)}')
+        app.logger.error(f'Failed to generate platform report: {str(e)}')
+        sys.exit(1)
+
 @app.teardown_appcontext
 def close_db_connection(error):
     """Close database connection on app teardown"""
@@ -55,6 +55,29 @@ def test_analytics_monthly_default(client, db_session, auth_headers):
     assert isinstance(data['data'], list)
 
 
+def test_analytics_monthly_exact_calendar_months(client, db_session, auth_headers):
+    client.post('/transactions', json={'type': 'gains', 'amount': 300, 'category': 'Mensal'}, headers=auth_headers)
+    client.post('/transactions', json={'type': 'losses', 'amount': 100, 'category': 'Mensal'}, headers=auth_headers)
+    client.post('/transactions', json={'type': 'withdraw', 'amount': 50, 'category': 'Mensal'}, headers=auth_headers)
+
+    data = client.get('/analytics/monthly?months=4', headers=auth_headers).get_json()['data']
+
+    # Quatro meses consecutivos, os anteriores vazios
+    assert len(data) == 4
+    months = [d['month'] for d in data]
+    assert months == sorted(months) and len(set(months)) == 4
+    assert all(d['balance'] == 0 for d in data[:3])
+
+    current = data[-1]
+    assert current['deposits'] == 1000.0
+    assert current['gains'] == 300.0
+    assert current['losses'] == 100.0
+    assert current['withdraws'] == 50.0
+    assert current['net_result'] == 200.0
+    assert current['balance'] == 1150.0
+    assert current['closing_balance'] == 1150.0
+
+
 def test_analytics_monthly_custom(client, db_session, auth_headers):
     response = client.get('/analytics/monthly?months=3', headers=auth_headers)
     data = response.get_json()
@@ -138,3 +161,15 @@ def test_risk_analysis_with_profile(client, db_session, auth_headers):
     assert 'stop_loss' in data['data']
     assert 'profit_target' in data['data']
     assert 'drawdown' in data['data']
+
+
+def test_analytics_monthly_columnar(client, db_session, auth_headers):
+    response = client.get('/analytics/monthly?format=columnar', headers=auth_headers)
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert data['format'] == 'columnar'
+    assert data['columns'] == [
+        'month', 'deposits', 'withdraws', 'gains', 'losses', 'net_result', 'balance', 'closing_balance'
+    ]
+    assert len(data['data']['month']) == len(data['data']['balance'])
@@ -0,0 +1,91 @@
+# ============================================================
+# GET /analytics/cash-flow
+# ============================================================
+
+def test_cash_flow_buckets_and_totals(client, db_session, auth_headers, create_transaction):
+    create_transaction(auth_headers, 'deposit', 200, '2025-03-03T12:00:00')
+    create_transaction(auth_headers, 'withdraw', 80, '2025-03-03T15:00:00')
+    create_transaction(auth_headers, 'withdraw', 20, '2025-03-05T12:00:00')
+
+    response = client.get('/analytics/cash-flow?from=2025-03-01&to=2025-03-07', headers=auth_headers)
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert body['granularity'] == 'day'
+    assert len(body['data']) == 7
+    day = next(d for d in body['data'] if d['date'] == '2025-03-03')
+    assert float(day['deposits']) == 200.0
+    assert float(day['withdrawals']) == 80.0
+    assert float(day['net_flow']) == 120.0
+    assert body['totals'] == {'deposits': '200.00', 'withdrawals': '100.00', 'net_flow': '100.00'}
+
+
+def test_cash_flow_weekly_buckets_start_monday(client, db_session, auth_headers, create_transaction):
+    create_transaction(auth_headers, 'deposit', 50, '2025-03-05T12:00:00')
+    create_transaction(auth_headers, 'deposit', 70, '2025-03-12T12:00:00')
+
+    body = client.get(
+        '/analytics/cash-flow?from=2025-03-03&to=2025-03-16&granularity=week', headers=auth_headers
+    ).get_json()
+
+    assert [d['date'] for d in body['data']] == ['2025-03-03', '2025-03-10']
+    assert [float(d['deposits']) for d in body['data']] == [50.0, 70.0]
+
+
+def test_cash_flow_series_is_bounded(client, app, db_session, auth_headers):
+    body = client.get('/analytics/cash-flow?from=2000-01-01&to=2025-12-31', headers=auth_headers).get_json()
+
+    assert body['granularity'] == 'month'
+    assert len(body['data']) <= app.config['MAX_SERIES_POINTS']
+
+
+def test_cash_flow_rejects_ranges_beyond_point_limit(client, db_session, auth_headers):
+    response = client.get('/analytics/cash-flow?from=1000-01-01&to=2999-12-31', headers=auth_headers)
+
+    assert response.status_code == 400
+
+
+def test_cash_flow_invalid_granularity(client, db_session, auth_headers):
+    response = client.get('/analytics/cash-flow?granularity=hour', headers=auth_headers)
+
+    assert response.status_code == 400
+
+
+# ============================================================
+# GET /analytics/operational-performance
+# ============================================================
+
+def test_operational_performance_by_game(client, db_session, auth_headers, create_transaction):
+    create_transaction(auth_headers, 'gains', 300, '2025-04-02T12:00:00', 'roulette')
+    create_transaction(auth_headers, 'losses', 100, '2025-04-02T14:00:00', 'roulette')
+    create_transaction(auth_headers, 'losses', 50, '2025-04-03T12:00:00', 'blackjack')
+    create_transaction(auth_headers, 'deposit', 500, '2025-04-03T12:00:00')
+
+    response = client.get(
+        '/analytics/operational-performance?from=2025-04-01&to=2025-04-30&granularity=month',
+        headers=auth_headers
+    )
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert len(body['data']) == 1
+    assert float(body['data'][0]['net_result']) == 150.0
+    assert body['totals']['total_trades'] == 3
+    assert body['totals']['win_rate'] == 33.33
+    assert [g['game_type'] for g in body['by_game']] == ['roulette', 'blackjack']
+    roulette = body['by_game'][0]
+    assert roulette['win_rate'] == 50.0
+    assert roulette['net_result'] == '200.00'
+
+
+def test_operational_performance_columnar(client, db_session, auth_headers, create_transaction):
+    create_transaction(auth_headers, 'gains', 10, '2025-04-02T12:00:00')
+
+    body = client.get(
+        '/analytics/operational-performance?from=2025-04-01&to=2025-04-03&format=columnar',
+        headers=auth_headers
+    ).get_json()
+
+    assert body['columns'] == ['date', 'gains', 'losses', 'net_result']
+    assert len(body['data']['date']) == 3
+    assert 'by_game' in body
@@ -105,6 +105,47 @@ def test_login_success(client, db_session):
     assert 'initial_bank' in data['user']
 
 
+def test_login_with_dashboard(client, db_session, count_queries):
+    client.post('/auth/register', json={
+        'name': 'Dashboard User',
+        'email': 'dashboard@example.com',
+        'password': 'senha123',
+        'initialBank': 300.0
+    })
+
+    with count_queries() as statements:
+        response = client.post('/auth/login?include=dashboard', json={
+            'email': 'dashboard@example.com',
+            'password': 'senha123'
+        })
+    data = response.get_json()
+
+    assert response.status_code == 200
+    dashboard = data['dashboard']
+    assert dashboard['balance']['balance'] == '300.00'
+    assert len(dashboard['transactions']) == 1
+    assert dashboard['pagination']['total'] == 1
+    # Total da paginação vem do resumo do ledger, sem count(*) separado
+    assert not any('count(transactions.id)' in sql for sql in statements)
+    assert dashboard['objectives'] == []
+    assert 'profile' in dashboard
+
+
+def test_login_without_include_has_no_dashboard(client, db_session):
+    client.post('/auth/register', json={
+        'name': 'Plain User',
+        'email': 'plain@example.com',
+        'password': 'senha123',
+        'initialBank': 100.0
+    })
+
+    response = client.post('/auth/login', json={
+        'email': 'plain@example.com',
+        'password': 'senha123'
+    })
+    assert 'dashboard' not in response.get_json()
+
+
 def test_login_wrong_password(client, db_session):
     client.post('/auth/register', json={
         'name': 'Wrong Pass',
@@ -0,0 +1,72 @@
+def _create_transaction(client, headers, category, description=None, amount=10):
+    return client.post('/transactions', json={
+        'type': 'deposit',
+        'amount': amount,
+        'category': category,
+        'description': description
+    }, headers=headers)
+
+
+# ============================================================
+# GET /autocomplete
+# ============================================================
+
+def test_autocomplete_ranks_by_usage(client, db_session, auth_headers):
+    _create_transaction(client, auth_headers, 'Roleta')
+    _create_transaction(client, auth_headers, 'Roleta')
+    _create_transaction(client, auth_headers, 'Roleta Europeia')
+    _create_transaction(client, auth_headers, 'Blackjack')
+
+    response = client.get('/autocomplete?field=category&prefix=rol', headers=auth_headers)
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert data['success'] is True
+    assert [s['value'] for s in data['data']] == ['Roleta', 'Roleta Europeia']
+    assert data['data'][0]['uses'] == 2
+
+
+def test_autocomplete_descriptions(client, db_session, auth_headers):
+    _create_transaction(client, auth_headers, 'Roleta', description='Sessão da noite')
+
+    response = client.get('/autocomplete?field=description&prefix=sess', headers=auth_headers)
+    assert [s['value'] for s in response.get_json()['data']] == ['Sessão da noite']
+
+
+def test_autocomplete_follows_updates_and_deletes(client, db_session, auth_headers):
+    tx_id = _create_transaction(client, auth_headers, 'Poker').get_json()['data']['id']
+    client.put(f'/transactions/{tx_id}', json={'category': 'Pôquer'}, headers=auth_headers)
+
+    data = client.get('/autocomplete?field=category&prefix=p', headers=auth_headers).get_json()['data']
+    assert [s['value'] for s in data] == ['Pôquer']
+
+    client.delete(f'/transactions/{tx_id}', headers=auth_headers)
+    data = client.get('/autocomplete?field=category&prefix=p', headers=auth_headers).get_json()['data']
+    assert data == []
+
+
+def test_autocomplete_invalid_field(client, db_session, auth_headers):
+    response = client.get('/autocomplete?field=amount', headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_categories_from_terms(client, db_session, auth_headers):
+    _create_transaction(client, auth_headers, 'Slots')
+
+    response = client.get('/categories', headers=auth_headers)
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert 'Slots' in data['data']
+    assert 'Depósito Inicial' in data['data']
+
+
+def test_rebuild_autocomplete_terms(app, client, db_session, auth_headers):
+    _create_transaction(client, auth_headers, 'Baccarat')
+
+    from app.autocomplete import rebuild_autocomplete_terms
+    with app.app_context():
+        rebuild_autocomplete_terms()
+
+    data = client.get('/autocomplete?field=category&prefix=bac', headers=auth_headers).get_json()['data']
+    assert data == [{'value': 'Baccarat', 'uses': 1}]
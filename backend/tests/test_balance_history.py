@@ -0,0 +1,100 @@
+# ============================================================
+# GET /balance/history
+# ============================================================
+
+def test_balance_history_daily_gap_filled(client, db_session, auth_headers, create_transaction):
+    # Meio-dia UTC cai no mesmo dia em America/Sao_Paulo
+    create_transaction(auth_headers, 'gains', 200, '2025-01-10T12:00:00')
+    create_transaction(auth_headers, 'losses', 50, '2025-01-12T12:00:00')
+
+    response = client.get(
+        '/balance/history?from=2025-01-10&to=2025-01-13&granularity=day',
+        headers=auth_headers
+    )
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert data['granularity'] == 'day'
+    assert [p['date'] for p in data['data']] == [
+        '2025-01-10', '2025-01-11', '2025-01-12', '2025-01-13'
+    ]
+    # A banca inicial do cadastro é de hoje, fora do intervalo
+    closing = [float(p['closing_balance']) for p in data['data']]
+    assert closing == [200.0, 200.0, 150.0, 150.0]
+    assert float(data['data'][2]['losses']) == 50.0
+    assert data['data'][1]['transactions'] == 0
+
+
+def test_balance_history_includes_opening_balance(client, db_session, auth_headers, create_transaction):
+    create_transaction(auth_headers, 'deposit', 300, '2025-01-01T12:00:00')
+    create_transaction(auth_headers, 'withdraw', 100, '2025-02-15T12:00:00')
+
+    response = client.get(
+        '/balance/history?from=2025-02-01&to=2025-03-31&granularity=month',
+        headers=auth_headers
+    )
+    data = response.get_json()['data']
+
+    assert [p['date'] for p in data] == ['2025-02-01', '2025-03-01']
+    assert [float(p['closing_balance']) for p in data] == [200.0, 200.0]
+    assert float(data[0]['net_flow']) == -100.0
+
+
+def test_balance_history_coarsens_long_ranges(client, db_session, auth_headers):
+    response = client.get(
+        '/balance/history?from=2015-01-01&to=2025-01-01&granularity=day',
+        headers=auth_headers
+    )
+    data = response.get_json()
+
+    assert data['granularity'] == 'month'
+    assert len(data['data']) <= 400
+
+
+def test_balance_history_rejects_ranges_beyond_point_limit(client, db_session, auth_headers):
+    response = client.get('/balance/history?from=1000-01-01&to=2999-12-31', headers=auth_headers)
+    assert response.status_code == 400
+
+    # Com max_points o limite é o da série bruta, antes da redução
+    response = client.get(
+        '/balance/history?from=1000-01-01&to=2999-12-31&max_points=100',
+        headers=auth_headers
+    )
+    assert response.status_code == 400
+
+
+def test_balance_history_defaults_to_full_history(client, db_session, auth_headers):
+    response = client.get('/balance/history', headers=auth_headers)
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert float(data['data'][-1]['closing_balance']) == 1000.0
+
+
+def test_balance_history_columnar(client, db_session, auth_headers):
+    response = client.get('/balance/history?format=columnar', headers=auth_headers)
+    data = response.get_json()
+
+    assert data['format'] == 'columnar'
+    assert 'closing_balance' in data['columns']
+
+
+def test_balance_history_invalid_params(client, db_session, auth_headers):
+    assert client.get('/balance/history?granularity=hour', headers=auth_headers).status_code == 400
+    assert client.get('/balance/history?from=2025-13-01', headers=auth_headers).status_code == 400
+
+
+def test_balance_history_max_points_downsamples(client, db_session, auth_headers, create_transaction):
+    create_transaction(auth_headers, 'gains', 5000, '2024-06-15T12:00:00')
+    create_transaction(auth_headers, 'losses', 5000, '2024-06-16T12:00:00')
+
+    response = client.get(
+        '/balance/history?from=2023-01-01&to=2025-01-01&granularity=day&max_points=50',
+        headers=auth_headers
+    )
+    data = response.get_json()
+
+    # Mantém a granularidade pedida e preserva o pico do dia 15/06
+    assert data['granularity'] == 'day'
+    assert len(data['data']) == 50
+    assert '2024-06-15' in [p['date'] for p in data['data']]
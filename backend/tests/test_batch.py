@@ -0,0 +1,57 @@
+# ============================================================
+# POST /batch
+# ============================================================
+
+def test_batch_dispatches_reads(client, db_session, auth_headers):
+    response = client.post('/batch', json={'requests': [
+        {'id': 'saldo', 'method': 'GET', 'path': '/balance'},
+        {'id': 'txs', 'path': '/transactions', 'query': {'page': 1, 'per_page': 5}},
+        {'id': 'mensal', 'path': '/analytics/monthly?months=3'},
+    ]}, headers=auth_headers)
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert [item['id'] for item in data['data']] == ['saldo', 'txs', 'mensal']
+    assert all(item['status'] == 200 for item in data['data'])
+    assert data['data'][0]['body']['balance'] == '1000.00'
+    assert data['data'][1]['body']['pagination']['per_page'] == 5
+
+
+def test_batch_per_item_errors(client, db_session, auth_headers):
+    response = client.post('/batch', json={'requests': [
+        {'path': '/objectives/999999', 'method': 'DELETE'},
+        {'path': '/nao-existe'},
+        {'path': '/stream/events'},
+        {'path': '/batch'},
+        {'path': '/balance/history', 'query': 'granularity=hour'},
+    ]}, headers=auth_headers)
+    statuses = [item['status'] for item in response.get_json()['data']]
+
+    assert response.status_code == 200
+    assert statuses == [405, 404, 404, 405, 400]
+
+
+def test_batch_reuses_user_context(client, db_session, auth_headers, count_queries):
+    with count_queries() as single:
+        client.post('/batch', json={'requests': [{'path': '/balance'}]}, headers=auth_headers)
+    with count_queries() as triple:
+        client.post('/batch', json={'requests': [{'path': '/balance'}] * 3}, headers=auth_headers)
+
+    # Resumo do ledger carregado uma única vez para todos os itens
+    assert len(triple) == len(single)
+
+
+def test_batch_limit(app, client, db_session, auth_headers):
+    items = [{'path': '/balance'}] * (app.config['BATCH_MAX_ITEMS'] + 1)
+    response = client.post('/batch', json={'requests': items}, headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_batch_invalid_body(client, db_session, auth_headers):
+    response = client.post('/batch', json={'requests': []}, headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_batch_requires_auth(client, db_session):
+    response = client.post('/batch', json={'requests': [{'path': '/balance'}]})
+    assert response.status_code == 401
@@ -0,0 +1,62 @@
+# ============================================================
+# GET /bootstrap
+# ============================================================
+
+def test_bootstrap_returns_all_sections(client, db_session, auth_headers):
+    client.post('/objectives', json={
+        'title': 'Meta Bootstrap',
+        'target_amount': 500,
+        'current_amount': 0
+    }, headers=auth_headers)
+
+    response = client.get('/bootstrap', headers=auth_headers)
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert data['success'] is True
+    assert set(data['data']) == {
+        'profile', 'balance', 'transactions', 'objectives',
+        'overview', 'monthly', 'performance', 'risk'
+    }
+    assert data['data']['balance']['balance'] == '1000.00'
+    assert [obj['title'] for obj in data['data']['objectives']] == ['Meta Bootstrap']
+    assert len(data['data']['transactions']) == 1
+
+
+def test_bootstrap_matches_individual_routes(client, db_session, auth_headers):
+    client.post('/transactions', json={'type': 'gains', 'amount': 150, 'category': 'Teste'}, headers=auth_headers)
+    bootstrap = client.get('/bootstrap', headers=auth_headers).get_json()['data']
+
+    overview = client.get('/analytics/overview', headers=auth_headers).get_json()['data']
+    performance = client.get('/stats/performance', headers=auth_headers).get_json()['data']
+    balance = client.get('/balance', headers=auth_headers).get_json()
+
+    assert bootstrap['overview'] == overview
+    assert bootstrap['performance'] == performance
+    assert bootstrap['balance']['profit_loss'] == balance['profit_loss']
+
+
+def test_bootstrap_include_filter(client, db_session, auth_headers):
+    response = client.get('/bootstrap?include=balance,objectives', headers=auth_headers)
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert set(data['data']) == {'balance', 'objectives'}
+
+
+def test_bootstrap_invalid_section(client, db_session, auth_headers):
+    response = client.get('/bootstrap?include=balance,unknown', headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_bootstrap_shares_aggregates(client, db_session, auth_headers, count_queries):
+    with count_queries() as statements:
+        client.get('/bootstrap?include=balance,overview,risk', headers=auth_headers)
+
+    # Resumo do ledger calculado uma única vez para as três seções
+    summary_queries = [s for s in statements if 'WITH totals AS' in s]
+    assert len(summary_queries) == 1
+
+
+def test_bootstrap_requires_auth(client, db_session):
+    assert client.get('/bootstrap').status_code == 401
@@ -0,0 +1,78 @@
+# ============================================================
+# GET /calendar
+# ============================================================
+
+def test_calendar_month_totals(client, db_session, auth_headers, create_transaction):
+    create_transaction(auth_headers, 'gains', 300, '2025-03-10T15:00:00')
+    create_transaction(auth_headers, 'losses', 100, '2025-03-10T18:00:00')
+    create_transaction(auth_headers, 'deposit', 50, '2025-03-20T12:00:00')
+    create_transaction(auth_headers, 'gains', 70, '2025-04-01T12:00:00')
+
+    response = client.get('/calendar?year=2025&month=3', headers=auth_headers)
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert [day['date'] for day in data['data']] == ['2025-03-10', '2025-03-20']
+    first = data['data'][0]
+    assert float(first['gains']) == 300.0
+    assert float(first['losses']) == 100.0
+    assert float(first['net_result']) == 200.0
+    assert first['transactions'] == 2
+    assert float(data['data'][1]['deposits']) == 50.0
+
+
+def test_calendar_uses_local_day_boundary(client, db_session, auth_headers, create_transaction):
+    # 01:00 UTC de 02/03 ainda é 01/03 em America/Sao_Paulo
+    create_transaction(auth_headers, 'gains', 10, '2025-03-02T01:00:00')
+
+    data = client.get('/calendar?year=2025&month=3', headers=auth_headers).get_json()
+    assert [day['date'] for day in data['data']] == ['2025-03-01']
+
+
+def test_calendar_whole_year(client, db_session, auth_headers, create_transaction):
+    create_transaction(auth_headers, 'gains', 10, '2025-01-15T12:00:00')
+    create_transaction(auth_headers, 'gains', 10, '2025-12-15T12:00:00')
+
+    data = client.get('/calendar?year=2025', headers=auth_headers).get_json()
+    assert [day['date'] for day in data['data']] == ['2025-01-15', '2025-12-15']
+
+
+def test_calendar_etag_tracks_ledger_version(client, db_session, auth_headers, create_transaction):
+    first = client.get('/calendar?year=2025', headers=auth_headers)
+    etag = first.headers['ETag'].strip('"')
+
+    cached = client.get('/calendar?year=2025', headers={**auth_headers, 'If-None-Match': f'"{etag}"'})
+    assert cached.status_code == 304
+
+    create_transaction(auth_headers, 'gains', 10, '2025-05-05T12:00:00')
+    changed = client.get('/calendar?year=2025', headers={**auth_headers, 'If-None-Match': f'"{etag}"'})
+    assert changed.status_code == 200
+    assert len(changed.get_json()['data']) == 1
+
+
+def test_calendar_invalid_month(client, db_session, auth_headers):
+    assert client.get('/calendar?year=2025&month=13', headers=auth_headers).status_code == 400
+
+
+def test_calendar_rejects_dates_at_the_edge_of_the_calendar(client, db_session, auth_headers):
+    assert client.get('/calendar?year=9999', headers=auth_headers).status_code == 400
+    assert client.get('/calendar?year=9999&month=12', headers=auth_headers).status_code == 400
+    assert client.get('/calendar?year=9999&month=11', headers=auth_headers).status_code == 200
+    assert client.get('/balance/history?from=9999-12-01&to=9999-12-31', headers=auth_headers).status_code == 400
+    assert client.get('/transactions/profit-analysis?endDate=9999-12-31', headers=auth_headers).status_code == 400
+
+
+def test_calendar_etag_depends_on_representation(client, db_session, auth_headers):
+    as_json = client.get('/calendar?year=2025', headers=auth_headers)
+    etag = as_json.headers['ETag']
+
+    as_msgpack = client.get('/calendar?year=2025', headers={
+        **auth_headers, 'Accept': 'application/msgpack', 'If-None-Match': etag
+    })
+    assert as_msgpack.status_code == 200
+    assert as_msgpack.headers['ETag'] != etag
+    assert 'Accept' in as_msgpack.headers.get('Vary', '')
+
+    cached = client.get('/calendar?year=2025', headers={**auth_headers, 'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert 'Accept' in cached.headers.get('Vary', '')
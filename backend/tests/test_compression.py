@@ -0,0 +1,104 @@
+import gzip
+
+
+def _create_transactions(client, headers, count=30):
+    for i in range(count):
+        client.post('/transactions', json={
+            'type': 'deposit',
+            'amount': 10 + i,
+            'category': 'Compressão',
+            'description': 'Transação repetida para gerar um corpo grande'
+        }, headers=headers)
+
+
+def test_small_responses_are_not_compressed(client, db_session, auth_headers):
+    response = client.get('/balance', headers={**auth_headers, 'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.headers.get('Vary', '')
+
+
+def test_large_responses_are_gzipped(client, db_session, auth_headers):
+    _create_transactions(client, auth_headers)
+
+    plain = client.get('/transactions', headers=auth_headers)
+    response = client.get('/transactions', headers={**auth_headers, 'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert len(response.data) < len(plain.data)
+    assert gzip.decompress(response.data) == plain.data
+
+
+def test_etag_revalidation_without_route_etag(app, client, db_session, auth_headers):
+    _create_transactions(client, auth_headers)
+    headers = {**auth_headers, 'Accept-Encoding': 'gzip'}
+
+    first = client.get('/transactions', headers=headers)
+    etag = first.headers['ETag']
+    assert etag.endswith('-gzip"')
+
+    # Sem ETag forte da rota o corpo comprimido não vai para o cache
+    cache = app.extensions['compress']
+    assert not any(key[0] == etag.strip('"')[:-len('-gzip')] for key in cache._items)
+
+    second = client.get('/transactions', headers={**headers, 'If-None-Match': etag})
+    assert second.status_code == 304
+
+
+def test_cached_body_is_per_content_type(app, client, db_session, auth_headers):
+    for day in range(1, 31):
+        tx_id = client.post('/transactions', json={
+            'type': 'gains', 'amount': 10 + day, 'category': 'Compressão'
+        }, headers=auth_headers).get_json()['data']['id']
+        client.put(f'/transactions/{tx_id}', json={'date': f'2025-01-{day:02d}T12:00:00'}, headers=auth_headers)
+    headers = {**auth_headers, 'Accept-Encoding': 'gzip'}
+
+    as_json = client.get('/calendar?year=2025', headers=headers)
+    as_msgpack = client.get('/calendar?year=2025', headers={**headers, 'Accept': 'application/msgpack'})
+
+    assert as_json.headers['Content-Encoding'] == 'gzip'
+    assert as_msgpack.headers['Content-Type'] == 'application/msgpack'
+    assert gzip.decompress(as_msgpack.data) != gzip.decompress(as_json.data)
+    assert not gzip.decompress(as_msgpack.data).startswith(b'{')
+
+    cache = app.extensions['compress']
+    assert any(key[1] == 'application/msgpack' for key in cache._items)
+    assert any(key[1] == 'application/json' for key in cache._items)
+
+
+def test_streamed_responses_are_compressed():
+    from flask import Response
+    from app import create_app
+    app = create_app('testing')
+
+    @app.route('/_test/stream')
+    def _stream():
+        return Response((f'linha {i}\n' for i in range(2000)), mimetype='text/plain')
+
+    response = app.test_client().get('/_test/stream', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    assert gzip.decompress(response.data).decode().count('linha') == 2000
+
+
+def test_weak_route_etag_stays_weak():
+    from flask import Flask
+    from app.compression import Compress
+
+    app = Flask(__name__)
+    Compress(app)
+
+    @app.route('/weak')
+    def weak():
+        response = app.response_class('x' * 4096, mimetype='text/plain')
+        response.set_etag('v1', weak=True)
+        return response
+
+    client = app.test_client()
+    response = client.get('/weak', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['ETag'] == 'W/"v1-gzip"'
+    assert not app.extensions['compress']._items
+    revalidated = client.get('/weak', headers={'Accept-Encoding': 'gzip', 'If-None-Match': 'W/"v1-gzip"'})
+    assert revalidated.status_code == 304
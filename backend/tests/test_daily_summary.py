@@ -0,0 +1,61 @@
+def _summary(client, headers, day):
+    return client.get(f'/daily-summary?date={day}', headers=headers).get_json()['data']
+
+
+# ============================================================
+# GET /daily-summary
+# ============================================================
+
+def test_daily_summary_totals(client, db_session, auth_headers, create_transaction):
+    create_transaction(auth_headers, 'gains', 120, '2025-06-10T13:00:00')
+    create_transaction(auth_headers, 'losses', 45.5, '2025-06-10T20:00:00')
+    create_transaction(auth_headers, 'gains', 999, '2025-06-11T13:00:00')
+
+    data = _summary(client, auth_headers, '2025-06-10')
+
+    assert data['gains'] == '120.00'
+    assert data['losses'] == '45.50'
+    assert data['net_result'] == '74.50'
+    assert data['transactions'] == 2
+
+
+def test_daily_summary_sao_paulo_boundary(client, db_session, auth_headers, create_transaction):
+    # 02:30 UTC de 11/06 = 23:30 de 10/06 em America/Sao_Paulo
+    create_transaction(auth_headers, 'gains', 10, '2025-06-11T02:30:00')
+
+    assert _summary(client, auth_headers, '2025-06-10')['gains'] == '10.00'
+    assert _summary(client, auth_headers, '2025-06-11')['transactions'] == 0
+
+
+def test_daily_summary_follows_updates_and_deletes(client, db_session, auth_headers, create_transaction):
+    tx_id = create_transaction(auth_headers, 'gains', 100, '2025-06-10T13:00:00')
+
+    # Mudança de data e valor move o total entre os dias
+    client.put(f'/transactions/{tx_id}', json={'date': '2025-06-12T13:00:00', 'amount': 80}, headers=auth_headers)
+    assert _summary(client, auth_headers, '2025-06-10')['gains'] == '0.00'
+    assert _summary(client, auth_headers, '2025-06-12')['gains'] == '80.00'
+
+    client.delete(f'/transactions/{tx_id}', headers=auth_headers)
+    assert _summary(client, auth_headers, '2025-06-12')['transactions'] == 0
+
+
+def test_daily_summary_matches_rebuild(app, client, db_session, auth_headers, create_transaction):
+    create_transaction(auth_headers, 'gains', 30, '2025-06-10T13:00:00')
+    create_transaction(auth_headers, 'withdraw', 20, '2025-06-10T14:00:00')
+    before = _summary(client, auth_headers, '2025-06-10')
+
+    from app.rollups import rebuild_rollups
+    with app.app_context():
+        rebuild_rollups()
+
+    assert _summary(client, auth_headers, '2025-06-10') == before
+
+
+def test_daily_summary_defaults_to_today(client, db_session, auth_headers):
+    data = client.get('/daily-summary', headers=auth_headers).get_json()['data']
+    # A banca inicial do cadastro é um depósito de hoje
+    assert data['deposits'] == '1000.00'
+
+
+def test_daily_summary_invalid_date(client, db_session, auth_headers):
+    assert client.get('/daily-summary?date=10/06/2025', headers=auth_headers).status_code == 400
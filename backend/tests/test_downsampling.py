@@ -0,0 +1,42 @@
+import math
+import pytest
+from app import analytics
+from app.analytics import lttb_indices, downsample_rows
+
+
+def _series(n=1000):
+    x = list(range(n))
+    y = [math.sin(i / 25) * 100 for i in x]
+    y[437] = 900    # pico isolado
+    y[712] = -900   # queda isolada
+    return x, y
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    x, y = _series()
+    indices = lttb_indices(x, y, 50)
+
+    assert len(indices) == 50
+    assert indices[0] == 0 and indices[-1] == len(y) - 1
+    assert indices == sorted(set(indices))
+    assert 437 in indices and 712 in indices
+
+
+def test_lttb_short_series_is_untouched():
+    x, y = _series()
+    assert lttb_indices(x[:10], y[:10], 50) == list(range(10))
+
+
+@pytest.mark.skipif(analytics.np is None, reason='numpy não instalado')
+def test_lttb_numpy_matches_python_fallback():
+    x, y = _series()
+    assert analytics._lttb_numpy(x, y, 73) == analytics._lttb_python(x, y, 73)
+
+
+def test_downsample_rows_by_position():
+    rows = [{'month': f'm{i}', 'balance': float(i % 7)} for i in range(100)]
+    sampled = downsample_rows(rows, 10, None, 'balance')
+
+    assert len(sampled) == 10
+    assert sampled[0] is rows[0] and sampled[-1] is rows[-1]
+    assert downsample_rows(rows, None, None, 'balance') is rows
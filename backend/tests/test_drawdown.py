@@ -0,0 +1,91 @@
+from decimal import Decimal
+from app.drawdown import compute_drawdown_state, refresh_drawdown_state
+from app.models import User
+from app.sync import get_ledger_version
+
+
+def _user_id():
+    return User.query.filter_by(email='test@example.com').first().id
+
+
+def _build_history(create_transaction, headers):
+    # Banca inicial de 1000 (registro) seguida de pico 1500, vale 900 e recuperação
+    create_transaction(headers, 'gains', 500, '2030-01-02T12:00:00')
+    create_transaction(headers, 'losses', 600, '2030-01-05T12:00:00')
+    create_transaction(headers, 'gains', 700, '2030-01-09T12:00:00')
+
+
+def test_drawdown_peak_trough_and_recovery(client, app, db_session, auth_headers, create_transaction):
+    _build_history(create_transaction, auth_headers)
+
+    with app.app_context():
+        state = compute_drawdown_state(_user_id())
+
+    assert state['max_drawdown'] == Decimal('600.00')
+    assert state['max_peak'] == Decimal('1500.00')
+    assert state['trough'] == Decimal('900.00')
+    assert state['max_peak_date'].isoformat() == '2030-01-02T12:00:00'
+    assert state['trough_date'].isoformat() == '2030-01-05T12:00:00'
+    assert state['recovery_date'].isoformat() == '2030-01-09T12:00:00'
+    assert state['balance'] == Decimal('1600.00')
+    assert state['peak'] == Decimal('1600.00')
+
+
+def test_risk_analysis_reports_max_drawdown(client, db_session, auth_headers, create_transaction):
+    _build_history(create_transaction, auth_headers)
+    create_transaction(auth_headers, 'losses', 100, '2030-01-10T12:00:00')
+
+    drawdown = client.get('/stats/risk-analysis', headers=auth_headers).get_json()['data']['drawdown']
+
+    assert drawdown['current'] == '100.00'
+    assert drawdown['max_balance'] == '1600.00'
+    assert drawdown['max']['amount'] == '600.00'
+    assert drawdown['max']['percentage'] == '40.00'
+    assert drawdown['max']['recovery_days'] == 4
+    assert drawdown['max']['recovered'] is True
+
+
+def test_drawdown_without_transactions(app, db_session):
+    with app.app_context():
+        state = compute_drawdown_state(999999)
+
+    assert state['max_drawdown'] == 0
+    assert state['peak'] is None
+    assert state['trough_date'] is None
+
+
+def test_incremental_append_matches_full_scan(client, app, db_session, auth_headers, count_queries, create_transaction):
+    _build_history(create_transaction, auth_headers)
+    with app.app_context():
+        user_id = _user_id()
+        state = refresh_drawdown_state(user_id, None, get_ledger_version(user_id))
+
+    # Novas transações no fim da série: só as linhas novas são lidas
+    create_transaction(auth_headers, 'losses', 900, '2030-02-01T12:00:00')
+    create_transaction(auth_headers, 'gains', 50, '2030-02-02T12:00:00')
+
+    with app.app_context():
+        with count_queries() as statements:
+            incremental = refresh_drawdown_state(user_id, state, get_ledger_version(user_id))
+        full = compute_drawdown_state(user_id)
+
+    assert not any('OVER (ORDER BY date, id)' in sql for sql in statements)
+    assert {k: v for k, v in incremental.items() if k != 'version'} == full
+    assert incremental['max_drawdown'] == Decimal('900.00')
+    assert incremental['recovery_date'] is None
+
+
+def test_backdated_change_falls_back_to_full_scan(client, app, db_session, auth_headers, create_transaction):
+    _build_history(create_transaction, auth_headers)
+    with app.app_context():
+        user_id = _user_id()
+        state = refresh_drawdown_state(user_id, None, get_ledger_version(user_id))
+
+    create_transaction(auth_headers, 'losses', 1000, '2030-01-03T12:00:00')
+
+    with app.app_context():
+        refreshed = refresh_drawdown_state(user_id, state, get_ledger_version(user_id))
+        full = compute_drawdown_state(user_id)
+
+    assert {k: v for k, v in refreshed.items() if k != 'version'} == full
+    assert refreshed['max_drawdown'] == Decimal('1600.00')
@@ -0,0 +1,122 @@
+import pytest
+from contextlib import contextmanager
+from app.events import get_broker
+
+
+@contextmanager
+def _subscribed(app, user_id):
+    with app.app_context():
+        subscription = get_broker().subscribe(user_id)
+    try:
+        yield subscription
+    finally:
+        subscription.close()
+
+
+def _drain(subscription):
+    messages = []
+    while True:
+        message = subscription.get(timeout=0.05)
+        if message is None:
+            return messages
+        messages.append(message)
+
+
+# ============================================================
+# Publicação após o commit
+# ============================================================
+
+def test_transaction_publishes_balance_changed(app, client, registered_user):
+    headers = {'Authorization': f"Bearer {registered_user['token']}"}
+    with _subscribed(app, registered_user['id']) as subscription:
+        client.post('/transactions', json={'type': 'gains', 'amount': 50, 'category': 'Live'}, headers=headers)
+        messages = _drain(subscription)
+
+    assert [m['event'] for m in messages] == ['balance_changed']
+
+
+def test_objective_completion_publishes_event(app, client, registered_user):
+    headers = {'Authorization': f"Bearer {registered_user['token']}"}
+    objective_id = client.post('/objectives', json={
+        'title': 'Meta Live',
+        'target_amount': 100,
+        'current_amount': 0
+    }, headers=headers).get_json()['data']['id']
+
+    with _subscribed(app, registered_user['id']) as subscription:
+        client.put(f'/objectives/{objective_id}', json={'current_amount': 100}, headers=headers)
+        messages = _drain(subscription)
+
+    assert {'event': 'objective_completed', 'user_id': registered_user['id'],
+            'data': {'id': objective_id, 'title': 'Meta Live'}} in messages
+
+
+def test_events_are_per_user(app, client, registered_user):
+    headers = {'Authorization': f"Bearer {registered_user['token']}"}
+    with _subscribed(app, registered_user['id'] + 1) as subscription:
+        client.post('/transactions', json={'type': 'gains', 'amount': 50, 'category': 'Live'}, headers=headers)
+        assert _drain(subscription) == []
+
+
+# ============================================================
+# GET /stream/events
+# ============================================================
+
+def test_stream_emits_balance_and_stop_loss(app, client, registered_user):
+    headers = {'Authorization': f"Bearer {registered_user['token']}"}
+    client.post('/betting-profiles', json={
+        'bankroll': 1000.0,
+        'stopLoss': 200.0,
+        'profitTarget': 500.0,
+        'riskValue': 5,
+        'profile': {'id': 'balanced', 'title': 'Perfil Live', 'features': [], 'icon': {'name': 'chart'}}
+    }, headers=headers)
+    client.post('/transactions', json={'type': 'losses', 'amount': 750, 'category': 'Live'}, headers=headers)
+
+    app.config['SSE_MAX_STREAM_SECONDS'] = 1
+    try:
+        response = client.get(f"/stream/events?token={registered_user['token']}", buffered=False)
+        assert response.mimetype == 'text/event-stream'
+        with app.app_context():
+            get_broker().publish(registered_user['id'], {'event': 'balance_changed', 'data': {}})
+        body = b''.join(response.response).decode()
+    finally:
+        app.config['SSE_MAX_STREAM_SECONDS'] = 300
+
+    assert body.startswith('retry:')
+    assert 'event: balance_changed\ndata: {"balance": "250.00"' in body
+    assert 'event: stop_loss_approached' in body
+
+
+def test_stream_requires_token(client, db_session):
+    assert client.get('/stream/events').status_code == 401
+    assert client.get('/stream/events?token=invalido').status_code == 401
+
+
+def _events_app(**config):
+    from flask import Flask
+    from app.events import init_events
+    app = Flask(__name__)
+    app.config.update(REDIS_URL='redis://localhost:6379/0', **config)
+    init_events(app)
+    return app
+
+
+def test_memory_broker_single_worker():
+    from app.events import MemoryBroker
+    app = _events_app(EVENTS_BACKEND='memory', WEB_CONCURRENCY=1)
+
+    assert isinstance(app.extensions['events'], MemoryBroker)
+
+
+def test_memory_broker_rejected_with_several_workers():
+    with pytest.raises(RuntimeError):
+        _events_app(EVENTS_BACKEND='memory', WEB_CONCURRENCY=2)
+
+
+def test_redis_backend_without_package_fails(monkeypatch):
+    from app import events
+    monkeypatch.setattr(events, 'redis', None)
+
+    with pytest.raises(RuntimeError):
+        _events_app(EVENTS_BACKEND='redis', WEB_CONCURRENCY=2)
@@ -0,0 +1,32 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+
+def test_provider_encodes_decimal_as_string(app):
+    payload = app.json.loads(app.json.dumps({'amount': Decimal('150.00')}))
+    assert payload == {'amount': '150.00'}
+
+
+def test_provider_encodes_dates_as_iso(app):
+    payload = app.json.loads(app.json.dumps({
+        'date': datetime(2025, 1, 15, 10, 30, 0, 123456),
+        'target_date': date(2025, 12, 31)
+    }))
+    assert payload['date'] == '2025-01-15T10:30:00.123456'
+    assert payload['target_date'] == '2025-12-31'
+
+
+def test_transaction_list_keeps_string_contract(client, db_session, auth_headers):
+    client.post('/transactions', json={
+        'type': 'deposit',
+        'amount': 150,
+        'category': 'Contrato',
+        'date': '2025-01-15'
+    }, headers=auth_headers)
+
+    response = client.get('/transactions', headers=auth_headers)
+    tx = next(t for t in response.get_json()['data'] if t['category'] == 'Contrato')
+
+    assert tx['amount'] == '150.00'
+    assert isinstance(tx['balance_after'], str)
+    assert tx['date'].startswith('2025-01-15T')
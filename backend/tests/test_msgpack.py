@@ -0,0 +1,53 @@
+import pytest
+from datetime import datetime
+from decimal import Decimal
+
+msgpack = pytest.importorskip('msgpack')
+
+MSGPACK_HEADERS = {'Accept': 'application/msgpack'}
+
+
+def test_json_remains_default(client, db_session, auth_headers):
+    response = client.get('/balance', headers=auth_headers)
+
+    assert response.mimetype == 'application/json'
+    assert 'Accept' in response.headers.get('Vary', '')
+    assert response.get_json()['balance'] == '1000.00'
+
+
+def test_msgpack_negotiation(client, db_session, auth_headers):
+    response = client.get('/balance', headers={**auth_headers, **MSGPACK_HEADERS})
+    data = msgpack.unpackb(response.data, raw=False)
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/msgpack'
+    assert data['success'] is True
+    assert data['balance'] == '1000.00'
+
+
+def test_msgpack_matches_json_values(client, db_session, auth_headers):
+    client.post('/objectives', json={
+        'title': 'Meta', 'target_amount': 500, 'current_amount': 0, 'target_date': '2026-12-31'
+    }, headers=auth_headers)
+
+    for path in ('/transactions', '/objectives'):
+        as_json = client.get(path, headers=auth_headers).get_json()
+        as_msgpack = msgpack.unpackb(
+            client.get(path, headers={**auth_headers, **MSGPACK_HEADERS}).data, raw=False
+        )
+        # Datas e valores com o mesmo tipo e formato, venham crus ou formatados da rota
+        assert as_msgpack == as_json
+
+
+def test_msgpack_encodes_decimal_and_datetime_as_strings():
+    from app.msgpack_codec import packb
+
+    value = {'amount': Decimal('12.34'), 'date': datetime(2025, 1, 2, 3, 4, 5)}
+    assert msgpack.unpackb(packb(value)) == {'amount': '12.34', 'date': '2025-01-02T03:04:05'}
+
+
+def test_msgpack_error_responses(client, db_session):
+    response = client.get('/balance', headers=MSGPACK_HEADERS)
+
+    assert response.status_code == 401
+    assert msgpack.unpackb(response.data, raw=False) == {'error': 'Token is missing'}
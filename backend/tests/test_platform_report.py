@@ -0,0 +1,72 @@
+import csv
+from decimal import Decimal
+import pytest
+from app import platform_report
+from app.platform_report import build_platform_report
+
+
+def _register(client, email, initial_bank):
+    response = client.post('/auth/register', json={
+        'name': 'Relatório',
+        'email': email,
+        'password': 'senha123',
+        'initialBank': initial_bank
+    })
+    return {'Authorization': f"Bearer {response.get_json()['token']}"}
+
+
+def _populate(client):
+    first = _register(client, 'relatorio1@example.com', 1000.0)
+    client.post('/transactions', json={'type': 'gains', 'amount': 200}, headers=first)
+    client.post('/transactions', json={'type': 'withdraw', 'amount': 50}, headers=first)
+
+    second = _register(client, 'relatorio2@example.com', 500.0)
+    client.post('/transactions', json={'type': 'losses', 'amount': 100}, headers=second)
+
+    _register(client, 'relatorio3@example.com', 2000.0)
+
+
+def test_platform_report_kpis(client, app, db_session):
+    _populate(client)
+
+    report = build_platform_report(app.config, chunk_size=1, workers=2)
+
+    assert report['total_users'] == 3
+    assert report['users_with_transactions'] == 3
+    assert report['active_users'] == 3
+    assert report['profitable_users'] == 1
+    assert report['transactions'] == 6
+    assert report['total_deposits'] == Decimal('3500.00')
+    assert report['total_withdrawals'] == Decimal('50.00')
+    assert report['net_result'] == Decimal('100.00')
+    # ROI por usuário: 20%, -20% e 0%
+    assert report['roi_percentiles']['p50'] == 0.0
+    assert report['roi_mean'] == 0.0
+    assert report['chunks'] >= 3
+
+
+def test_platform_report_writes_csv(client, app, db_session, tmp_path):
+    _populate(client)
+    path = tmp_path / 'report.csv'
+
+    build_platform_report(app.config, chunk_size=2, workers=2, output=str(path))
+
+    with open(path, newline='', encoding='utf-8') as handle:
+        rows = sorted(csv.DictReader(handle), key=lambda row: int(row['user_id']))
+    assert len(rows) == 3
+    assert rows[0]['roi'] == '20.00'
+    assert rows[1]['net_result'] == '-100.00'
+    assert list(rows[0]) == list(platform_report.USER_COLUMNS)
+
+
+def test_platform_report_empty(app, db_session):
+    report = build_platform_report(app.config)
+
+    assert report['total_users'] == 0
+    assert report['chunks'] == 0
+    assert report['roi_percentiles'] == {}
+
+
+def test_platform_report_rejects_unknown_format(app, db_session, tmp_path):
+    with pytest.raises(ValueError):
+        build_platform_report(app.config, output=str(tmp_path / 'report.xlsx'))
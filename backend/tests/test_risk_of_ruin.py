@@ -0,0 +1,100 @@
+import pytest
+from app import risk_simulation
+from app.risk_simulation import run_simulation, simulate_bankroll_paths
+
+pytestmark = pytest.mark.skipif(risk_simulation.np is None, reason='numpy não instalado')
+
+
+def _params(**overrides):
+    params = {
+        'start': 1000.0,
+        'floor': 500.0,
+        'target': 1500.0,
+        'games': [(1, 50.0, 0.027, 2.0)],
+        'paths': 2000,
+        'max_rounds': 1000,
+        'seed': 42,
+    }
+    params.update(overrides)
+    return params
+
+
+def _set_profile(client, headers, stop_loss=500.0, profit_target=500.0):
+    client.post('/betting-profiles', json={
+        'bankroll': 1000.0,
+        'stopLoss': stop_loss,
+        'profitTarget': profit_target,
+        'riskValue': 5,
+    }, headers=headers)
+
+
+# ============================================================
+# Simulação
+# ============================================================
+
+def test_simulation_probabilities_sum_to_one():
+    result = simulate_bankroll_paths(time_budget=10, **_params())
+
+    total = result['stop_loss_probability'] + result['target_probability'] + result['open_probability']
+    assert total == pytest.approx(1.0, abs=1e-3)
+    assert result['paths'] == 2000
+    assert result['truncated'] is False
+    assert sum(result['session_length']['histogram']['counts']) == 2000 - result['session_length']['unfinished_paths']
+
+
+def test_simulation_house_edge_favors_stop_loss():
+    result = simulate_bankroll_paths(time_budget=10, **_params(games=[(1, 50.0, 0.2, 1.0)]))
+
+    assert result['stop_loss_probability'] > result['target_probability']
+
+
+def test_simulation_is_reproducible_with_seed():
+    assert simulate_bankroll_paths(time_budget=10, **_params()) == simulate_bankroll_paths(time_budget=10, **_params())
+
+
+def test_simulation_respects_time_budget():
+    result = simulate_bankroll_paths(time_budget=0, **_params(target=None, floor=-1e12))
+
+    assert result['truncated'] is True
+    assert result['open_probability'] == 1.0
+
+
+def test_simulation_runs_in_process_pool():
+    result = run_simulation(_params(paths=200), workers=1, time_budget=5)
+
+    assert result['paths'] == 200
+
+
+# ============================================================
+# GET /stats/risk-of-ruin
+# ============================================================
+
+def test_risk_of_ruin_endpoint(client, db_session, auth_headers):
+    _set_profile(client, auth_headers)
+
+    response = client.get('/stats/risk-of-ruin?paths=500&seed=1&games=roulette,blackjack', headers=auth_headers)
+    data = response.get_json()['data']
+
+    assert response.status_code == 200
+    assert data['paths'] == 500
+    assert data['inputs']['start_balance'] == '1000.00'
+    assert data['inputs']['stop_loss'] == '500.00'
+    assert data['inputs']['target'] == '1500.00'
+    assert [game['game'] for game in data['inputs']['games']] == ['blackjack', 'roulette']
+    assert 0 <= data['stop_loss_probability'] <= 1
+    assert set(data['session_length']['percentiles']) == {'p10', 'p25', 'p50', 'p75', 'p90'}
+
+
+def test_risk_of_ruin_uses_transaction_game_mix(client, db_session, auth_headers):
+    _set_profile(client, auth_headers)
+    client.post('/transactions', json={'type': 'gains', 'amount': 10, 'gameType': 'poker'}, headers=auth_headers)
+
+    data = client.get('/stats/risk-of-ruin?paths=100', headers=auth_headers).get_json()['data']
+
+    assert [game['game'] for game in data['inputs']['games']] == ['poker']
+
+
+def test_risk_of_ruin_invalid_game(client, db_session, auth_headers):
+    response = client.get('/stats/risk-of-ruin?games=dominoes', headers=auth_headers)
+
+    assert response.status_code == 400
@@ -0,0 +1,93 @@
+from app.models import BettingStats
+
+
+def _play_session(client, headers, result):
+    session_id = client.post('/betting-sessions', json={'game_type': 'roulette'}, headers=headers).get_json()['session_id']
+    client.post('/transactions', json={'type': 'gains' if result > 0 else 'losses', 'amount': abs(result), 'category': 'Sessão'}, headers=headers)
+    client.post(f'/betting-sessions/{session_id}/end', headers=headers)
+
+
+def _rollup_rows(app, user_id):
+    with app.app_context():
+        return {
+            (row.period_type, row.period_date.isoformat()): (
+                row.total_gains, row.total_losses, row.total_deposits, row.total_withdrawals,
+                row.transaction_count, row.total_sessions, row.winning_sessions,
+                row.sessions_net_result, row.best_session, row.worst_session
+            )
+            for row in BettingStats.query.filter_by(user_id=user_id).all()
+        }
+
+
+# ============================================================
+# Rollups por período
+# ============================================================
+
+def test_rollups_cover_all_periods(app, client, registered_user, create_transaction):
+    headers = {'Authorization': f"Bearer {registered_user['token']}"}
+    create_transaction(headers, 'gains', 100, '2025-06-11T12:00:00')   # quarta-feira
+    create_transaction(headers, 'losses', 40, '2025-06-14T12:00:00')   # sábado
+
+    rows = _rollup_rows(app, registered_user['id'])
+
+    assert rows[('daily', '2025-06-11')][0] == 100
+    assert rows[('weekly', '2025-06-09')][:2] == (100, 40)
+    assert rows[('monthly', '2025-06-01')][4] == 2
+    assert rows[('yearly', '2025-01-01')][:2] == (100, 40)
+
+
+def test_session_results_are_rolled_up(client, registered_user):
+    headers = {'Authorization': f"Bearer {registered_user['token']}"}
+    _play_session(client, headers, 150)
+    _play_session(client, headers, -50)
+
+    data = client.get('/stats/performance?period=daily', headers=headers).get_json()['data']
+
+    assert data['total_sessions'] == 2
+    assert data['winning_sessions'] == 1
+    assert data['win_rate'] == 50.0
+    assert data['total_profit'] == '100.00'
+    assert data['avg_session_result'] == '50.00'
+    assert data['best_session'] == '150.00'
+    assert data['worst_session'] == '-50.00'
+
+
+def test_utc_iso_date_edit_moves_rollup(app, client, registered_user, create_transaction):
+    headers = {'Authorization': f"Bearer {registered_user['token']}"}
+    tx_id = create_transaction(headers, 'gains', 100, '2025-06-11T12:00:00')
+
+    # O frontend envia toISOString(): UTC com sufixo Z
+    response = client.put(f'/transactions/{tx_id}', json={'date': '2025-07-02T12:00:00.000Z'}, headers=headers)
+    rows = _rollup_rows(app, registered_user['id'])
+
+    assert response.status_code == 200
+    assert response.get_json()['data']['date'] == '2025-07-02T12:00:00'
+    assert rows[('daily', '2025-06-11')][4] == 0
+    assert rows[('daily', '2025-07-02')][0] == 100
+
+
+def test_rebuild_matches_incremental_rollups(app, client, registered_user, create_transaction):
+    headers = {'Authorization': f"Bearer {registered_user['token']}"}
+    tx_id = create_transaction(headers, 'gains', 100, '2025-06-11T12:00:00')
+    create_transaction(headers, 'withdraw', 30, '2025-07-02T12:00:00')
+    client.put(f'/transactions/{tx_id}', json={'amount': 60}, headers=headers)
+    _play_session(client, headers, 20)
+
+    incremental = _rollup_rows(app, registered_user['id'])
+
+    from app.rollups import rebuild_rollups
+    with app.app_context():
+        rebuild_rollups(registered_user['id'])
+
+    assert _rollup_rows(app, registered_user['id']) == incremental
+
+
+def test_monthly_analytics_reads_rollups(client, registered_user):
+    headers = {'Authorization': f"Bearer {registered_user['token']}"}
+    client.post('/transactions', json={'type': 'withdraw', 'amount': 200, 'category': 'Rollup'}, headers=headers)
+
+    data = client.get('/analytics/monthly?months=1', headers=headers).get_json()['data']
+
+    assert data[-1]['deposits'] == 1000.0
+    assert data[-1]['withdraws'] == 200.0
+    assert data[-1]['balance'] == 800.0
@@ -0,0 +1,143 @@
+from datetime import datetime, timedelta
+
+
+def _create_transaction(client, headers, tx_type='deposit', amount=100, category='Sync'):
+    return client.post('/transactions', json={
+        'type': tx_type,
+        'amount': amount,
+        'category': category,
+        'description': 'Transação de sincronização'
+    }, headers=headers)
+
+
+def _current_token(client, headers):
+    response = client.get('/sync/changes', headers=headers)
+    return response.get_json()['data']['token']
+
+
+# ============================================================
+# GET /sync/changes
+# ============================================================
+
+def test_sync_without_token_requires_full_resync(client, db_session, auth_headers):
+    response = client.get('/sync/changes', headers=auth_headers)
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert data['success'] is True
+    assert data['data']['full_resync_required'] is True
+    assert int(data['data']['token']) > 0
+
+
+def test_sync_returns_new_transactions(client, db_session, auth_headers):
+    token = _current_token(client, auth_headers)
+    tx_id = _create_transaction(client, auth_headers, amount=150).get_json()['data']['id']
+
+    response = client.get(f'/sync/changes?since={token}', headers=auth_headers)
+    data = response.get_json()['data']
+
+    assert data['full_resync_required'] is False
+    assert [tx['id'] for tx in data['transactions']] == [tx_id]
+    assert data['deleted'] == []
+    assert int(data['token']) > int(token)
+
+    # Nada mudou desde o novo token
+    again = client.get(f"/sync/changes?since={data['token']}", headers=auth_headers).get_json()['data']
+    assert again['transactions'] == []
+    assert again['token'] == data['token']
+
+
+def test_sync_returns_tombstones(client, db_session, auth_headers):
+    tx_id = _create_transaction(client, auth_headers).get_json()['data']['id']
+    token = _current_token(client, auth_headers)
+    client.delete(f'/transactions/{tx_id}', headers=auth_headers)
+
+    data = client.get(f'/sync/changes?since={token}', headers=auth_headers).get_json()['data']
+
+    assert {'entity': 'transaction', 'id': tx_id} in data['deleted']
+    assert data['transactions'] == []
+
+
+def test_sync_tracks_objectives_and_profile(client, db_session, auth_headers):
+    token = _current_token(client, auth_headers)
+    client.post('/objectives', json={
+        'title': 'Objetivo Sync',
+        'target_amount': 500,
+        'current_amount': 0
+    }, headers=auth_headers)
+    client.put('/user/profile', json={'name': 'Nome Novo'}, headers=auth_headers)
+
+    data = client.get(f'/sync/changes?since={token}', headers=auth_headers).get_json()['data']
+
+    assert [obj['title'] for obj in data['objectives']] == ['Objetivo Sync']
+    assert data['user']['name'] == 'Nome Novo'
+
+
+def test_sync_tracks_deactivated_profiles(app, client, db_session, auth_headers):
+    from app.models import BettingProfile, User
+    from app.routes import _activate_betting_profile
+
+    token = _current_token(client, auth_headers)
+    with app.app_context():
+        user_id = User.query.filter_by(email='test@example.com').first().id
+        first_id = BettingProfile.query.filter_by(user_id=user_id, is_active=True).first().id
+        second = BettingProfile(user_id=user_id, profile_type='highrisk', title='Segundo perfil', risk_level=8)
+        db_session.session.add(second)
+        _activate_betting_profile(user_id, second)
+        db_session.session.commit()
+        second_id = second.id
+
+    data = client.get(f'/sync/changes?since={token}', headers=auth_headers).get_json()['data']
+    profiles = {profile['id']: profile['is_active'] for profile in data['betting_profiles']}
+
+    assert profiles == {first_id: False, second_id: True}
+
+
+def test_sync_pagination(client, db_session, auth_headers):
+    token = _current_token(client, auth_headers)
+    for amount in (10, 20, 30):
+        _create_transaction(client, auth_headers, amount=amount)
+
+    first = client.get(f'/sync/changes?since={token}&limit=2', headers=auth_headers).get_json()['data']
+    assert first['has_more'] is True
+    assert len(first['transactions']) == 2
+
+    second = client.get(f"/sync/changes?since={first['token']}&limit=2", headers=auth_headers).get_json()['data']
+    assert second['has_more'] is False
+    assert len(second['transactions']) == 1
+
+
+def test_sync_token_is_per_user_sequence(client, db_session, auth_headers):
+    token = int(_current_token(client, auth_headers))
+
+    other = client.post('/auth/register', json={
+        'name': 'Other User',
+        'email': 'other@example.com',
+        'password': 'senha123',
+        'initialBank': 500.0
+    }).get_json()['token']
+    _create_transaction(client, {'Authorization': f'Bearer {other}'})
+
+    # Escritas de outro usuário não avançam o token
+    assert int(_current_token(client, auth_headers)) == token
+
+    _create_transaction(client, auth_headers)
+    _create_transaction(client, auth_headers)
+    assert int(_current_token(client, auth_headers)) == token + 2
+
+
+def test_sync_after_compaction_requires_full_resync(app, client, db_session, auth_headers):
+    token = _current_token(client, auth_headers)
+    _create_transaction(client, auth_headers)
+
+    from app.sync import compact_change_log
+    with app.app_context():
+        compact_change_log(datetime.utcnow() + timedelta(seconds=1))
+
+    data = client.get(f'/sync/changes?since={token}', headers=auth_headers).get_json()['data']
+    assert data['full_resync_required'] is True
+
+
+def test_sync_requires_auth(client, db_session):
+    response = client.get('/sync/changes')
+    assert response.status_code == 401
@@ -0,0 +1,103 @@
+import pytest
+
+
+# ============================================================
+# GET /transactions/stats
+# ============================================================
+
+def test_transaction_stats_aggregates(client, db_session, auth_headers, create_transaction):
+    for tx_type, amount in [('gains', 100), ('gains', 300), ('losses', 50), ('deposit', 500)]:
+        create_transaction(auth_headers, tx_type, amount)
+
+    response = client.get('/transactions/stats?period=monthly', headers=auth_headers)
+    data = response.get_json()['data']
+
+    assert response.status_code == 200
+    assert data['total_trades'] == 3
+    assert data['winning_trades'] == 2
+    assert data['losing_trades'] == 1
+    assert data['win_rate'] == 66.67
+    assert data['total_gains'] == '400.00'
+    assert data['net_profit'] == '350.00'
+    assert data['avg_gain'] == '200.00'
+    assert data['max_gain'] == '300.00'
+    assert data['max_loss'] == '50.00'
+    # Retornos 100, 300, -50: média 116.67, desvio amostral 175.59
+    assert data['mean_return'] == '116.67'
+    assert data['volatility'] == '175.59'
+    assert data['sharpe_ratio'] == pytest.approx(0.6644, abs=1e-4)
+    assert data['profit_factor'] == 8.0
+
+
+def test_transaction_stats_respects_period(client, db_session, auth_headers, create_transaction):
+    create_transaction(auth_headers, 'gains', 100)
+    create_transaction(auth_headers, 'losses', 40, '2020-01-10T12:00:00')
+
+    recent = client.get('/transactions/stats?period=daily', headers=auth_headers).get_json()['data']
+    everything = client.get('/transactions/stats?period=all', headers=auth_headers).get_json()['data']
+
+    assert recent['total_trades'] == 1
+    assert recent['profit_factor'] is None
+    assert everything['total_trades'] == 2
+    assert everything['start_date'] is None
+
+
+def test_transaction_stats_empty(client, db_session, auth_headers):
+    data = client.get('/transactions/stats', headers=auth_headers).get_json()['data']
+
+    assert data['total_trades'] == 0
+    assert data['win_rate'] == 0
+    assert data['sharpe_ratio'] == 0
+
+
+def test_transaction_stats_invalid_period(client, db_session, auth_headers):
+    response = client.get('/transactions/stats?period=decade', headers=auth_headers)
+
+    assert response.status_code == 400
+
+
+def test_transaction_stats_etag_follows_ledger(client, db_session, auth_headers, create_transaction):
+    first = client.get('/transactions/stats', headers=auth_headers)
+    etag = first.headers['ETag'].strip('"')
+
+    cached = client.get('/transactions/stats', headers={**auth_headers, 'If-None-Match': f'"{etag}"'})
+    assert cached.status_code == 304
+
+    create_transaction(auth_headers, 'gains', 10)
+    fresh = client.get('/transactions/stats', headers={**auth_headers, 'If-None-Match': f'"{etag}"'})
+    assert fresh.status_code == 200
+    assert fresh.get_json()['data']['total_trades'] == 1
+
+
+# ============================================================
+# GET /transactions/profit-analysis
+# ============================================================
+
+def test_profit_analysis_date_range(client, db_session, auth_headers, create_transaction):
+    create_transaction(auth_headers, 'gains', 250, '2025-05-10T12:00:00')
+    create_transaction(auth_headers, 'losses', 50, '2025-05-20T12:00:00')
+    create_transaction(auth_headers, 'withdraw', 100, '2025-05-21T12:00:00')
+    create_transaction(auth_headers, 'gains', 999, '2025-06-01T12:00:00')
+
+    response = client.get(
+        '/transactions/profit-analysis?startDate=2025-05-01&endDate=2025-05-31', headers=auth_headers
+    )
+    data = response.get_json()['data']
+
+    assert response.status_code == 200
+    assert data['total_trades'] == 2
+    assert data['net_profit'] == '200.00'
+    assert data['total_withdrawals'] == '100.00'
+    assert data['total_deposits'] == '0.00'
+    assert data['initial_bank'] == '1000.00'
+    assert data['roi'] == 20.0
+    assert data['start_date'] == '2025-05-01'
+    assert data['end_date'] == '2025-05-31'
+
+
+def test_profit_analysis_invalid_range(client, db_session, auth_headers):
+    response = client.get(
+        '/transactions/profit-analysis?startDate=2025-06-01&endDate=2025-05-01', headers=auth_headers
+    )
+
+    assert response.status_code == 400
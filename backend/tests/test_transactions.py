@@ -243,3 +243,97 @@ def test_dashboard_overview(client, db_session, auth_headers):
     assert 'profit_loss' in data['data']
     assert 'roi_percentage' in data['data']
     assert float(data['data']['initial_bank']) == 1000.0
+
+
+def test_dashboard_overview_values(client, db_session, auth_headers):
+    _create_transaction(client, auth_headers, tx_type='withdraw', amount=200, category='Saque')
+    _create_transaction(client, auth_headers, tx_type='gains', amount=50, category='Ganho')
+
+    data = client.get('/dashboard/overview', headers=auth_headers).get_json()['data']
+
+    assert data['current_balance'] == '850.00'
+    assert data['total_deposits'] == '1000.00'
+    assert data['total_withdrawals'] == '200.00'
+    assert data['total_transactions'] == 3
+    assert data['last_transaction']['category'] == 'Ganho'
+
+
+# ============================================================
+# Contagem de consultas (resumo do ledger em uma instrução)
+# ============================================================
+
+@pytest.mark.parametrize('path', [
+    '/dashboard/overview',
+    '/analytics/overview',
+    '/transactions/summary',
+    '/balance',
+])
+def test_summary_routes_query_count(client, db_session, auth_headers, count_queries, path):
+    _create_transaction(client, auth_headers, tx_type='deposit', amount=100, category='Contagem')
+
+    with count_queries() as statements:
+        response = client.get(path, headers=auth_headers)
+
+    assert response.status_code == 200
+    # Resumo do ledger + perfil ativo (ou categorias populares)
+    assert len(statements) <= 2
+    assert len([s for s in statements if 'WITH totals AS' in s]) == 1
+
+
+def test_get_transactions_columnar(client, db_session, auth_headers):
+    _create_transaction(client, auth_headers, tx_type='deposit', amount=150, category='Colunar')
+
+    response = client.get('/transactions?format=columnar', headers=auth_headers)
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert data['success'] is True
+    assert data['format'] == 'columnar'
+    assert 'amount' in data['columns'] and 'date' in data['columns']
+    assert set(data['data'].keys()) == set(data['columns'])
+    assert len(data['data']['amount']) == len(data['data']['date']) == 2
+    assert '150.00' in data['data']['amount']
+
+
+# ============================================================
+# GET /transactions (paginação) e /transactions/search
+# ============================================================
+
+def test_get_transactions_paginated(client, db_session, auth_headers):
+    for amount in (10, 20, 30):
+        _create_transaction(client, auth_headers, amount=amount)
+
+    response = client.get('/transactions?page=1&per_page=2', headers=auth_headers)
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert len(data['data']) == 2
+    assert data['pagination']['total'] == 4
+    assert data['pagination']['pages'] == 2
+    assert data['pagination']['has_next'] is True
+
+
+def test_search_transactions(client, db_session, auth_headers):
+    _create_transaction(client, auth_headers, amount=80, category='Roleta')
+    client.post('/transactions', json={
+        'type': 'withdraw',
+        'amount': 40,
+        'category': 'Saque',
+        'description': 'Apostas na roleta europeia'
+    }, headers=auth_headers)
+    _create_transaction(client, auth_headers, amount=20, category='Blackjack')
+
+    response = client.get('/transactions/search?q=rolet', headers=auth_headers)
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert data['success'] is True
+    assert data['pagination']['total'] == 2
+    # A categoria pesa mais que a descrição
+    assert data['data'][0]['category'] == 'Roleta'
+    assert {tx['category'] for tx in data['data']} == {'Roleta', 'Saque'}
+
+
+def test_search_transactions_requires_query(client, db_session, auth_headers):
+    response = client.get('/transactions/search?q=', headers=auth_headers)
+    assert response.status_code == 400
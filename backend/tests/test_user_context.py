@@ -0,0 +1,46 @@
+from decimal import Decimal
+
+
+# ============================================================
+# Contexto do usuário por requisição
+# ============================================================
+
+def test_context_loads_each_item_once(client, db_session, auth_headers, count_queries):
+    with count_queries() as statements:
+        response = client.get('/bootstrap?include=profile,balance,overview,performance,risk', headers=auth_headers)
+
+    assert response.status_code == 200
+    assert len([s for s in statements if 'WITH totals AS' in s]) == 1
+    profile_queries = [s for s in statements if s.lstrip().startswith('SELECT betting_profiles.id')]
+    assert len(profile_queries) == 1
+
+
+def test_context_is_dropped_on_commit(app, registered_user):
+    from app import db as _db
+    from app.models import Transaction
+    from app.user_context import load_user_context
+
+    with app.test_request_context():
+        ctx = load_user_context(registered_user['id'])
+        assert ctx.balance == Decimal('1000.00')
+
+        _db.session.add(Transaction(
+            user_id=registered_user['id'], type='gains', amount=Decimal('25.00'), category='Contexto'
+        ))
+        _db.session.commit()
+
+        assert ctx.balance == Decimal('1025.00')
+
+
+def test_context_is_per_request(client, db_session, auth_headers):
+    assert client.get('/balance', headers=auth_headers).get_json()['balance'] == '1000.00'
+    client.post('/transactions', json={'type': 'losses', 'amount': 100, 'category': 'Contexto'}, headers=auth_headers)
+    assert client.get('/balance', headers=auth_headers).get_json()['balance'] == '900.00'
+
+
+def test_transaction_uses_context_balance(client, db_session, auth_headers):
+    response = client.post('/transactions', json={'type': 'withdraw', 'amount': 300, 'category': 'Contexto'}, headers=auth_headers)
+    data = response.get_json()['data']
+
+    assert data['balance_before'] == '1000.00'
+    assert data['balance_after'] == '700.00'
@@ -0,0 +1,66 @@
+import random
+from decimal import Decimal
+import pytest
+from app import utils
+from app.utils import calculate_moving_average, calculate_sharpe_ratio, calculate_volatility
+
+
+def _returns(n=500, seed=7):
+    random.seed(seed)
+    return [Decimal(random.randint(-50000, 50000)) / 100 for _ in range(n)]
+
+
+@pytest.fixture
+def decimal_only(monkeypatch):
+    """Força o caminho Decimal, como sem o NumPy instalado"""
+    monkeypatch.setattr(utils, 'np', None)
+
+
+def test_moving_average_small_series(decimal_only):
+    values = [Decimal('1.00'), Decimal('2.00'), Decimal('4.00'), Decimal('8.00')]
+
+    assert calculate_moving_average(values, 2) == [Decimal('1.50'), Decimal('3.00'), Decimal('6.00')]
+    assert calculate_moving_average(values, 5) == values
+
+
+def test_moving_average_rounds_half_up(decimal_only):
+    values = [Decimal('0.01'), Decimal('0.00'), Decimal('-0.01'), Decimal('0.00')]
+
+    assert calculate_moving_average(values, 2) == [Decimal('0.01'), Decimal('-0.01'), Decimal('-0.01')]
+
+
+def test_volatility_and_sharpe_decimal(decimal_only):
+    returns = [Decimal('100'), Decimal('300'), Decimal('-50')]
+
+    assert calculate_volatility(returns) == Decimal('175.59')
+    assert calculate_sharpe_ratio(returns) == Decimal('0.66')
+    assert calculate_volatility(returns[:1]) == Decimal('0')
+
+
+@pytest.mark.skipif(utils.np is None, reason='numpy não instalado')
+@pytest.mark.parametrize('window', [1, 7, 50])
+def test_moving_average_numpy_matches_decimal(monkeypatch, window):
+    values = _returns()
+    # Inclui empates de arredondamento em valores negativos
+    values[10:12] = [Decimal('-0.01'), Decimal('0.00')]
+    fast = calculate_moving_average(values, window)
+
+    monkeypatch.setattr(utils, 'np', None)
+    assert fast == calculate_moving_average(values, window)
+
+
+@pytest.mark.skipif(utils.np is None, reason='numpy não instalado')
+def test_moving_average_more_decimals_uses_exact_path():
+    values = _returns(100)
+    values[3] = Decimal('1.005')
+
+    assert calculate_moving_average(values, 2) == utils._decimal_moving_average(values, 2)
+
+
+@pytest.mark.skipif(utils.np is None, reason='numpy não instalado')
+def test_volatility_and_sharpe_numpy_match_decimal(monkeypatch):
+    returns = _returns(2000)
+    fast = (calculate_volatility(returns), calculate_sharpe_ratio(returns))
+
+    monkeypatch.setattr(utils, 'np', None)
+    assert fast == (calculate_volatility(returns), calculate_sharpe_ratio(returns))
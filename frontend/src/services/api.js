@@ -112,9 +112,9 @@ const apiService = {
   clearAuthToken: tokenManager.clearToken,
 
   // Auth endpoints
-  async login(email, password) {
+  async login(email, password, include = null) {
     try {
-      const response = await api.post('/auth/login', { email, password });
+      const response = await api.post('/auth/login', include ? { email, password, include } : { email, password });
       if (response.success && response.token) {
         tokenManager.setToken(response.token);
       }
@@ -232,6 +232,13 @@ const apiService = {
 
   // Balance and transactions
   getBalance: () => api.get('/balance'),
+  getBalanceHistory: (params = {}) => api.get('/balance/history', { params }),
+  getDailySummary: (date = null) => api.get('/daily-summary', { params: date ? { date } : {} }),
+  getCalendar: (year, month = null) => api.get('/calendar', { params: month ? { year, month } : { year } }),
+  batch: (requests) => api.post('/batch', { requests }),
+  // EventSource não envia cabeçalhos: o token vai na query
+  openEventStream: () => new EventSource(`${API_BASE_URL}/stream/events?token=${encodeURIComponent(tokenManager.getToken() || '')}`),
+  getBootstrap: (include = null, params = {}) => api.get('/bootstrap', { params: include ? { ...params, include: include.join(',') } : params }),
   getTransactions: (params = {}) => api.get('/transactions', { params }),
   
   // NOVA FUNÇÃO: Obter transações de banca inicial específicas
@@ -440,6 +447,8 @@ const apiService = {
   getGains: (params) => apiService.getTransactionsByType(TRANSACTION_TYPES.GAINS, params),
   getLosses: (params) => apiService.getTransactionsByType(TRANSACTION_TYPES.LOSSES, params),
 
+  searchTransactions: (q, params = {}) => api.get('/transactions/search', { params: { ...params, q } }),
+
   updateTransaction: (transactionId, data) => api.put(`/transactions/${transactionId}`, data),
   deleteTransaction: (transactionId) => api.delete(`/transactions/${transactionId}`),
   
@@ -454,12 +463,17 @@ const apiService = {
   getMonthlyAnalytics: (months = 6) => api.get('/analytics/monthly', { params: { months } }),
   getPerformanceStats: (period = 'monthly') => api.get('/stats/performance', { params: { period } }),
   getRiskAnalysis: () => api.get('/stats/risk-analysis'),
+  getRiskOfRuin: (params = {}) => api.get('/stats/risk-of-ruin', { params }),
   
   getOperationalPerformance: (params = {}) => api.get('/analytics/operational-performance', { params }),
   getCashFlowAnalysis: (params = {}) => api.get('/analytics/cash-flow', { params }),
 
+  // Sincronização incremental
+  getChanges: (since, params = {}) => api.get('/sync/changes', { params: { ...params, since } }),
+
   // Categories & Game Types
   getCategories: () => api.get('/categories'),
+  getAutocomplete: (field, prefix, params = {}) => api.get('/autocomplete', { params: { ...params, field, prefix } }),
   getGameTypes: () => api.get('/game-types'),
   
   // ========================================